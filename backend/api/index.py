@@ -2,28 +2,50 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from contextlib import asynccontextmanager
+import logging
 import os
-import sys
-import traceback
-from pathlib import Path
-from dotenv import load_dotenv
 
-# Load .env file explicitly before importing app.config
-BACKEND_DIR = Path(__file__).parent.parent
-ENV_FILE = BACKEND_DIR / ".env"
-if ENV_FILE.exists():
-    load_dotenv(dotenv_path=ENV_FILE, override=False)
-    print(f"✅ Loaded .env from: {ENV_FILE}", file=sys.stderr, flush=True)
-else:
-    load_dotenv(override=False)
-    print(f"⚠️ .env not found at {ENV_FILE}", file=sys.stderr, flush=True)
+# Settings (environment, then backend/.env) are read once, by app.config
+from app.config import settings
+
+# Logging goes through a queue drained by a background thread; configure it
+# before anything else logs (see app/logs.py)
+from app.logs import RequestLogContext, configure_logging, route_key
+configure_logging()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resolve the JWT secret once per worker instead of on every request
+    from app.dependencies.auth import load_auth_secret
+    load_auth_secret()
+
+    # Schema changes run from `python -m app.migrations upgrade`; startup only
+    # checks the applied version (one query) unless AUTO_MIGRATE is set
+    try:
+        from app.dependencies.database import get_async_engine
+        from app.migrations.runner import check_schema_version
+        await check_schema_version(get_async_engine())
+    except Exception as e:
+        logger.warning("Could not check database schema version: %s", e)
+    yield
+
+app_options = {}
+try:
+    from app.responses import get_default_response_class
+    default_response_class = get_default_response_class()
+    if default_response_class is not None:
+        app_options["default_response_class"] = default_response_class
+        logger.debug("Default response class: %s", default_response_class.__name__)
+except Exception as e:
+    logger.warning("Could not select default response class: %s", e)
 
-app = FastAPI(title="Todo API - Phase 4", version="1.0.0")
+app = FastAPI(title="Todo API - Phase 4", version="1.0.0", lifespan=lifespan, **app_options)
 
 # CORS Configuration
 try:
-    from app.config import settings
-    cors_origins_str = os.getenv("CORS_ORIGINS") or settings.cors_origins or "http://localhost:5173"
+    cors_origins_str = settings.cors_origins or "http://localhost:5173"
 
     if cors_origins_str:
         cors_origins_str = cors_origins_str.rstrip("/")
@@ -49,34 +71,58 @@ try:
     
     if not origins:
         if is_vercel:
-            print("⚠️ Warning: CORS_ORIGINS not set in production. Allowing all origins.", file=sys.stderr, flush=True)
+            logger.warning("CORS_ORIGINS not set in production. Allowing all origins.")
             origins = ["*"]
         else:
             origins = ["http://localhost:5173", "http://127.0.0.1:5173", "*"]
 
-    print(f"✅ CORS origins configured: {origins}", file=sys.stderr, flush=True)
+    logger.debug("CORS origins configured", extra={"origins": origins})
 except Exception as e:
-    print(f"Warning: CORS config error: {e}", file=sys.stderr, flush=True)
+    logger.warning("CORS config error: %s", e)
     origins = ["http://localhost:5173", "http://127.0.0.1:5173", "*"]
 
 try:
-    is_vercel_prod = os.getenv("VERCEL") == "1" or os.getenv("VERCEL_ENV")
-    cors_origins = origins
-    
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=cors_origins,
+        allow_origins=origins,
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
         allow_headers=["*"],
         expose_headers=["*"],
         max_age=3600,
     )
-    print(f"✅ CORS middleware added with origins: {cors_origins}", file=sys.stderr, flush=True)
-except Exception as e:
-    print(f"Warning: CORS middleware error: {e}", file=sys.stderr, flush=True)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
+except Exception:
+    logger.exception("CORS middleware error")
+
+# Sampled request profiles (flamegraph files), off unless a rate or token is set
+if settings.profile_sample_rate > 0 or settings.profile_token:
+    from app.profiling import RequestProfiler
+    app.add_middleware(
+        RequestProfiler,
+        sample_rate=settings.profile_sample_rate,
+        token=settings.profile_token,
+        directory=settings.profile_dir,
+        interval_ms=settings.profile_interval_ms,
+        min_duration_ms=settings.profile_min_duration_ms,
+        max_files=settings.profile_max_files,
+        max_bytes=settings.profile_max_bytes,
+    )
+
+# SQL statements, rows and time per request: Server-Timing header and log record
+from app.request_timing import RequestTiming
+app.add_middleware(
+    RequestTiming,
+    server_timing=settings.server_timing_enabled,
+    statement_budget=settings.sql_statement_budget,
+)
+
+# Request latency histograms and in-flight gauges for GET /metrics
+if settings.metrics_enabled:
+    from app.metrics import MetricsMiddleware
+    app.add_middleware(MetricsMiddleware)
+
+# Outermost middleware: request id and route on every log record of a request
+app.add_middleware(RequestLogContext)
 
 # Exception handler for HTTPException
 @app.exception_handler(HTTPException)
@@ -90,6 +136,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         status_code=exc.status_code,
         content={"detail": detail},
         headers={
+            **(exc.headers or {}),  # Keep headers such as Retry-After
             "Access-Control-Allow-Origin": allowed_origin,
             "Access-Control-Allow-Credentials": "true",
             "Access-Control-Allow-Methods": "*",
@@ -118,9 +165,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     error_msg = str(exc)
-    error_trace = traceback.format_exc()
-    print(f"❌ Unhandled exception: {error_msg}", file=sys.stderr, flush=True)
-    print(f"Traceback: {error_trace}", file=sys.stderr, flush=True)
+    # Runs outside the middleware stack, so the route is passed explicitly
+    logger.error("Unhandled exception", exc_info=exc, extra={"route": route_key(request.scope)})
 
     origin = request.headers.get("origin", "*")
     allowed_origin = origin if origin in origins else (origins[0] if origins else "*")
@@ -145,115 +191,20 @@ async def global_exception_handler(request: Request, exc: Exception):
 async def root():
     return {"message": "Todo API is running"}
 
-# Include routers
-try:
-    from app.routes import health
-    app.include_router(health.router, prefix="/api")
-    print("✅ Health router loaded", file=sys.stderr, flush=True)
-except Exception as e:
-    print(f"❌ Error loading health router: {e}", file=sys.stderr, flush=True)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
+# Include routers. These imports are not guarded: a router that fails to
+# import should stop the app from starting, not leave it serving 404s.
+from app.routes import auth, health, tasks
+app.include_router(health.router, prefix="/api")
+app.include_router(auth.router)
+app.include_router(tasks.router)
 
-try:
-    from app.routes import auth
-    app.include_router(auth.router)
-    print("✅ Auth router loaded", file=sys.stderr, flush=True)
-except Exception as e:
-    print(f"❌ Error loading auth router: {e}", file=sys.stderr, flush=True)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
-
-try:
-    from app.routes import tasks
-    app.include_router(tasks.router)
-    print("✅ Tasks router loaded", file=sys.stderr, flush=True)
-except Exception as e:
-    print(f"❌ Error loading tasks router: {e}", file=sys.stderr, flush=True)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
+if settings.metrics_enabled:
+    from app.routes import metrics
+    app.include_router(metrics.router)
 
-# Initialize database tables
-try:
-    from app.dependencies.database import get_engine
-    from app.models import User, Task
-    from sqlmodel import SQLModel
-    from sqlalchemy import inspect, text
-    from sqlmodel import Session
-    
-    engine = get_engine()
-    
-    # Check if tables exist, if not create them
-    inspector = inspect(engine)
-    existing_tables = inspector.get_table_names()
-    
-    # Create tables if they don't exist
-    SQLModel.metadata.create_all(engine, checkfirst=True)
-    
-    # Check and add missing columns for users table
-    if 'users' in existing_tables:
-        with Session(engine) as session:
-            # Check if name column exists
-            result = session.exec(
-                text("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'users' AND column_name = 'name'
-                """)
-            ).first()
-            
-            if result is None:
-                print("⚠️ Adding missing 'name' column to users table...", file=sys.stderr, flush=True)
-                try:
-                    session.exec(text("ALTER TABLE users ADD COLUMN name VARCHAR(255)"))
-                    session.commit()
-                    print("✅ Added 'name' column to users table", file=sys.stderr, flush=True)
-                except Exception as e:
-                    print(f"⚠️ Could not add name column (may already exist): {e}", file=sys.stderr, flush=True)
-                    session.rollback()
-    
-    # Check and add missing columns for tasks table
-    if 'tasks' in existing_tables:
-        with Session(engine) as session:
-            # Get existing columns
-            task_columns_result = session.exec(
-                text("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'tasks'
-                """)
-            ).all()
-            task_column_names = [col[0] if isinstance(col, tuple) else col for col in task_columns_result]
-            
-            # Required columns from Task model
-            required_columns = {
-                'priority': "VARCHAR(20) DEFAULT 'medium' NOT NULL",
-                'status': "VARCHAR(20) DEFAULT 'pending' NOT NULL",
-                'due_date': 'TIMESTAMP',
-                'updated_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
-            }
-            
-            missing_columns = [col for col in required_columns.keys() if col not in task_column_names]
-            
-            if missing_columns:
-                print(f"⚠️ Adding missing columns to tasks table: {missing_columns}...", file=sys.stderr, flush=True)
-                for col_name in missing_columns:
-                    col_def = required_columns[col_name]
-                    try:
-                        sql = f"ALTER TABLE tasks ADD COLUMN {col_name} {col_def}"
-                        session.exec(text(sql))
-                        session.commit()
-                        print(f"✅ Added column: {col_name}", file=sys.stderr, flush=True)
-                    except Exception as e:
-                        print(f"⚠️ Could not add {col_name} (may already exist): {e}", file=sys.stderr, flush=True)
-                        session.rollback()
-            else:
-                print("✅ All required columns exist in tasks table", file=sys.stderr, flush=True)
-    
-    print("✅ Database tables initialized", file=sys.stderr, flush=True)
-except Exception as e:
-    print(f"⚠️ Warning: Could not initialize database tables: {e}", file=sys.stderr, flush=True)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
+# /openapi.json from a schema generated at build time (python -m app.openapi)
+if settings.openapi_schema_file:
+    from app.openapi import load_precomputed_schema
+    load_precomputed_schema(app, settings.openapi_schema_file)
 
-print("✅ App initialization complete", file=sys.stderr, flush=True)
+logger.info("App initialization complete")
@@ -1,21 +1,18 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+import logging
 import os
-import sys
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Optional
+
+logger = logging.getLogger(__name__)
 
 # Get the root directory (parent of app directory)
 ROOT_DIR = Path(__file__).parent.parent
 ENV_FILE = ROOT_DIR / ".env"
 
-# Explicitly load .env file before settings initialization
-if ENV_FILE.exists():
-    load_dotenv(dotenv_path=ENV_FILE, override=False)
-    print(f"✅ Loaded .env file from: {ENV_FILE}", file=sys.stderr, flush=True)
-else:
-    # Try loading from current directory as fallback
-    load_dotenv(override=False)
-    print(f"⚠️ .env file not found at {ENV_FILE}, trying current directory", file=sys.stderr, flush=True)
+# This module is the only place that reads .env: the rest of the app takes
+# its configuration from `settings`, and environment variables win over the
+# file. (Loading it into os.environ as well would parse it twice per start.)
 
 class Settings(BaseSettings):
     # Make database_url optional to avoid initialization errors
@@ -23,6 +20,115 @@ class Settings(BaseSettings):
     better_auth_secret: str = ""
     cors_origins: str = ""
 
+    # Password hashing pool: bcrypt runs in worker threads, off the event loop
+    password_hash_workers: int = 2
+    password_hash_max_queue: int = 32  # waiting hashes beyond this get a 503
+    password_hash_rounds: int = 12
+
+    # Database connection pool profile: "serverless", "worker" or "external_pooler".
+    # The remaining values override the profile's defaults when set. The
+    # serverless entry points opt into "serverless" (app/serverless.py, vercel.json).
+    db_pool_profile: str = "worker"
+    db_pool_size: Optional[int] = None
+    db_max_overflow: Optional[int] = None
+    db_pool_timeout: Optional[float] = None
+    db_pool_recycle: Optional[int] = None
+    db_connect_timeout: Optional[float] = None
+
+    # Verified-JWT cache: tokens seen before skip signature verification until they expire
+    jwt_cache_size: int = 1024
+
+    # Apply pending schema migrations during app startup instead of requiring
+    # `python -m app.migrations upgrade` (handy for local development)
+    auto_migrate: bool = False
+
+    # Render JSON responses with orjson (when installed) instead of the
+    # framework default; see app/responses.py
+    orjson_responses: bool = False
+
+    # Read cache for task lists and single tasks: "none", "memory" (one
+    # process only) or "redis" (shared by replicas, needs REDIS_URL)
+    task_cache_backend: str = "none"
+    task_cache_ttl: float = 60.0
+    task_cache_max_bytes: int = 64 * 1024 * 1024  # memory backend only
+    redis_url: str = ""
+
+    # Group commit for POST /api/tasks (app/services/task_writer.py): creates
+    # arriving on a worker within task_group_commit_window_ms of the first one
+    # are written together, one multi-row INSERT and one commit for up to
+    # task_group_commit_max_batch rows. 0 disables it (each request commits alone).
+    task_group_commit_window_ms: float = 0
+    task_group_commit_max_batch: int = 64
+
+    # Change feed (GET /api/tasks/changes): cursors older than this many days
+    # are refused with 410 and the client syncs from scratch. Tombstones of
+    # deleted tasks are kept a day longer, then pruned. 0 keeps them forever.
+    # The feed stops at the oldest transaction still open; once that has held
+    # a user's changes back for task_change_max_lag_seconds, the client is
+    # sent (410) to a sync without a cursor, which does not wait. 0 waits.
+    task_change_retention_days: int = 30
+    task_change_max_lag_seconds: int = 300
+
+    # Token-bucket limits on the auth routes ("20/minute"; empty disables a
+    # rule), checked before any database or bcrypt work. "memory" keeps
+    # buckets per process, "redis" shares them between replicas (REDIS_URL).
+    # Behind proxies, set how many of them append to X-Forwarded-For.
+    rate_limit_backend: str = "memory"
+    rate_limit_login_ip: str = "20/minute"
+    rate_limit_login_email: str = "10/minute"
+    rate_limit_register_ip: str = "10/hour"
+    rate_limit_trusted_proxies: int = 0
+
+    # Logging (app/logs.py): level, "json" or "text", queue capacity before
+    # records are dropped, per-route sampling of records below WARNING
+    # ("GET /api/tasks=0.1,POST /api/tasks=0.5") and the window in seconds in
+    # which a repeated exception is logged once
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    log_sample_rates: str = ""
+    log_dedup_window: float = 60.0
+
+    # Expose GET /metrics (Prometheus) and time every request by route
+    metrics_enabled: bool = True
+
+    # Serve /openapi.json from this file (written by `python -m app.openapi`)
+    # instead of generating the schema on its first request; see app/openapi.py
+    openapi_schema_file: str = ""
+
+    # Per-request SQL accounting (app/request_timing.py): send the
+    # Server-Timing header, and warn when a request sends more statements
+    # than the budget (0 disables the check; meant for development)
+    server_timing_enabled: bool = True
+    sql_statement_budget: int = 0
+
+    # Request profiling (app/profiling.py): fraction of requests to profile,
+    # a secret that profiles any request sending it in X-Debug-Profile, where
+    # the flamegraph files go and how many/how much of them to keep. Only
+    # requests slower than profile_min_duration_ms are kept when sampled.
+    profile_sample_rate: float = 0.0
+    profile_token: str = ""
+    profile_dir: str = "/tmp/todo-api-profiles"
+    profile_interval_ms: float = 5.0
+    profile_min_duration_ms: float = 0.0
+    profile_max_files: int = 200
+    profile_max_bytes: int = 50 * 1024 * 1024
+
+    # Production launcher (python -m app.server, app/server.py): "gunicorn"
+    # forks server_workers uvicorn processes from one preloaded app (0 sizes
+    # them from the container's CPU quota), "uvicorn" runs a single process.
+    # A worker is replaced after about server_max_requests requests (plus up
+    # to the jitter, so they do not all restart together); on shutdown,
+    # in-flight requests get server_graceful_timeout seconds to finish.
+    server_mode: str = "gunicorn"
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0
+    server_max_requests: int = 10000
+    server_max_requests_jitter: int = 1000
+    server_graceful_timeout: int = 30
+    server_keepalive: int = 5
+
     model_config = SettingsConfigDict(
         env_file=str(ENV_FILE) if ENV_FILE.exists() else ".env",
         env_file_encoding="utf-8",
@@ -39,15 +145,17 @@ try:
     if settings.cors_origins and settings.cors_origins.endswith("/"):
         settings.cors_origins = settings.cors_origins.rstrip("/")
 
-    print(f"✅ Settings initialized", file=sys.stderr, flush=True)
-    print(f"   DATABASE_URL: {'set' if settings.database_url else 'missing'}", file=sys.stderr, flush=True)
-    print(f"   BETTER_AUTH_SECRET: {'set' if settings.better_auth_secret else 'missing'}", file=sys.stderr, flush=True)
-    print(f"   CORS_ORIGINS: {settings.cors_origins or 'not set'}", file=sys.stderr, flush=True)
+    logger.info(
+        "Settings initialized",
+        extra={
+            "database_url": "set" if settings.database_url else "missing",
+            "better_auth_secret": "set" if settings.better_auth_secret else "missing",
+            "cors_origins": settings.cors_origins or "not set",
+        }
+    )
 
 except Exception as e:
-    print(f"⚠️ Warning: Settings initialization failed: {e}", file=sys.stderr, flush=True)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
+    logger.warning("Settings initialization failed: %s", e, exc_info=True)
 
     # Create a minimal settings object with fallback
     cors_origins = os.getenv("CORS_ORIGINS", "").rstrip("/")
@@ -1,32 +1,99 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
-import os
+from collections import OrderedDict
+from app.config import settings
+from app.metrics import JWT_DECODE_DURATION, JWT_VERIFICATIONS
+from app.request_timing import timed
+import time
 
-# Read secret from environment or settings
-def get_auth_secret():
-    # Try environment variable first (for Vercel)
-    secret = os.getenv("BETTER_AUTH_SECRET")
-    if secret:
-        return secret
+# Resolved once (at startup via load_auth_secret, or on first use) instead of per request
+_auth_secret: str | None = None
 
-    # Fall back to settings (reads from .env file)
-    try:
-        from app.config import settings
-        if settings.better_auth_secret:
-            return settings.better_auth_secret
-    except Exception:
-        pass
+def load_auth_secret() -> str:
+    """Resolve BETTER_AUTH_SECRET from settings (environment, then .env) and cache it"""
+    global _auth_secret
+    _auth_secret = settings.better_auth_secret or ""
+    return _auth_secret
+
+def get_auth_secret() -> str:
+    """Get the cached JWT secret, resolving it on first use"""
+    if _auth_secret is None:
+        return load_auth_secret()
+    return _auth_secret
+
+class VerifiedTokenCache:
+    """Bounded LRU of bearer tokens whose signature has already been verified
+
+    Entries are never served past their `exp` claim: an expired entry is
+    dropped on lookup and the token goes through full verification (which
+    rejects it). Tokens without `exp` are not cached.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[int, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> int | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user_id, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user_id
 
-    return ""
+    def put(self, token: str, user_id: int, expires_at) -> None:
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        self._entries[token] = (user_id, expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+token_cache = VerifiedTokenCache(settings.jwt_cache_size)
 
 security = HTTPBearer()
 
-def get_current_user_id(
+async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> int:
-    """Validates JWT and extracts user_id"""
-    token = credentials.credentials
+    """Validates JWT and extracts user_id
+
+    Declared async so FastAPI runs it on the event loop instead of
+    dispatching it to the threadpool on every request.
+    """
+    with timed("auth"):
+        return verify_token(credentials.credentials)
+
+def verify_token(token: str) -> int:
+    """user_id of a bearer token, from the verified-token cache or a signature check"""
+    cached_user_id = token_cache.get(token)
+    if cached_user_id is not None:
+        JWT_VERIFICATIONS.labels("cache_hit").inc()
+        return cached_user_id
+
     secret = get_auth_secret()
 
     if not secret:
@@ -36,22 +103,27 @@ def get_current_user_id(
         )
 
     try:
-        payload = jwt.decode(
-            token,
-            secret,
-            algorithms=["HS256"]
-        )
+        with JWT_DECODE_DURATION.time():
+            payload = jwt.decode(
+                token,
+                secret,
+                algorithms=["HS256"]
+            )
         user_id: int = payload.get("user_id")
 
         if user_id is None:
+            JWT_VERIFICATIONS.labels("invalid").inc()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token: missing user_id claim"
             )
 
+        token_cache.put(token, user_id, payload.get("exp"))
+        JWT_VERIFICATIONS.labels("verified").inc()
         return user_id
 
     except JWTError:
+        JWT_VERIFICATIONS.labels("invalid").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
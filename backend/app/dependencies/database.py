@@ -1,57 +1,269 @@
+from fastapi import HTTPException
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.config import settings
-import os
-import sys
+from app.metrics import instrument_engine
+from app.request_timing import instrument_statements
+import logging
+import math
+import threading
+import time
+import uuid
 
-# Create engine lazily to avoid connection errors at import time
+logger = logging.getLogger(__name__)
+
+# Create engines lazily to avoid connection errors at import time
 _engine = None
+_async_engine = None
+
+# libpq query parameters that asyncpg does not understand
+_ASYNCPG_UNSUPPORTED_PARAMS = ("sslmode", "channel_binding")
+
+# Named connection pool profiles, selected with DB_POOL_PROFILE
+POOL_PROFILES = {
+    # One connection per process: each serverless invocation serves one request at a time
+    "serverless": {"pool_size": 1, "max_overflow": 0, "pool_timeout": 30, "pool_recycle": 300},
+    # Long-running uvicorn worker serving many concurrent requests
+    "worker": {"pool_size": 10, "max_overflow": 10, "pool_timeout": 10, "pool_recycle": 1800},
+    # PgBouncer-style pooler in front of Postgres: open a connection per checkout, keep none
+    "external_pooler": None,
+}
+
+# Seconds to wait for a new connection, per profile (DB_CONNECT_TIMEOUT overrides).
+# An invocation or a pooler next to the app should fail fast rather than hang.
+CONNECT_TIMEOUTS = {"serverless": 5, "worker": 10, "external_pooler": 3}
+
+class PoolWaitStats:
+    """Checkout wait times of one engine's pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # Also called with each wait once the engine is instrumented (app/metrics.py)
+        self.observer = None
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+        if self.observer is not None:
+            self.observer(seconds, timed_out)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_avg_ms": round(self.wait_total / (self.checkouts or 1) * 1000, 3),
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+class _CheckoutTimingMixin:
+    """Times every pool checkout, including waits for a free connection and new connects"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+        # Called with the pool after each checkout and return once the engine
+        # is instrumented for multiprocess metrics (app/metrics.py)
+        self.usage_observer = None
+
+    def recreate(self):
+        # Keep the counters when the engine is disposed and the pool rebuilt
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        pool.usage_observer = self.usage_observer
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        if self.usage_observer is not None:
+            self.usage_observer(self)
+        return connection
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        if self.usage_observer is not None:
+            self.usage_observer(self)
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+class InstrumentedNullPool(_CheckoutTimingMixin, NullPool):
+    pass
+
+def get_pool_options(use_async: bool) -> dict:
+    """Engine keyword arguments for the configured pool profile
+
+    DB_POOL_PROFILE picks the profile; DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT and DB_POOL_RECYCLE override individual values.
+    """
+    profile_name = settings.db_pool_profile
+    if profile_name not in POOL_PROFILES:
+        raise ValueError(f"Unknown DB_POOL_PROFILE '{profile_name}'. Use one of: {', '.join(POOL_PROFILES)}")
+
+    profile = POOL_PROFILES[profile_name]
+    if profile is None:
+        return {"poolclass": InstrumentedNullPool}
+
+    overrides = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    options = {key: value if overrides[key] is None else overrides[key] for key, value in profile.items()}
+    options["poolclass"] = InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool
+    options["pool_pre_ping"] = True
+    return options
+
+def get_connect_timeout() -> float:
+    """Connect timeout in seconds for the configured pool profile"""
+    if settings.db_connect_timeout is not None:
+        return settings.db_connect_timeout
+    return CONNECT_TIMEOUTS.get(settings.db_pool_profile, 10)
+
+def uses_external_pooler() -> bool:
+    return settings.db_pool_profile == "external_pooler"
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+def get_pool_stats() -> dict:
+    """Runtime statistics of the engines created so far"""
+    stats = {"profile": settings.db_pool_profile}
+    engines = {"async": _async_engine.sync_engine if _async_engine else None, "sync": _engine}
+    for name, engine in engines.items():
+        if engine is None:
+            continue
+        pool = engine.pool
+        pool_stats = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            pool_stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+            })
+        if isinstance(pool, _CheckoutTimingMixin):
+            pool_stats.update(pool.wait_stats.snapshot())
+        stats[name] = pool_stats
+    return stats
+
+def get_database_url() -> str:
+    """Resolve and validate the PostgreSQL DATABASE_URL"""
+    # Settings read the environment, then the .env file
+    db_url = settings.database_url
+
+    if not db_url:
+        error_msg = "DATABASE_URL environment variable is not set"
+        logger.error("%s (checked the environment and settings)", error_msg)
+        raise ValueError(error_msg)
+
+    # Enforce PostgreSQL only - no SQLite support
+    if not db_url.startswith(("postgresql://", "postgres://")):
+        error_msg = f"Only PostgreSQL databases are supported. Current DATABASE_URL starts with: {db_url[:20]}..."
+        logger.error(error_msg)
+        raise ValueError("DATABASE_URL must be a PostgreSQL connection string (postgresql://...)")
+
+    return db_url
+
+def get_async_database_url() -> tuple[str, str]:
+    """Convert DATABASE_URL to an asyncpg URL
+
+    Returns the URL and the SSL mode to pass to asyncpg, since asyncpg
+    takes SSL settings as a connect argument rather than a query parameter.
+    """
+    url = make_url(get_database_url())
+    query = dict(url.query)
+    ssl_mode = query.get("sslmode", "require")
+    for param in _ASYNCPG_UNSUPPORTED_PARAMS:
+        query.pop(param, None)
+    url = url.set(drivername="postgresql+asyncpg", query=query)
+    return url.render_as_string(hide_password=False), ssl_mode
 
 def get_engine():
     global _engine
     if _engine is None:
-        # Get DATABASE_URL from settings (which reads from .env file or environment variables)
-        try:
-            db_url = os.getenv("DATABASE_URL") or (settings.database_url if settings else "")
-        except Exception as e:
-            print(f"⚠️ Error reading settings: {e}", file=sys.stderr, flush=True)
-            db_url = os.getenv("DATABASE_URL", "")
-
-        if not db_url:
-            error_msg = "DATABASE_URL environment variable is not set"
-            print(f"❌ {error_msg}", file=sys.stderr, flush=True)
-            print(f"   Checked os.getenv('DATABASE_URL'): {os.getenv('DATABASE_URL')}", file=sys.stderr, flush=True)
-            if settings:
-                print(f"   Checked settings.database_url: {settings.database_url}", file=sys.stderr, flush=True)
-            raise ValueError(error_msg)
-
-        # Enforce PostgreSQL only - no SQLite support
-        if not db_url.startswith(("postgresql://", "postgres://")):
-            error_msg = f"Only PostgreSQL databases are supported. Current DATABASE_URL starts with: {db_url[:20]}..."
-            print(f"❌ {error_msg}", file=sys.stderr, flush=True)
-            raise ValueError("DATABASE_URL must be a PostgreSQL connection string (postgresql://...)")
+        db_url = get_database_url()
+        # libpq takes whole seconds; an sslmode in the URL wins over the default
+        connect_args = {"connect_timeout": max(1, math.ceil(get_connect_timeout()))}
+        if "sslmode" not in make_url(db_url).query:
+            connect_args["sslmode"] = "require"
 
         try:
-            # For serverless, use connection pooling with appropriate settings
+            # Pool sizing comes from the DB_POOL_PROFILE deployment profile
             _engine = create_engine(
                 db_url,
                 echo=False,
-                pool_pre_ping=True,
-                pool_size=1,
-                max_overflow=0,
-                pool_recycle=300,  # Recycle connections after 5 minutes
-                connect_args={
-                    "connect_timeout": 10,  # 10 second connection timeout
-                    "sslmode": "require"
-                }
+                **get_pool_options(use_async=False),
+                connect_args=connect_args
             )
-            print("✅ Database engine created", file=sys.stderr, flush=True)
-        except Exception as e:
-            error_msg = f"Failed to create database engine: {str(e)}"
-            print(f"❌ {error_msg}", file=sys.stderr, flush=True)
+            instrument_engine(_engine, "sync")
+            instrument_statements(_engine)
+            logger.info("Database engine created", extra={"pool_profile": settings.db_pool_profile})
+        except Exception:
+            logger.exception("Failed to create database engine")
             raise
 
     return _engine
 
+def get_async_engine():
+    """Get the asyncpg engine used by the request handlers
+
+    Uses the same pool profile as get_engine(); the sync engine remains for
+    startup checks and maintenance scripts.
+    """
+    global _async_engine
+    if _async_engine is None:
+        async_url, ssl_mode = get_async_database_url()
+        connect_args = {"timeout": get_connect_timeout(), "ssl": ssl_mode}
+        if uses_external_pooler():
+            # A transaction pooler runs each transaction on whichever server
+            # connection is free, so a statement prepared on one is missing
+            # (or its name taken) on the next: keep no statement caches, and
+            # give the statements asyncpg prepares per query unique names
+            connect_args.update({
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+            })
+
+        try:
+            _async_engine = create_async_engine(
+                async_url,
+                echo=False,
+                **get_pool_options(use_async=True),
+                connect_args=connect_args
+            )
+            instrument_engine(_async_engine.sync_engine, "async")
+            instrument_statements(_async_engine.sync_engine)
+            logger.info("Async database engine created", extra={"pool_profile": settings.db_pool_profile})
+        except Exception:
+            logger.exception("Failed to create async database engine")
+            raise
+
+    return _async_engine
+
 def get_db_session():
     """Get database session with error handling for PostgreSQL database
 
@@ -68,10 +280,9 @@ def get_db_session():
             session.rollback()
         except Exception:
             pass  # Ignore rollback errors if session is already closed
-        error_msg = f"Database session error: {str(e)}"
-        print(f"❌ {error_msg}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+        # HTTPExceptions (404s, 401s, ...) are normal responses, not session errors
+        if not isinstance(e, HTTPException):
+            logger.exception("Database session error")
         # Re-raise to let FastAPI handle it properly
         raise
     finally:
@@ -80,3 +291,32 @@ def get_db_session():
             session.close()
         except Exception:
             pass  # Ignore close errors
+
+async def get_async_session():
+    """Get an async database session for request handlers
+
+    Queries run on asyncpg, so a slow round trip suspends the handler
+    instead of blocking the event loop. Objects stay loaded after commit
+    (expire_on_commit=False) because lazy refreshes are not possible
+    outside the greenlet bridge.
+    """
+    engine = get_async_engine()
+    session = AsyncSession(engine, expire_on_commit=False)
+    try:
+        yield session
+    except Exception as e:
+        # Rollback on any error to ensure data consistency
+        try:
+            await session.rollback()
+        except Exception:
+            pass  # Ignore rollback errors if session is already closed
+        if not isinstance(e, HTTPException):
+            logger.exception("Database session error")
+        # Re-raise to let FastAPI handle it properly
+        raise
+    finally:
+        # Always close the session to release connection back to pool
+        try:
+            await session.close()
+        except Exception:
+            pass  # Ignore close errors
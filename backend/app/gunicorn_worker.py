@@ -0,0 +1,28 @@
+"""
+Gunicorn worker class used by gunicorn.conf.py (see app/server.py).
+"""
+import warnings
+
+try:
+    from uvicorn_worker import UvicornWorker as BaseUvicornWorker
+except ImportError:
+    # Older home of the same class, deprecated by uvicorn in favour of uvicorn-worker
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+class UvicornWorker(BaseUvicornWorker):
+    """uvicorn worker that drains connections within gunicorn's graceful timeout
+
+    "auto" picks uvloop and httptools when they are installed. On SIGTERM
+    uvicorn stops accepting, closes idle keep-alive connections and waits
+    for in-flight requests; the wait is cut short a few seconds before
+    gunicorn's graceful_timeout, so the app's lifespan shutdown still runs
+    before gunicorn kills the worker.
+    """
+
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - 5)
@@ -0,0 +1,292 @@
+"""
+Structured logging for the API.
+
+configure_logging() installs one handler on the root logger that only puts
+records on a bounded in-memory queue; a background thread formats them
+(JSON by default) and writes them to stderr. A request never waits on the
+terminal or the log collector, and when the queue is full records are
+dropped and counted instead of blocking.
+
+Two filters run before a record is queued:
+- ExceptionDeduplicator: a traceback is written once per fingerprint
+  (exception type plus the frames it went through) per window; repeats are
+  dropped and counted on the next one that gets through.
+- RouteSampler: records below WARNING from requests to a configured route
+  are kept for a sampled fraction of requests (LOG_SAMPLE_RATES).
+
+Modules log through logging.getLogger(__name__) as usual. Keyword data goes
+in `extra`, e.g. logger.info("Task created", extra={"task_id": task.id}),
+and is emitted as JSON fields.
+"""
+import atexit
+import contextvars
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import traceback
+import uuid
+from datetime import datetime, timezone
+
+# Per-request state shared with the filters and formatter: the ASGI scope
+# (routing fills in the matched route), a request id and the sampling decision
+_request_context: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_context", default=None)
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {
+    "message", "asctime", "exc_fingerprint", "exc_repeated", "taskName",
+}
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: "DroppingQueueHandler | None" = None
+
+def route_key(scope: dict) -> str:
+    """'METHOD /path/{template}' of the route that handled a request (raw path before routing)"""
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}"
+
+def request_fields() -> dict:
+    """Request id and route of the request being handled, if any"""
+    context = _request_context.get()
+    if context is None:
+        return {}
+    return {"request_id": context["request_id"], "route": route_key(context["scope"])}
+
+class RequestLogContext:
+    """ASGI middleware that makes the current request visible to log records"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        token = _request_context.set({"scope": scope, "request_id": request_id or uuid.uuid4().hex[:16]})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_context.reset(token)
+
+def exception_fingerprint(exc_info) -> str:
+    """Stable id of an exception: its type and the code locations in its traceback
+
+    The message is left out so the same failure with different values
+    (ids, connection details) shares one fingerprint.
+    """
+    exc_type, _, tb = exc_info
+    parts = [f"{exc_type.__module__}.{exc_type.__qualname__}"]
+    while tb is not None:
+        parts.append(f"{tb.tb_frame.f_code.co_filename}:{tb.tb_frame.f_code.co_name}:{tb.tb_lineno}")
+        tb = tb.tb_next
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=6).hexdigest()
+
+class ExceptionDeduplicator(logging.Filter):
+    """Let one record per exception fingerprint through per `window` seconds"""
+
+    def __init__(self, window: float, max_fingerprints: int = 1000):
+        super().__init__()
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        # fingerprint -> [time last let through, records dropped since]
+        self._seen: dict[str, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not record.exc_info or record.exc_info[0] is None:
+            return True
+        fingerprint = exception_fingerprint(record.exc_info)
+        record.exc_fingerprint = fingerprint
+        now = time.monotonic()
+        seen = self._seen.get(fingerprint)
+        if seen is not None and now - seen[0] < self.window:
+            seen[1] += 1
+            return False
+        record.exc_repeated = seen[1] if seen is not None else 0
+        if seen is None and len(self._seen) >= self.max_fingerprints:
+            self._seen.pop(next(iter(self._seen)))
+        self._seen[fingerprint] = [now, 0]
+        return True
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """Parse LOG_SAMPLE_RATES: 'GET /api/tasks=0.1,POST /api/tasks=0.5'"""
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        route, _, rate = item.rpartition("=")
+        try:
+            rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            raise ValueError(f"Invalid LOG_SAMPLE_RATES entry '{item.strip()}': expected 'METHOD /path=rate'")
+    return rates
+
+class RouteSampler(logging.Filter):
+    """Keep records below WARNING for a fraction of the requests to each configured route
+
+    The decision is made once per request, so a sampled request keeps all of
+    its records and the others keep none.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        context = _request_context.get()
+        if context is None:
+            return True
+        sampled = context.get("sampled")
+        if sampled is None:
+            rate = self.rates.get(route_key(context["scope"]), 1.0)
+            sampled = context["sampled"] = rate >= 1.0 or random.random() < rate
+        return sampled
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when the queue is full
+
+    Formatting is left to the listener thread; only the message and the
+    request fields are resolved here, while the caller's state is current.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        for key, value in request_fields().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, extra fields and exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and record.exc_info[0] is not None:
+            exc_type, exc_value, _ = record.exc_info
+            entry["exception"] = {
+                "type": exc_type.__name__,
+                "message": str(exc_value),
+                "fingerprint": getattr(record, "exc_fingerprint", None) or exception_fingerprint(record.exc_info),
+                "repeated": getattr(record, "exc_repeated", 0),
+                "traceback": "".join(traceback.format_exception(*record.exc_info)),
+            }
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development (LOG_FORMAT=text)"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = {
+            key: value for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_")
+        }
+        if fields:
+            first_line, newline, rest = line.partition("\n")
+            line = f"{first_line} {fields}{newline}{rest}"
+        if getattr(record, "exc_repeated", 0):
+            line += f"\n(same exception dropped {record.exc_repeated} times since it was last logged)"
+        return line
+
+def configure_logging(
+    level: str | None = None,
+    log_format: str | None = None,
+    queue_size: int | None = None,
+    sample_rates: str | None = None,
+    dedup_window: float | None = None,
+) -> None:
+    """Install the queued handler on the root logger (once per process)
+
+    Arguments default to the LOG_* settings.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    from app.config import settings
+
+    log_queue = queue.Queue(maxsize=queue_size or settings.log_queue_size)
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if (log_format or settings.log_format).lower() == "text":
+        stream_handler.setFormatter(TextFormatter())
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(ExceptionDeduplicator(settings.log_dedup_window if dedup_window is None else dedup_window))
+    _queue_handler.addFilter(RouteSampler(parse_sample_rates(settings.log_sample_rates if sample_rates is None else sample_rates)))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(_stop_listener)
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel((level or settings.log_level).upper())
+
+def _stop_listener() -> None:
+    """Write out the queued records and stop the listener thread"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+def _start_listener() -> None:
+    if _listener is not None and _listener._thread is None:
+        _listener.start()
+
+def _restart_listener_in_child() -> None:
+    if _queue_handler is not None:
+        _queue_handler.dropped = 0
+    _start_listener()
+
+# Threads do not survive fork(). With the app preloaded by gunicorn the
+# workers would inherit a queue nobody reads, so the listener is stopped
+# around the fork (flushing the parent's records first) and started again
+# on both sides.
+os.register_at_fork(
+    before=_stop_listener,
+    after_in_parent=_start_listener,
+    after_in_child=_restart_listener_in_child,
+)
+
+def logging_stats() -> dict:
+    """Queue depth and dropped records, for health checks"""
+    if _queue_handler is None:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "queued": _queue_handler.queue.qsize(),
+        "queue_size": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+    }
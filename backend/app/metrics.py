@@ -0,0 +1,255 @@
+"""
+Prometheus metrics for the API.
+
+Request latency and in-flight requests come from MetricsMiddleware (one
+histogram observation per request, labelled with the route template rather
+than the raw path). Database, password hashing and JWT timings are fed by
+hooks in the modules that do the work; every hook is a single observe() on a
+pre-bound label set, cheap enough to leave on in production.
+
+GET /metrics (app/routes/metrics.py) renders the default registry. When
+PROMETHEUS_MULTIPROC_DIR is set (several worker processes), values from all
+workers are aggregated from that directory instead. Pool usage is read at
+scrape time in a single process; in multiprocess mode each worker writes it
+on every checkout and return, and /metrics sums the live workers.
+
+With METRICS_ENABLED=false the metrics are NullMetric stand-ins and
+prometheus_client is not imported at all.
+"""
+import contextlib
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from starlette.routing import Match
+from app.config import settings
+
+class NullMetric:
+    """Stands in for every metric when METRICS_ENABLED is false (no-op)
+
+    The hooks keep calling labels()/observe()/inc(), but prometheus_client
+    is never imported, which keeps it out of the import time of the app.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def labels(self, *labels):
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def time(self):
+        return contextlib.nullcontext()
+
+if settings.metrics_enabled:
+    from prometheus_client import Counter, Gauge, Histogram
+else:
+    Counter = Gauge = Histogram = NullMetric
+
+# Any other request method is labelled "OTHER", so clients cannot add series
+METRIC_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+# Request latencies from a cached read (~1 ms) to a slow batch write (seconds)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Pool checkouts are usually microseconds; waits for a free connection go up to DB_POOL_TIMEOUT
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# bcrypt at the default cost takes a few hundred milliseconds
+PASSWORD_HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+JWT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)
+# Rows per group commit of task creates, up to TASK_GROUP_COMMIT_MAX_BATCH
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template and status",
+    ["method", "route", "status"], buckets=REQUEST_BUCKETS
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests being served", ["method"], multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time to check a connection out of the pool, including connects",
+    ["engine"], buckets=CHECKOUT_BUCKETS
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT", ["engine"]
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Time from sending a statement to its result", ["engine"], buckets=QUERY_BUCKETS
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds", "bcrypt time in the hashing pool", ["operation"], buckets=PASSWORD_HASH_BUCKETS
+)
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "password_hash_queue_wait_seconds", "Time waiting for a free hashing thread", ["operation"], buckets=PASSWORD_HASH_BUCKETS
+)
+JWT_DECODE_DURATION = Histogram(
+    "jwt_decode_duration_seconds", "Signature verification and decoding of bearer tokens", buckets=JWT_BUCKETS
+)
+JWT_VERIFICATIONS = Counter(
+    "jwt_verifications_total", "Bearer token checks by outcome (cache_hit, verified, invalid)", ["result"]
+)
+AUTH_RATE_LIMITED = Counter(
+    "auth_rate_limited_total", "Login and register requests answered 429, by rule", ["rule"]
+)
+TASK_GROUP_COMMIT_BATCH_SIZE = Histogram(
+    "task_group_commit_batch_size", "Task creates written by one group commit", buckets=BATCH_SIZE_BUCKETS
+)
+TASK_GROUP_COMMIT_DURATION = Histogram(
+    "task_group_commit_duration_seconds", "Time to insert and commit one group of task creates", buckets=QUERY_BUCKETS
+)
+TASK_GROUP_COMMIT_FALLBACKS = Counter(
+    "task_group_commit_fallbacks_total", "Group commits that failed and were retried one row per transaction"
+)
+TASK_CHANGE_FEED_STALLS = Counter(
+    "task_change_feed_stalls_total", "Change feed calls answered 410 because an open transaction held changes back too long"
+)
+
+POOL_GAUGES = {
+    "size": "Connections the pool keeps open",
+    "checked_out": "Connections in use",
+    "checked_in": "Idle connections in the pool",
+    "overflow": "Connections open beyond pool_size",
+}
+# Written by the workers in multiprocess mode only. Not registered: a single
+# process reports the same names through PoolCollector instead.
+DB_POOL_USAGE = {
+    key: Gauge(f"db_pool_{key}", description, ["engine"], registry=None, multiprocess_mode="livesum")
+    for key, description in POOL_GAUGES.items()
+}
+
+def route_template(scope: dict) -> str:
+    """Path template of the route that served a request ("unmatched" for 404s)
+
+    Starlette records the matched route in the scope; older versions only
+    record the endpoint, so the app's routes are matched again there.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", "unmatched")
+    return "unmatched"
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"] if scope["method"] in METRIC_METHODS else "OTHER"
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        # Stays 500 when the app raises before sending a response
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            HTTP_REQUEST_DURATION.labels(method, route_template(scope), str(status)).observe(elapsed)
+
+def instrument_engine(engine, name: str) -> None:
+    """Record statement durations and pool checkout waits of a sync engine
+
+    Pass `async_engine.sync_engine` for an AsyncEngine; its cursor events
+    wrap the awaited round trip to the database.
+    """
+    if not settings.metrics_enabled:
+        return
+    query_duration = DB_QUERY_DURATION.labels(name)
+    checkout_wait = DB_POOL_CHECKOUT_WAIT.labels(name)
+    checkout_timeouts = DB_POOL_CHECKOUT_TIMEOUTS.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query_duration(conn, cursor, statement, parameters, context, executemany):
+        query_duration.observe(time.perf_counter() - context._metrics_query_start)
+
+    def record_checkout(seconds: float, timed_out: bool) -> None:
+        checkout_wait.observe(seconds)
+        if timed_out:
+            checkout_timeouts.inc()
+
+    wait_stats = getattr(engine.pool, "wait_stats", None)
+    if wait_stats is not None:
+        wait_stats.observer = record_checkout
+
+    pool = engine.pool
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ and isinstance(pool, QueuePool) and hasattr(pool, "usage_observer"):
+        usage = {key: gauge.labels(name) for key, gauge in DB_POOL_USAGE.items()}
+
+        def record_usage(pool) -> None:
+            usage["size"].set(pool.size())
+            usage["checked_out"].set(pool.checkedout())
+            usage["checked_in"].set(pool.checkedin())
+            usage["overflow"].set(max(0, pool.overflow()))
+
+        pool.usage_observer = record_usage
+        record_usage(pool)
+
+class PoolCollector:
+    """Connection pool usage gauges, read from get_pool_stats() at scrape time (single process)"""
+
+    def describe(self):
+        # Nothing to check at registration; collect() imports the database module lazily
+        return []
+
+    def collect(self):
+        from prometheus_client.core import GaugeMetricFamily
+        from app.dependencies.database import get_pool_stats
+
+        stats = get_pool_stats()
+        families = {
+            key: GaugeMetricFamily(f"db_pool_{key}", description, labels=["engine"])
+            for key, description in POOL_GAUGES.items()
+        }
+        for engine in ("async", "sync"):
+            for key, family in families.items():
+                if key in stats.get(engine, {}):
+                    family.add_metric([engine], stats[engine][key])
+        return list(families.values())
+
+if settings.metrics_enabled:
+    from prometheus_client import REGISTRY
+    REGISTRY.register(PoolCollector())
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition-format body and content type for GET /metrics"""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
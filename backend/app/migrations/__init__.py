@@ -0,0 +1 @@
+# Versioned schema migrations (run with: python -m app.migrations)
@@ -0,0 +1,47 @@
+"""
+Schema migration CLI.
+
+Run from the backend directory:
+    python -m app.migrations status        # show current and pending versions
+    python -m app.migrations upgrade       # apply all pending migrations
+    python -m app.migrations upgrade --to 2
+"""
+import argparse
+import sys
+from app.dependencies.database import get_engine
+from app.logs import configure_logging
+from app.migrations.runner import apply_migrations, get_current_version, get_pending_migrations
+from app.migrations.versions import LATEST_VERSION
+
+def status():
+    with get_engine().connect() as connection:
+        current = get_current_version(connection)
+    print(f"Current schema version: {current} (latest: {LATEST_VERSION})", file=sys.stderr, flush=True)
+    for version, description, _ in get_pending_migrations(current):
+        print(f"  pending {version}: {description}", file=sys.stderr, flush=True)
+
+def upgrade(target: int | None):
+    with get_engine().begin() as connection:
+        applied = apply_migrations(connection, target)
+    if applied:
+        print(f"✅ Schema upgraded to version {applied[-1]}", file=sys.stderr, flush=True)
+    else:
+        print("✅ Schema already up to date", file=sys.stderr, flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subcommands = parser.add_subparsers(dest="command")
+    subcommands.add_parser("status", help="show applied and pending migrations")
+    upgrade_parser = subcommands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, default=None, help="stop at this version")
+    args = parser.parse_args()
+    configure_logging(log_format="text")
+
+    try:
+        if args.command == "status":
+            status()
+        else:
+            upgrade(getattr(args, "to", None))
+    except Exception as e:
+        print(f"❌ Migration failed: {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
@@ -0,0 +1,84 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from app.migrations.versions import MIGRATIONS, LATEST_VERSION
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_xact_lock so concurrent runners apply migrations one at a time
+MIGRATION_LOCK_ID = 72403019
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    description TEXT NOT NULL,
+    applied_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+)
+"""
+
+def get_current_version(connection: Connection) -> int:
+    """Highest applied migration version, 0 for a database not yet under migrations
+
+    This is the only query app startup runs against the schema.
+    """
+    try:
+        version = connection.execute(text("SELECT max(version) FROM schema_version")).scalar()
+    except DBAPIError:
+        # schema_version does not exist yet
+        connection.rollback()
+        return 0
+    return version or 0
+
+def get_pending_migrations(current_version: int, target: int | None = None) -> list:
+    """Migrations newer than `current_version`, up to `target` if given"""
+    return [
+        migration for migration in MIGRATIONS
+        if migration[0] > current_version and (target is None or migration[0] <= target)
+    ]
+
+def apply_migrations(connection: Connection, target: int | None = None) -> list[int]:
+    """Apply pending migrations on `connection` and return the versions applied
+
+    Runs inside the caller's transaction: every pending migration is applied
+    or none is. A transaction-scoped advisory lock serialises concurrent
+    runners (e.g. several pods starting together).
+    """
+    connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+    connection.execute(text(SCHEMA_VERSION_DDL))
+    current = connection.execute(text("SELECT coalesce(max(version), 0) FROM schema_version")).scalar()
+
+    applied = []
+    for version, description, statements in get_pending_migrations(current, target):
+        for statement in statements:
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO schema_version (version, description) VALUES (:version, :description)"),
+            {"version": version, "description": description}
+        )
+        logger.info("Applied migration %s: %s", version, description, extra={"schema_version": version})
+        applied.append(version)
+    return applied
+
+async def check_schema_version(engine) -> int:
+    """Startup check: one version query, plus an upgrade when AUTO_MIGRATE is set
+
+    Returns the schema version the database is at afterwards.
+    """
+    async with engine.connect() as connection:
+        current = await connection.run_sync(get_current_version)
+
+    if current >= LATEST_VERSION:
+        return current
+
+    if settings.auto_migrate:
+        async with engine.begin() as connection:
+            applied = await connection.run_sync(apply_migrations)
+        return applied[-1] if applied else current
+
+    logger.warning(
+        "Database schema is at version %s, code expects %s. Run: python -m app.migrations upgrade",
+        current, LATEST_VERSION
+    )
+    return current
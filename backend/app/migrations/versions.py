@@ -0,0 +1,196 @@
+"""Ordered schema migrations
+
+Each entry is (version, description, statements). Pending versions are
+applied in order in one transaction and recorded in the schema_version table.
+Statements go through sqlalchemy.text(), so write casts as CAST(...) rather
+than "::". Never edit a migration that has been released; append a new one.
+"""
+
+MIGRATIONS = [
+    (
+        1,
+        "baseline users and tasks schema",
+        [
+            # Matches what SQLModel.metadata.create_all produced for the original models
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id SERIAL PRIMARY KEY,
+                email VARCHAR(255) NOT NULL,
+                password_hash VARCHAR(255) NOT NULL,
+                name VARCHAR(255),
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+            )
+            """,
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)",
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES users (id),
+                title VARCHAR(255) NOT NULL,
+                description VARCHAR,
+                priority VARCHAR NOT NULL DEFAULT 'medium',
+                status VARCHAR NOT NULL DEFAULT 'pending',
+                due_date TIMESTAMP WITHOUT TIME ZONE,
+                created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+                updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_tasks_user_id ON tasks (user_id)",
+            # Columns added after the first deployments (previously patched at import time)
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS name VARCHAR(255)",
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS priority VARCHAR(20) DEFAULT 'medium' NOT NULL",
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'pending' NOT NULL",
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS due_date TIMESTAMP",
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+            # Defaults and constraints from fix_tasks_table.py
+            "UPDATE tasks SET priority = 'medium' WHERE priority IS NULL",
+            "UPDATE tasks SET status = 'pending' WHERE status IS NULL",
+            """
+            ALTER TABLE tasks
+                ALTER COLUMN priority SET DEFAULT 'medium',
+                ALTER COLUMN priority SET NOT NULL,
+                ALTER COLUMN status SET DEFAULT 'pending',
+                ALTER COLUMN status SET NOT NULL,
+                ALTER COLUMN updated_at SET DEFAULT CURRENT_TIMESTAMP
+            """,
+            # Legacy boolean column replaced by status; only present on old databases
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'tasks' AND column_name = 'completed'
+                ) THEN
+                    ALTER TABLE tasks ALTER COLUMN completed DROP NOT NULL;
+                    ALTER TABLE tasks ALTER COLUMN completed SET DEFAULT NULL;
+                END IF;
+            END $$
+            """,
+        ],
+    ),
+    (
+        2,
+        "composite indexes for keyset pagination of tasks",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_tasks_user_created_at_id ON tasks (user_id, created_at, id)",
+            "CREATE INDEX IF NOT EXISTS ix_tasks_user_due_date_id ON tasks (user_id, due_date, id)",
+            "CREATE INDEX IF NOT EXISTS ix_tasks_user_status_due_date_id ON tasks (user_id, status, due_date, id)",
+        ],
+    ),
+    (
+        3,
+        "index for per-user task list versions (ETags)",
+        [
+            "CREATE INDEX IF NOT EXISTS ix_tasks_user_updated_at ON tasks (user_id, updated_at)",
+        ],
+    ),
+    (
+        4,
+        "full-text search vector and trigram index for task search",
+        [
+            # Rewrites the table once; title matches rank above description matches
+            """
+            ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+                ) STORED
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+            # pg_trgm powers typo-tolerant title matching. Search falls back to
+            # full-text only where the extension is unavailable or not permitted.
+            """
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                    BEGIN
+                        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                    EXCEPTION WHEN insufficient_privilege THEN
+                        RAISE NOTICE 'pg_trgm not installed: insufficient privilege';
+                    END;
+                END IF;
+                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                    EXECUTE 'CREATE INDEX IF NOT EXISTS ix_tasks_title_trgm ON tasks USING GIN (title gin_trgm_ops)';
+                END IF;
+            END $$
+            """,
+        ],
+    ),
+    (
+        5,
+        "per-user task counters for GET /api/tasks/stats",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS task_stats (
+                user_id INTEGER PRIMARY KEY REFERENCES users (id),
+                total INTEGER NOT NULL DEFAULT 0,
+                pending INTEGER NOT NULL DEFAULT 0,
+                completed INTEGER NOT NULL DEFAULT 0,
+                priority_low INTEGER NOT NULL DEFAULT 0,
+                priority_medium INTEGER NOT NULL DEFAULT 0,
+                priority_high INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS task_due_stats (
+                user_id INTEGER NOT NULL REFERENCES users (id),
+                due_day DATE NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                pending INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, due_day)
+            )
+            """,
+            # Backfill from existing tasks; later writes keep the counters current
+            """
+            INSERT INTO task_stats (user_id, total, pending, completed, priority_low, priority_medium, priority_high)
+            SELECT user_id, count(*),
+                   count(*) FILTER (WHERE status = 'pending'),
+                   count(*) FILTER (WHERE status = 'completed'),
+                   count(*) FILTER (WHERE priority = 'low'),
+                   count(*) FILTER (WHERE priority = 'medium'),
+                   count(*) FILTER (WHERE priority = 'high')
+            FROM tasks GROUP BY user_id
+            ON CONFLICT (user_id) DO NOTHING
+            """,
+            """
+            INSERT INTO task_due_stats (user_id, due_day, total, pending)
+            SELECT user_id, CAST(due_date AS DATE), count(*), count(*) FILTER (WHERE status = 'pending')
+            FROM tasks WHERE due_date IS NOT NULL
+            GROUP BY user_id, CAST(due_date AS DATE)
+            ON CONFLICT (user_id, due_day) DO NOTHING
+            """,
+        ],
+    ),
+    (
+        6,
+        "change positions and tombstones for GET /api/tasks/changes",
+        [
+            # Existing rows get 0 without a table rewrite (they come first in a
+            # full sync); new writes record their transaction id. Needs PostgreSQL 13+.
+            "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0",
+            "ALTER TABLE tasks ALTER COLUMN change_xid SET DEFAULT CAST(CAST(pg_current_xact_id() AS text) AS BIGINT)",
+            "CREATE INDEX IF NOT EXISTS ix_tasks_user_change_xid_id ON tasks (user_id, change_xid, id)",
+            """
+            CREATE TABLE IF NOT EXISTS task_tombstones (
+                task_id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES users (id),
+                change_xid BIGINT NOT NULL DEFAULT CAST(CAST(pg_current_xact_id() AS text) AS BIGINT),
+                deleted_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS ix_task_tombstones_user_change_xid_task_id ON task_tombstones (user_id, change_xid, task_id)",
+        ],
+    ),
+    (
+        7,
+        "per-user task list version for ETags",
+        [
+            # Set by every task write; replaces the count/max/sum aggregate over
+            # the user's tasks, whose index is no longer needed
+            "ALTER TABLE task_stats ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0",
+            "DROP INDEX IF EXISTS ix_tasks_user_updated_at",
+        ],
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
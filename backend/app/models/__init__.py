@@ -1,4 +1,6 @@
 from app.models.user import User
 from app.models.task import Task
+from app.models.task_stats import TaskStats, TaskDueStats
+from app.models.task_tombstone import TaskTombstone
 
-__all__ = ["User", "Task"]
+__all__ = ["User", "Task", "TaskStats", "TaskDueStats", "TaskTombstone"]
@@ -1,11 +1,25 @@
 from sqlmodel import SQLModel, Field, Column
-from sqlalchemy import DateTime, func
+from sqlalchemy import BigInteger, DateTime, Index, Text, cast, func
 from datetime import datetime
 from typing import Optional
 
+def current_xact_id():
+    """64-bit id of the writing transaction (xid8, PostgreSQL 13+) as a BIGINT"""
+    return cast(cast(func.pg_current_xact_id(), Text), BigInteger)
+
 class Task(SQLModel, table=True):
     __tablename__ = "tasks"
+    # Composite indexes backing keyset pagination and conditional reads of GET /api/tasks
+    __table_args__ = (
+        Index("ix_tasks_user_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_tasks_user_status_due_date_id", "user_id", "status", "due_date", "id"),
+        # Position of each row in the change feed (GET /api/tasks/changes)
+        Index("ix_tasks_user_change_xid_id", "user_id", "change_xid", "id"),
+    )
 
+    # tasks.search_vector (generated tsvector, migration 4) is deliberately not
+    # mapped: only GET /api/tasks/search reads it, via literal_column
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id", nullable=False, index=True)
     title: str = Field(max_length=255, nullable=False)
@@ -15,3 +29,8 @@ class Task(SQLModel, table=True):
     due_date: Optional[datetime] = Field(default=None)
     created_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, server_default=func.now()))
     updated_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime, server_default=func.now(), onupdate=func.now()))
+    # Transaction that last wrote the row; set by the database on every INSERT and UPDATE
+    change_xid: Optional[int] = Field(
+        default=None,
+        sa_column=Column(BigInteger, nullable=False, server_default=current_xact_id(), onupdate=current_xact_id())
+    )
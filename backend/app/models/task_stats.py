@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import BigInteger
+from datetime import date
+
+class TaskStats(SQLModel, table=True):
+    """Per-user task counters, updated in the same transaction as every task write"""
+    __tablename__ = "task_stats"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    total: int = Field(default=0, nullable=False)
+    pending: int = Field(default=0, nullable=False)
+    completed: int = Field(default=0, nullable=False)
+    priority_low: int = Field(default=0, nullable=False)
+    priority_medium: int = Field(default=0, nullable=False)
+    priority_high: int = Field(default=0, nullable=False)
+    # Id of the last transaction that wrote one of the user's tasks; the task list ETags derive from it
+    version: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, server_default="0"))
+
+class TaskDueStats(SQLModel, table=True):
+    """Per-user task counts for each due day; days without tasks have no row"""
+    __tablename__ = "task_due_stats"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    due_day: date = Field(primary_key=True)
+    total: int = Field(default=0, nullable=False)
+    pending: int = Field(default=0, nullable=False)
@@ -0,0 +1,21 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import BigInteger, DateTime, Index, func
+from datetime import datetime
+from typing import Optional
+from app.models.task import current_xact_id
+
+class TaskTombstone(SQLModel, table=True):
+    """A deleted task, kept so GET /api/tasks/changes can report the deletion"""
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_user_change_xid_task_id", "user_id", "change_xid", "task_id"),
+    )
+
+    task_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    user_id: int = Field(foreign_key="users.id", nullable=False)
+    change_xid: Optional[int] = Field(
+        default=None, sa_column=Column(BigInteger, nullable=False, server_default=current_xact_id())
+    )
+    deleted_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime, nullable=False, server_default=func.now())
+    )
@@ -0,0 +1,67 @@
+"""
+Precomputed OpenAPI schema.
+
+FastAPI builds the schema the first time /openapi.json (or /docs) is
+requested, walking every route and model; that takes tens of milliseconds
+on a warm machine and more on a cold serverless instance. The schema only
+changes with the code, so it can be built once:
+
+    python -m app.openapi openapi.json
+
+With OPENAPI_SCHEMA_FILE pointing at the file, the app loads it at import
+(under a millisecond) instead. The file carries a fingerprint of the
+backend's source files; when the code it was built from has changed, the
+file is ignored with a warning and the schema is generated on demand, so a
+stale schema is never served.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent
+FINGERPRINT_KEY = "x-source-fingerprint"
+
+def source_fingerprint() -> str:
+    """Hash of the Python sources under app/ and api/"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted([*BACKEND_DIR.glob("app/**/*.py"), *BACKEND_DIR.glob("api/**/*.py")]):
+        digest.update(path.relative_to(BACKEND_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+def write_schema(app, path: str) -> None:
+    """Generate the app's schema and write it with the current fingerprint"""
+    schema = {**app.openapi(), FINGERPRINT_KEY: source_fingerprint()}
+    Path(path).write_text(json.dumps(schema, separators=(",", ":")))
+
+def load_precomputed_schema(app, path: str) -> bool:
+    """Install the schema from `path` on the app if it matches the current sources"""
+    try:
+        schema = json.loads(Path(path).read_text())
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read OpenAPI schema file %s: %s", path, e)
+        return False
+    if schema.pop(FINGERPRINT_KEY, None) != source_fingerprint():
+        logger.warning("OpenAPI schema file %s was built from other sources; generating the schema on demand", path)
+        return False
+    # FastAPI's documented hook for a custom schema; setting only
+    # app.openapi_schema is not enough on versions that regenerate it when
+    # the route table changes
+    app.openapi_schema = schema
+    app.openapi = lambda: schema
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="where to write the schema, e.g. openapi.json")
+    args = parser.parse_args()
+
+    from api.index import app
+
+    write_schema(app, args.output)
+    print(f"Wrote the OpenAPI schema to {args.output}", file=sys.stderr, flush=True)
@@ -0,0 +1,222 @@
+"""
+Sampled request profiling.
+
+RequestProfiler (ASGI middleware) profiles a PROFILE_SAMPLE_RATE fraction of
+requests, plus any request whose X-Debug-Profile header matches
+PROFILE_TOKEN. A profiled request registers with one shared StackSampler
+thread, which wakes every PROFILE_INTERVAL_MS while a profile is running
+and reads the event loop thread's stack. Unprofiled requests only pay for a
+random() call (and a header lookup when a token is configured).
+
+Samples are wall clock. A sample counts towards the request when its
+coroutine is running, and is then recorded with the request's own frames
+under the route. The rest of its time is recorded as "(awaiting: loop idle)",
+which means waiting on the database, bcrypt or the network, or as
+"(awaiting: other requests running)", which means the loop was busy
+elsewhere. Code the request runs in worker threads shows up as awaiting.
+
+Each profile is written as collapsed stacks ("frame;frame;frame
+microseconds" per line), which flamegraph.pl, speedscope and inferno read
+directly. File names carry the time, route, duration and request id, and
+the directory is pruned to PROFILE_MAX_FILES / PROFILE_MAX_BYTES, oldest
+first.
+"""
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from app.logs import request_fields, route_key
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".folded"
+# Profiles running at once; further sampled requests are served unprofiled
+MAX_CONCURRENT_PROFILES = 4
+# Innermost frames of an event loop with nothing to run (asyncio selector loop or uvloop)
+IDLE_FRAMES = {"select", "poll", "_run_once", "run_forever", "run_until_complete", "run"}
+
+def frame_label(code) -> str:
+    """'function (package/module.py:line)' for a code object"""
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+class ProfileSession:
+    """Stacks sampled for one request, weighted by microseconds"""
+
+    def __init__(self, thread_id: int, anchor):
+        self.thread_id = thread_id
+        # Frame of the middleware coroutine: samples whose stack passes through it belong to this request
+        self.anchor = anchor
+        self.stacks: Counter = Counter()
+        self.last_sample = time.perf_counter()
+
+    def sample(self, frame, now: float) -> None:
+        weight = int((now - self.last_sample) * 1_000_000)
+        self.last_sample = now
+        if frame is None or weight <= 0:
+            return
+        labels = []
+        innermost = frame
+        while frame is not None and frame is not self.anchor:
+            labels.append(frame_label(frame.f_code))
+            frame = frame.f_back
+        if frame is None:
+            idle = innermost.f_code.co_name in IDLE_FRAMES
+            self.stacks["(awaiting: loop idle)" if idle else "(awaiting: other requests running)"] += weight
+        else:
+            # The frame just inside the anchor is the next middleware; keep everything from there on
+            self.stacks[";".join(reversed(labels))] += weight
+
+    def folded(self, root: str) -> str:
+        root = root.replace(";", ",")
+        return "".join(f"{root};{stack} {weight}\n" for stack, weight in self.stacks.items())
+
+class StackSampler:
+    """Background thread sampling the threads that have a profile in progress
+
+    The thread sleeps on an event while no profile is running, so it costs
+    nothing between profiled requests.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._sessions: set[ProfileSession] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def active(self) -> int:
+        return len(self._sessions)
+
+    def add(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._wakeup.set()
+
+    def remove(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._wakeup.clear()
+            self._wakeup.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            with self._lock:
+                sessions = list(self._sessions)
+            for session in sessions:
+                session.sample(frames.get(session.thread_id), now)
+            del frames
+
+def profile_file_name(started: datetime, route: str, duration_ms: float, request_id: str) -> str:
+    """e.g. 20261017T101500.123Z_GET_api_tasks_task_id_154ms_3f2a9c1d.folded"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:80]
+    timestamp = started.strftime("%Y%m%dT%H%M%S.") + f"{started.microsecond // 1000:03d}Z"
+    request_id = re.sub(r"[^A-Za-z0-9-]+", "", request_id)[:32]
+    return f"{timestamp}_{slug}_{round(duration_ms)}ms_{request_id}{PROFILE_SUFFIX}"
+
+def prune_profiles(directory: Path, max_files: int, max_bytes: int) -> None:
+    """Delete the oldest profiles until the directory is within both limits"""
+    profiles = []
+    for path in directory.glob(f"*{PROFILE_SUFFIX}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        profiles.append((stat.st_mtime, stat.st_size, path))
+    profiles.sort()
+    total = sum(size for _, size, _ in profiles)
+    while profiles and (len(profiles) > max_files or total > max_bytes):
+        _, size, path = profiles.pop(0)
+        path.unlink(missing_ok=True)
+        total -= size
+
+class RequestProfiler:
+    """ASGI middleware that profiles sampled requests and writes one file per profile"""
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = 0.0,
+        token: str = "",
+        directory: str = "",
+        interval_ms: float = 5.0,
+        min_duration_ms: float = 0.0,
+        max_files: int = 200,
+        max_bytes: int = 50 * 1024 * 1024,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token.encode() if token else None
+        self.directory = Path(directory)
+        self.min_duration_ms = min_duration_ms
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.sampler = StackSampler(interval_ms / 1000)
+
+    def requested(self, scope) -> bool:
+        """True when the request carries the configured debug token"""
+        if self.token is None:
+            return False
+        for name, value in scope.get("headers", ()):
+            if name == b"x-debug-profile":
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        requested = self.requested(scope)
+        if not requested and not (self.sample_rate and random.random() < self.sample_rate):
+            return await self.app(scope, receive, send)
+        if self.sampler.active >= MAX_CONCURRENT_PROFILES:
+            return await self.app(scope, receive, send)
+
+        request_id = request_fields().get("request_id") or os.urandom(8).hex()
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        started = datetime.now(timezone.utc)
+        session = ProfileSession(threading.get_ident(), sys._getframe())
+        start = time.perf_counter()
+        self.sampler.add(session)
+        try:
+            await self.app(scope, receive, send_with_profile_id if requested else send)
+        finally:
+            self.sampler.remove(session)
+            duration_ms = (time.perf_counter() - start) * 1000
+        if session.stacks and (requested or duration_ms >= self.min_duration_ms):
+            route = route_key(scope)
+            name = profile_file_name(started, route, duration_ms, request_id)
+            body = session.folded(f"{route} {duration_ms:.0f}ms")
+            try:
+                await asyncio.to_thread(self.write, name, body)
+            except OSError:
+                logger.exception("Could not write request profile", extra={"profile": name})
+            else:
+                logger.info("Request profile written", extra={"profile": name, "duration_ms": round(duration_ms, 1)})
+
+    def write(self, name: str, body: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / name).write_text(body)
+        prune_profiles(self.directory, self.max_files, self.max_bytes)
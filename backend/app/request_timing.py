@@ -0,0 +1,198 @@
+"""
+Per-request accounting of SQL statements and time spent by phase.
+
+RequestTiming (ASGI middleware) gives every request a RequestTimings
+object through a context variable. The rest of the app reports into it:
+- instrument_statements() adds SQLAlchemy cursor hooks to an engine. They
+  count statements, rows and database time.
+- timed("auth") wraps token and password checks.
+- TimedRoute marks when the endpoint returns. Everything after that point,
+  until the response is built, is recorded as "serialize".
+
+The totals go into a Server-Timing response header (shown per request in
+the browser's network panel) and one log record per request. When
+SQL_STATEMENT_BUDGET is set (meant for development), a request that sends
+more statements than that logs a warning that lists them. New extra round
+trips then show up without anyone looking for them.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Statements kept for the budget warning, and how much of each
+MAX_RECORDED_STATEMENTS = 50
+MAX_STATEMENT_CHARS = 300
+
+_current: contextvars.ContextVar["RequestTimings | None"] = contextvars.ContextVar("request_timings", default=None)
+
+class RequestTimings:
+    """Counters for one request, filled in by the hooks below"""
+
+    __slots__ = ("statements", "rows", "db_seconds", "phases", "endpoint_returned", "recorded_statements")
+
+    def __init__(self, record_statements: bool = False):
+        self.statements = 0
+        self.rows = 0
+        self.db_seconds = 0.0
+        self.phases: dict[str, float] = {}
+        self.endpoint_returned: float | None = None
+        self.recorded_statements: list[str] | None = [] if record_statements else None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Server-Timing header value (durations in milliseconds)"""
+        entries = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} statements, {self.rows} rows"']
+        entries += [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        entries.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(entries)
+
+def current_timings() -> RequestTimings | None:
+    """Timings of the request being handled, if any"""
+    return _current.get()
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to `phase` of the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+def instrument_statements(engine) -> None:
+    """Count statements, rows and database time of a sync engine per request
+
+    Pass `async_engine.sync_engine` for an AsyncEngine; the hooks run in the
+    request's context either way.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        context._timing_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_statement(conn, cursor, statement, parameters, context, executemany):
+        timings = _current.get()
+        if timings is None:
+            return
+        timings.statements += 1
+        timings.db_seconds += time.perf_counter() - context._timing_start
+        # -1 when the driver does not know (e.g. some DDL)
+        timings.rows += max(cursor.rowcount, 0)
+        if timings.recorded_statements is not None and len(timings.recorded_statements) < MAX_RECORDED_STATEMENTS:
+            timings.recorded_statements.append(" ".join(statement.split())[:MAX_STATEMENT_CHARS])
+
+def marking_endpoint_return(endpoint):
+    """Wrap an endpoint so the current request records when it returned
+
+    functools.wraps keeps the signature FastAPI reads parameters and
+    dependencies from. Generator endpoints (streaming) are left alone.
+    """
+    if getattr(endpoint, "_marks_return", False):
+        return endpoint
+    if inspect.isgeneratorfunction(endpoint) or inspect.isasyncgenfunction(endpoint):
+        return endpoint
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark_endpoint_returned()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                mark_endpoint_returned()
+    wrapper._marks_return = True
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """APIRoute that records the time from the endpoint's return to a built response as "serialize"
+
+    Use as APIRouter(route_class=TimedRoute).
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, marking_endpoint_return(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.endpoint_returned is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_returned)
+            return response
+
+        return timed_handler
+
+def mark_endpoint_returned() -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_returned = time.perf_counter()
+
+class RequestTiming:
+    """ASGI middleware: Server-Timing header, per-request log record and statement budget"""
+
+    def __init__(self, app, server_timing: bool = True, statement_budget: int = 0):
+        self.app = app
+        self.server_timing = server_timing
+        self.statement_budget = statement_budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = RequestTimings(record_statements=self.statement_budget > 0)
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    value = timings.server_timing(time.perf_counter() - start).encode("latin-1")
+                    message["headers"] = [*message.get("headers", ()), (b"server-timing", value)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.report(status, timings, time.perf_counter() - start)
+
+    def report(self, status: int, timings: RequestTimings, seconds: float) -> None:
+        fields = {
+            "status": status,
+            "duration_ms": round(seconds * 1000, 1),
+            "db_statements": timings.statements,
+            "db_rows": timings.rows,
+            "db_ms": round(timings.db_seconds * 1000, 1),
+            **{f"{phase}_ms": round(phase_seconds * 1000, 1) for phase, phase_seconds in timings.phases.items()},
+        }
+        logger.info("Request finished", extra=fields)
+        if self.statement_budget and timings.statements > self.statement_budget:
+            logger.warning(
+                "Request sent %s SQL statements, over the budget of %s",
+                timings.statements, self.statement_budget,
+                extra={**fields, "statements": timings.recorded_statements}
+            )
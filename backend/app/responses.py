@@ -0,0 +1,37 @@
+from fastapi.responses import JSONResponse
+from typing import Any
+import logging
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson
+
+    FastAPI hands the response class plain JSON-compatible data (already run
+    through the route's response_model), so rendering is a single
+    orjson.dumps call.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def get_default_response_class():
+    """ORJSONResponse when ORJSON_RESPONSES is set and orjson is installed, else None
+
+    None keeps FastAPI's own default, which on recent FastAPI versions
+    serializes routes with a response_model straight to JSON bytes in
+    pydantic-core; run benchmarks/response_serialization.py to compare.
+    """
+    from app.config import settings
+
+    if not settings.orjson_responses:
+        return None
+    if orjson is None:
+        logger.warning("ORJSON_RESPONSES is set but orjson is not installed; using the default JSON response")
+        return None
+    return ORJSONResponse
@@ -1,28 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import BaseModel, EmailStr
 from jose import jwt
 from datetime import datetime, timedelta
+from functools import lru_cache
 import bcrypt
-import os
+import hashlib
+import logging
 from app.models import User
-from app.dependencies.database import get_db_session
-from app.dependencies.auth import get_current_user_id
-
-# Read secret from environment or settings
-def get_auth_secret():
-    secret = os.getenv("BETTER_AUTH_SECRET")
-    if secret:
-        return secret
-    try:
-        from app.config import settings
-        if settings.better_auth_secret:
-            return settings.better_auth_secret
-    except Exception:
-        pass
-    return ""
+from app.dependencies.database import get_async_session
+from app.dependencies.auth import get_auth_secret, get_current_user_id
+from app.services.password_hasher import get_password_hasher, PasswordHasherBusy
+from app.services.rate_limiter import RateLimit, get_rate_limiter, parse_rate_limit, retry_after_seconds
+from app.metrics import AUTH_RATE_LIMITED
+from app.request_timing import TimedRoute, timed
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 class RegisterRequest(BaseModel):
     email: EmailStr
@@ -33,14 +30,91 @@ class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+class UserRead(BaseModel):
+    id: int
+    email: str
+    name: str | None = None
+
+class AuthResponse(BaseModel):
+    user: UserRead
+    token: str
+
+class SignOutResponse(BaseModel):
+    message: str
+
 def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(12)).decode('utf-8')
+    rounds = settings.password_hash_rounds
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
 def verify_password(password: str, password_hash: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
+async def run_password_hashing(fn, *args):
+    """Run a bcrypt function in the hashing pool, shedding load with a 503 when full"""
+    try:
+        with timed("auth"):
+            return await get_password_hasher().run(fn, *args)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+@lru_cache(maxsize=1)
+def auth_rate_limits() -> dict[str, RateLimit | None]:
+    """Parsed RATE_LIMIT_* settings by rule (None when a rule is disabled)"""
+    return {
+        "login-ip": parse_rate_limit(settings.rate_limit_login_ip),
+        "login-email": parse_rate_limit(settings.rate_limit_login_email),
+        "register-ip": parse_rate_limit(settings.rate_limit_register_ip),
+    }
+
+def client_ip(http_request: Request) -> str:
+    """Address of the client, taken from X-Forwarded-For behind RATE_LIMIT_TRUSTED_PROXIES proxies
+
+    Each trusted proxy appends the address it received the request from, so
+    the entry that many places from the end was added by our outermost proxy
+    and cannot be forged by the client.
+    """
+    hops = settings.rate_limit_trusted_proxies
+    if hops > 0:
+        forwarded = [part.strip() for part in http_request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return http_request.client.host if http_request.client else "unknown"
+
+def email_key(email: str) -> str:
+    """Bucket key of an account, hashed so addresses are not stored in the limiter"""
+    return hashlib.blake2b(email.strip().lower().encode(), digest_size=12).hexdigest()
+
+async def enforce_rate_limits(*checks: tuple[str, str]) -> None:
+    """Take a token from each (rule, key) bucket; 429 with Retry-After if any is empty
+
+    Tokens are only taken when every rule allows the request, so one that
+    is rejected by the per-email rule does not also use up its address's.
+    Called first thing in the auth routes, so a rejected request costs
+    neither a database query nor a bcrypt operation.
+    """
+    limits = auth_rate_limits()
+    enabled = [(rule, key) for rule, key in checks if limits[rule] is not None]
+    if not enabled:
+        return
+    waits = await get_rate_limiter().hit([(f"{rule}:{key}", limits[rule]) for rule, key in enabled])
+    limited = [(rule, wait) for (rule, _), wait in zip(enabled, waits) if wait > 0]
+    if not limited:
+        return
+    for rule, _ in limited:
+        AUTH_RATE_LIMITED.labels(rule).inc()
+    logger.warning("Auth rate limit exceeded", extra={"rule": ",".join(rule for rule, _ in limited)})
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many attempts, please retry later",
+        headers={"Retry-After": str(retry_after_seconds(max(wait for _, wait in limited)))}
+    )
+
 def create_jwt(user_id: int, email: str) -> str:
     """Create JWT token with user_id and email claims"""
     secret = get_auth_secret()
@@ -59,16 +133,18 @@ def create_jwt(user_id: int, email: str) -> str:
     }
     return jwt.encode(payload, secret, algorithm="HS256")
 
-@router.post("/api/auth/register", status_code=201)
+@router.post("/api/auth/register", status_code=201, response_model=AuthResponse)
 async def register(
     request: RegisterRequest,
-    session: Session = Depends(get_db_session)
+    http_request: Request,
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Register a new user"""
+    await enforce_rate_limits(("register-ip", client_ip(http_request)))
     try:
         # Check if email already exists
         statement = select(User).where(User.email == request.email)
-        existing_user = session.exec(statement).first()
+        existing_user = (await session.exec(statement)).first()
 
         if existing_user:
             raise HTTPException(
@@ -84,7 +160,7 @@ async def register(
             )
 
         # Hash password
-        password_hash = hash_password(request.password)
+        password_hash = await run_password_hashing(hash_password, request.password)
 
         # Create user
         user = User(
@@ -94,8 +170,8 @@ async def register(
         )
 
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        await session.commit()
+        await session.refresh(user)
 
         # Generate JWT
         try:
@@ -122,16 +198,21 @@ async def register(
             detail=f"Registration failed: {str(e)}"
         )
 
-@router.post("/api/auth/login")
+@router.post("/api/auth/login", response_model=AuthResponse)
 async def login(
     request: LoginRequest,
-    session: Session = Depends(get_db_session)
+    http_request: Request,
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Login user and return JWT"""
+    await enforce_rate_limits(
+        ("login-ip", client_ip(http_request)),
+        ("login-email", email_key(request.email))
+    )
     try:
         # Find user by email
         statement = select(User).where(User.email == request.email)
-        user = session.exec(statement).first()
+        user = (await session.exec(statement)).first()
 
         if not user:
             raise HTTPException(
@@ -140,7 +221,7 @@ async def login(
             )
 
         # Verify password
-        password_valid = verify_password(request.password, user.password_hash)
+        password_valid = await run_password_hashing(verify_password, request.password, user.password_hash)
 
         if not password_valid:
             raise HTTPException(
@@ -173,7 +254,7 @@ async def login(
             detail=f"Login failed: {str(e)}"
         )
 
-@router.post("/api/auth/sign-out")
+@router.post("/api/auth/sign-out", response_model=SignOutResponse)
 async def sign_out():
     """Sign out user (JWT tokens are stateless, so this just returns success)"""
     # Since JWT tokens are stateless, sign-out is handled client-side
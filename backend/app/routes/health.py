@@ -1,7 +1,49 @@
 from fastapi import APIRouter
+from app.dependencies.auth import token_cache
+from app.dependencies.database import get_pool_stats
+from app.logs import logging_stats
+from app.services.password_hasher import get_password_hasher
+from app.services.rate_limiter import get_rate_limiter
+from app.services.task_cache import get_task_cache
+from app.services.task_writer import get_task_writer
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "todo-api"}
+
+@router.get("/health/password-hashing")
+async def password_hashing_stats():
+    """Queue depth, queue wait and hashing time of the bcrypt pool"""
+    return get_password_hasher().stats()
+
+@router.get("/health/auth-cache")
+async def auth_cache_stats():
+    """Hit/miss counters of the verified-JWT cache"""
+    return token_cache.stats()
+
+@router.get("/health/db-pool")
+async def db_pool_stats():
+    """Pool profile, connections checked out, overflow and checkout wait times"""
+    return get_pool_stats()
+
+@router.get("/health/task-cache")
+async def task_cache_stats():
+    """Backend, hit rate, size and invalidations of the task read cache"""
+    return await get_task_cache().stats()
+
+@router.get("/health/task-writes")
+async def task_write_stats():
+    """Group commit window, batches written and their sizes"""
+    return get_task_writer().stats()
+
+@router.get("/health/rate-limit")
+async def rate_limit_stats():
+    """Backend and allowed/limited counts of the auth rate limiter"""
+    return await get_rate_limiter().stats()
+
+@router.get("/health/logging")
+async def logging_queue_stats():
+    """Records waiting in the log queue and records dropped because it was full"""
+    return logging_stats()
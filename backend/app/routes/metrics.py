@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from app.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
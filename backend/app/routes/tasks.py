@@ -1,14 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
-import sys
-from app.models import Task
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlalchemy import Integer, and_, any_, bindparam, cast, delete, func, insert, literal, literal_column, or_, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
+from sqlmodel.ext.asyncio.session import AsyncSession
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
+import re
+from app.models import Task, TaskStats
 from app.dependencies.auth import get_current_user_id
-from app.dependencies.database import get_db_session
+from app.dependencies.database import get_async_engine, get_async_session
+from app.request_timing import TimedRoute
+from app.services.task_cache import get_task_cache
+from app.services.task_changes import CursorExpired, load_task_changes, record_task_deletions
+from app.services.task_stats import load_task_stats, rebuild_task_stats, record_task_changes, task_snapshot
+from app.services.task_writer import get_task_writer
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+# Largest number of items accepted by one batch request
+MAX_BATCH_SIZE = 500
+
+# Columns GET /api/tasks can be ordered by; each is paired with id for keyset pagination
+SORTABLE_COLUMNS = {
+    "created_at": Task.created_at,
+    "due_date": Task.due_date,
+}
+MAX_PAGE_SIZE = 200
+
+# Columns written by GET /api/tasks/export, and rows fetched per server-side cursor batch
+EXPORT_COLUMNS = ["id", "title", "description", "priority", "status", "due_date", "created_at", "updated_at"]
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Text search configuration of tasks.search_vector (see migration 4)
+SEARCH_CONFIG = "english"
+MAX_SEARCH_LIMIT = 100
+
+# Changes returned per GET /api/tasks/changes call
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 1000
+
+# Sent with ETags so browsers keep the body but revalidate it on every read
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+EPOCH = datetime(1970, 1, 1)
 
 # Pydantic models for request/response
 class TaskCreate(BaseModel):
@@ -24,195 +71,830 @@ class TaskUpdate(BaseModel):
     status: Optional[str] = None  # pending, completed
     due_date: Optional[str] = None
 
-@router.get("/api/tasks")
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TaskIdList(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TaskRead(BaseModel):
+    """Task as returned by the API; read straight from Task rows"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    title: str
+    description: Optional[str] = None
+    priority: str
+    status: str
+    due_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class TaskSearchResult(TaskRead):
+    rank: float
+
+class TaskChangesRead(BaseModel):
+    tasks: List[TaskRead]  # created or updated since the cursor
+    deleted: List[int]  # ids of tasks deleted since the cursor
+    cursor: str
+    has_more: bool
+
+# Batch responses are declared with response_model_exclude_none, so an item
+# only carries the fields that apply to its status
+class TaskBatchCreateItem(BaseModel):
+    index: int
+    status: str  # created, invalid
+    detail: Optional[str] = None
+    task: Optional[TaskRead] = None
+
+class TaskBatchCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[TaskBatchCreateItem]
+
+class TaskBatchCompleteItem(BaseModel):
+    id: int
+    status: str  # completed, not_found
+    task: Optional[TaskRead] = None
+
+class TaskBatchCompleteResponse(BaseModel):
+    completed: int
+    not_found: int
+    results: List[TaskBatchCompleteItem]
+
+class TaskBatchDeleteItem(BaseModel):
+    id: int
+    status: str  # deleted, not_found
+
+class TaskBatchDeleteResponse(BaseModel):
+    deleted: int
+    not_found: int
+    results: List[TaskBatchDeleteItem]
+
+class TaskStatusCounts(BaseModel):
+    pending: int
+    completed: int
+
+class TaskPriorityCounts(BaseModel):
+    low: int
+    medium: int
+    high: int
+
+class TaskStatsRead(BaseModel):
+    total: int
+    by_status: TaskStatusCounts
+    by_priority: TaskPriorityCounts
+    overdue: int  # pending tasks due before `today`
+    due_today: int
+
+# Serializers for responses built by hand to be stored in the task cache
+TASK_ADAPTER = TypeAdapter(TaskRead)
+TASK_LIST_ADAPTER = TypeAdapter(List[TaskRead])
+
+def parse_due_date(value: str) -> datetime:
+    """Parse an ISO due_date into a naive UTC datetime
+
+    The tasks columns are TIMESTAMP WITHOUT TIME ZONE, and asyncpg rejects
+    timezone-aware values for them instead of silently casting.
+    """
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def encode_cursor(sort: str, order: str, task: Task) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    value = getattr(task, sort)
+    payload = {
+        "sort": sort,
+        "order": order,
+        "value": value.isoformat() if value is not None else None,
+        "id": task.id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str, order: str) -> tuple[Optional[datetime], int]:
+    """Decode a cursor, checking it was issued for the same sort and order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if payload["sort"] != sort or payload["order"] != order:
+            raise ValueError("cursor was issued for a different sort order")
+        value = datetime.fromisoformat(payload["value"]) if payload["value"] is not None else None
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+def keyset_segments(column, order: str, cursor: Optional[tuple[Optional[datetime], int]]):
+    """Split the page order into contiguous index ranges, starting after `cursor`
+
+    Rows with a NULL sort value come last ascending and first descending
+    (PostgreSQL's default), so the order is two ranges of the (user_id, column,
+    id) index: non-NULL values by (column, id) and NULL values by id. Each
+    range is queried separately so every query is a bounded index scan with
+    LIMIT rather than an OR that forces a sort of all remaining rows.
+    Returns (condition, order_by) pairs in page order.
+    """
+    ascending = order == "asc"
+    value, last_id = cursor if cursor else (None, None)
+
+    non_null = [column.is_not(None)]
+    nulls = [column.is_(None)]
+    if cursor and value is not None:
+        row = tuple_(column, Task.id)
+        non_null.append(row > tuple_(value, last_id) if ascending else row < tuple_(value, last_id))
+    if cursor and value is None:
+        nulls.append(Task.id > last_id if ascending else Task.id < last_id)
+
+    if ascending:
+        non_null_segment = (and_(*non_null), [column.asc(), Task.id.asc()])
+        null_segment = (and_(*nulls), [Task.id.asc()])
+        # A cursor inside the NULL range means the non-NULL range is exhausted
+        return [null_segment] if cursor and value is None else [non_null_segment, null_segment]
+
+    null_segment = (and_(*nulls), [Task.id.desc()])
+    non_null_segment = (and_(*non_null), [column.desc(), Task.id.desc()])
+    # A cursor inside the non-NULL range means the NULL range is exhausted
+    return [non_null_segment] if cursor and value is not None else [null_segment, non_null_segment]
+
+def updated_at_micros(value: Optional[datetime]) -> int:
+    """updated_at as integer microseconds since the epoch (0 when NULL)"""
+    return (value - EPOCH) // timedelta(microseconds=1) if value else 0
+
+def make_etag(*parts) -> str:
+    """Strong ETag: a quoted hash of the values that identify a representation"""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate If-None-Match against `etag` (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL})
+
+def pack_cached_response(headers: dict, body: bytes) -> bytes:
+    """Serialize response headers and JSON body into one task cache entry"""
+    return json.dumps(headers).encode() + b"\n" + body
+
+def cached_response(value: bytes, if_none_match: Optional[str]) -> Response:
+    """Answer a read from a task cache entry: 304 if the ETag matches, else the stored body"""
+    header_line, body = value.split(b"\n", 1)
+    headers = json.loads(header_line)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers["ETag"])
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def load_task_list_version(session: AsyncSession, user_id: int) -> int:
+    """The user's task list version: one primary-key lookup of task_stats
+
+    Every task write sets it to its transaction id (see record_task_changes),
+    so the cost does not depend on how many tasks the user has.
+    """
+    version = (await session.exec(select(TaskStats.version).where(TaskStats.user_id == user_id))).first()
+    return version or 0
+
+@router.get("/api/tasks", response_model=List[TaskRead])
 async def list_tasks(
+    response: Response,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    due_from: Optional[str] = Query(None, description="Only tasks due at or after this ISO date"),
+    due_before: Optional[str] = Query(None, description="Only tasks due before this ISO date"),
+    sort: str = "created_at",
+    order: str = "asc",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     authenticated_user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_db_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """List all tasks for the authenticated user"""
+    """List tasks for the authenticated user
+
+    Without `limit` every matching task is returned. With `limit` the result is
+    one keyset page, and the cursor for the next page is sent in the
+    X-Next-Cursor header (absent on the last page).
+
+    The ETag combines the query with the user's task list version, so any
+    write invalidates every list. A matching If-None-Match gets a 304 from
+    one primary-key lookup, without loading any rows.
+    """
+    if sort not in SORTABLE_COLUMNS:
+        raise HTTPException(status_code=400, detail="Sort must be 'created_at' or 'due_date'")
+    if order not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="Order must be 'asc' or 'desc'")
+    if status is not None and status not in ["pending", "completed"]:
+        raise HTTPException(status_code=400, detail="Status must be 'pending' or 'completed'")
+    if priority is not None and priority not in ["low", "medium", "high"]:
+        raise HTTPException(status_code=400, detail="Priority must be 'low', 'medium', or 'high'")
+
     statement = select(Task).where(Task.user_id == authenticated_user_id)
-    tasks = session.exec(statement).all()
+    if status is not None:
+        statement = statement.where(Task.status == status)
+    if priority is not None:
+        statement = statement.where(Task.priority == priority)
+    try:
+        if due_from:
+            statement = statement.where(Task.due_date >= parse_due_date(due_from))
+        if due_before:
+            statement = statement.where(Task.due_date < parse_due_date(due_before))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid due date filter. Use ISO format.")
+
+    query = (status, priority, due_from, due_before, sort, order, limit, cursor)
+    cache = get_task_cache()
+    cache_key = "list:" + repr(query)
+    generation, cached = await cache.get(authenticated_user_id, cache_key)
+    if cached is not None:
+        return cached_response(cached, if_none_match)
+
+    # Read before the rows: a write committing in between can only leave the
+    # ETag older than the body (a needless refetch), never newer
+    version = await load_task_list_version(session, authenticated_user_id)
+    etag = make_etag("tasks", authenticated_user_id, version, query)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    column = SORTABLE_COLUMNS[sort]
+    headers = {"Cache-Control": CONDITIONAL_CACHE_CONTROL}
+
+    if limit is None:
+        if order == "asc":
+            statement = statement.order_by(column.asc().nulls_last(), Task.id.asc())
+        else:
+            statement = statement.order_by(column.desc().nulls_first(), Task.id.desc())
+        tasks = (await session.exec(statement)).all()
+    else:
+        decoded_cursor = decode_cursor(cursor, sort, order) if cursor else None
+        # Fetch one extra row to learn whether another page exists
+        tasks = []
+        for condition, ordering in keyset_segments(column, order, decoded_cursor):
+            remaining = limit + 1 - len(tasks)
+            segment = statement.where(condition).order_by(*ordering).limit(remaining)
+            tasks.extend((await session.exec(segment)).all())
+            if len(tasks) > limit:
+                break
+
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(sort, order, tasks[-1])
+
+    headers["ETag"] = etag
+    if cache.enabled:
+        body = TASK_LIST_ADAPTER.dump_json(TASK_LIST_ADAPTER.validate_python(tasks, from_attributes=True))
+        await cache.set(authenticated_user_id, generation, cache_key, pack_cached_response(headers, body))
+        return Response(content=body, media_type="application/json", headers=headers)
+    response.headers.update(headers)
     return tasks
 
-@router.post("/api/tasks", status_code=201)
-async def create_task(
-    task_data: TaskCreate,
+def format_export_value(value):
+    """Render a column value for export (datetimes as ISO strings)"""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def format_export_batch(rows, export_format: str) -> str:
+    """Render one batch of rows as NDJSON lines or CSV records"""
+    if export_format == "ndjson":
+        return "".join(
+            json.dumps({column: format_export_value(row[column]) for column in EXPORT_COLUMNS}) + "\n"
+            for row in rows
+        )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([format_export_value(row[column]) for column in EXPORT_COLUMNS] for row in rows)
+    return buffer.getvalue()
+
+async def stream_task_export(user_id: int, export_format: str):
+    """Yield the user's tasks batch by batch from a server-side cursor
+
+    The session is opened here rather than through get_async_session because
+    the response body is produced after the route (and its dependencies)
+    have returned.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(EXPORT_COLUMNS)
+        yield buffer.getvalue()
+
+    columns = [getattr(Task, column) for column in EXPORT_COLUMNS]
+    statement = (
+        select(*columns)
+        .where(Task.user_id == user_id)
+        .order_by(Task.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    try:
+        async with AsyncSession(get_async_engine()) as session:
+            result = await session.stream(statement)
+            async for batch in result.mappings().partitions():
+                yield format_export_batch(batch, export_format)
+    except Exception:
+        # Headers are already sent, so the only signal left is a truncated body
+        logger.exception("Task export failed", extra={"user_id": user_id})
+        raise
+
+@router.get("/api/tasks/export")
+async def export_tasks(
+    export_format: str = Query("ndjson", alias="format", description="'ndjson' or 'csv'"),
+    authenticated_user_id: int = Depends(get_current_user_id)
+):
+    """Stream all of the user's tasks as NDJSON or CSV
+
+    Rows are read from a server-side cursor in batches of EXPORT_BATCH_SIZE and
+    written as they arrive, so memory stays flat and the first bytes are sent
+    before the query has finished.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format must be 'ndjson' or 'csv'")
+
+    return StreamingResponse(
+        stream_task_export(authenticated_user_id, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'}
+    )
+
+# Whether pg_trgm is installed, looked up once per process
+_trigram_search: Optional[bool] = None
+
+async def trigram_search_available(session: AsyncSession) -> bool:
+    global _trigram_search
+    if _trigram_search is None:
+        statement = text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        _trigram_search = bool((await session.exec(statement)).scalar())
+    return _trigram_search
+
+@router.get("/api/tasks/search", response_model=List[TaskSearchResult])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in title and description"),
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT),
+    offset: int = Query(0, ge=0),
     authenticated_user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_db_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Create a new task"""
-    # Validate priority
+    """Search the user's tasks, best matches first
+
+    Full-text matches on the generated search_vector column (GIN indexed)
+    accept web-search syntax ("quoted phrases", -excluded). When pg_trgm is
+    installed, titles that are similar to the query also match, so partial
+    words and typos still find the task (not for queries using quotes or
+    -exclusions). The offset of the next page is sent
+    in the X-Next-Offset header (absent on the last page).
+    """
+    if status is not None and status not in ["pending", "completed"]:
+        raise HTTPException(status_code=400, detail="Status must be 'pending' or 'completed'")
+
+    search_vector = literal_column("tasks.search_vector")
+    ts_query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+    condition = search_vector.op("@@")(ts_query)
+    rank = func.ts_rank_cd(search_vector, ts_query)
+    # Fuzzy title matching would ignore phrase quotes and -exclusions
+    uses_operators = '"' in q or re.search(r"(^|\s)-\S", q) is not None
+    if not uses_operators and await trigram_search_available(session):
+        # word_similarity: how well the query matches any part of the title
+        condition = or_(condition, literal(q).op("<%")(Task.title))
+        rank = rank + func.word_similarity(q, Task.title)
+
+    statement = select(Task, rank.label("rank")).where(Task.user_id == authenticated_user_id, condition)
+    if status is not None:
+        statement = statement.where(Task.status == status)
+    # Fetch one extra row to learn whether another page exists
+    statement = statement.order_by(rank.desc(), Task.id.desc()).limit(limit + 1).offset(offset)
+    rows = (await session.exec(statement)).all()
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    return [{**task.model_dump(), "rank": task_rank} for task, task_rank in rows]
+
+@router.get("/api/tasks/stats", response_model=TaskStatsRead)
+async def get_task_stats(
+    today: Optional[date] = Query(None, description="The client's current date; defaults to today in UTC"),
+    authenticated_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Task counts by status and priority, plus overdue and due today
+
+    Served from the per-user counters that every task write updates in its
+    own transaction. Users without counters (or with inconsistent ones) get
+    them rebuilt from the tasks table with GROUP BY first.
+    """
+    if today is None:
+        today = datetime.utcnow().date()
+
+    stats = await load_task_stats(session, authenticated_user_id, today)
+    if stats is None:
+        try:
+            await rebuild_task_stats(session, authenticated_user_id)
+        except Exception as e:
+            await session.rollback()
+            logger.exception("Failed to rebuild task stats", extra={"user_id": authenticated_user_id})
+            raise HTTPException(status_code=500, detail=f"Failed to load task stats: {str(e)}")
+        logger.info("Task stats rebuilt", extra={"user_id": authenticated_user_id})
+        stats = await load_task_stats(session, authenticated_user_id, today)
+    return stats
+
+@router.get("/api/tasks/changes", response_model=TaskChangesRead)
+async def list_task_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response; omit to get every task"),
+    limit: int = Query(DEFAULT_CHANGES_LIMIT, ge=1, le=MAX_CHANGES_LIMIT),
+    authenticated_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Tasks created or updated, and ids of tasks deleted, since a cursor
+
+    Keep the returned cursor and pass it as `since` next time; while
+    `has_more` is true, call again straight away. A task can be sent again
+    after a later change, so apply changes by id. A 410 means the cursor has
+    expired, or a transaction left open has held its changes back too long,
+    and the client should drop its copy and sync without `since`.
+    """
+    try:
+        changes = await load_task_changes(session, authenticated_user_id, since, limit)
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=f"Cursor expired: {e}. Sync again without since.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    return changes
+
+def task_values_from_create(task_data: TaskCreate, user_id: int) -> dict:
+    """Validate a TaskCreate payload and return the column values to insert
+
+    Raises ValueError with a client-facing message when the payload is invalid.
+    """
     if task_data.priority not in ["low", "medium", "high"]:
-        raise HTTPException(status_code=400, detail="Priority must be 'low', 'medium', or 'high'")
+        raise ValueError("Priority must be 'low', 'medium', or 'high'")
+    if len(task_data.title) > 255:
+        raise ValueError("Title must be at most 255 characters")
 
     # Parse due_date if provided
     due_date_obj = None
     if task_data.due_date:
         try:
-            due_date_obj = datetime.fromisoformat(task_data.due_date.replace('Z', '+00:00'))
+            due_date_obj = parse_due_date(task_data.due_date)
         except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid due_date format. Use ISO format.")
-
-    # Create task - let SQLModel handle created_at and updated_at via default_factory
-    task = Task(
-        user_id=authenticated_user_id,
-        title=task_data.title,
-        description=task_data.description,
-        priority=task_data.priority or "medium",
-        status="pending",
-        due_date=due_date_obj
+            raise ValueError("Invalid due_date format. Use ISO format.")
+
+    return {
+        "user_id": user_id,
+        "title": task_data.title,
+        "description": task_data.description,
+        "priority": task_data.priority or "medium",
+        "status": "pending",
+        "due_date": due_date_obj,
+    }
+
+def locked_previous_values(condition):
+    """Matched rows as they were before an UPDATE, locked for it
+
+    UPDATE tasks ... FROM this subquery can return the old status, priority
+    and due date next to the new row, which is what the task stats need.
+    """
+    return (
+        select(Task.id, Task.status, Task.priority, Task.due_date)
+        .where(condition)
+        .with_for_update()
+        .subquery("previous")
+    )
+
+def owned_ids_condition(user_id: int, ids: List[int]):
+    """WHERE clause matching the user's tasks among `ids` with a single array parameter"""
+    return and_(
+        Task.user_id == user_id,
+        Task.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
     )
 
+@router.post("/api/tasks", status_code=201, response_model=TaskRead)
+async def create_task(
+    task_data: TaskCreate,
+    authenticated_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Create a new task"""
     try:
-        session.add(task)
-        session.commit()
-        session.refresh(task)
-        print(f"✅ Task created successfully: {task.id} - {task.title}", file=sys.stderr, flush=True)
+        values = task_values_from_create(task_data, authenticated_user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        task = await get_task_writer().create(session, values)
+        logger.info("Task created", extra={"task_id": task.id})
         return task
     except Exception as e:
-        session.rollback()
-        print(f"❌ Failed to create task: {e}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+        await session.rollback()
+        logger.exception("Failed to create task")
         # Get more detailed error information
         error_detail = str(e)
         if hasattr(e, 'orig'):
             error_detail = f"{error_detail} (Original: {e.orig})"
         raise HTTPException(status_code=500, detail=f"Failed to create task: {error_detail}")
 
-@router.get("/api/tasks/{task_id}")
+@router.post("/api/tasks/batch", response_model=TaskBatchCreateResponse, response_model_exclude_none=True)
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    authenticated_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Create many tasks in one transaction
+
+    Every item is validated first; valid items are written with one multi-row
+    INSERT ... RETURNING and invalid ones are reported without being written.
+    """
+    results = [None] * len(batch.tasks)
+    rows = []
+    row_indexes = []
+    for index, task_data in enumerate(batch.tasks):
+        try:
+            rows.append(task_values_from_create(task_data, authenticated_user_id))
+            row_indexes.append(index)
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "detail": str(e)}
+
+    if rows:
+        try:
+            statement = insert(Task).returning(Task, sort_by_parameter_order=True)
+            created = (await session.exec(statement, params=rows)).scalars().all()
+            await record_task_changes(session, authenticated_user_id, added=[task_snapshot(row) for row in rows])
+            await session.commit()
+            await get_task_cache().invalidate(authenticated_user_id)
+        except Exception as e:
+            await session.rollback()
+            logger.exception("Failed to create task batch")
+            raise HTTPException(status_code=500, detail=f"Failed to create tasks: {str(e)}")
+
+        for index, task in zip(row_indexes, created):
+            results[index] = {"index": index, "status": "created", "task": task}
+        logger.info("Task batch created", extra={"count": len(created)})
+
+    return {
+        "created": len(rows),
+        "failed": len(batch.tasks) - len(rows),
+        "results": results
+    }
+
+@router.patch("/api/tasks/complete", response_model=TaskBatchCompleteResponse, response_model_exclude_none=True)
+async def complete_tasks_batch(
+    batch: TaskIdList,
+    authenticated_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Mark many tasks as completed with one UPDATE ... WHERE id = ANY(...)"""
+    ids = list(dict.fromkeys(batch.ids))
+    try:
+        previous = locked_previous_values(owned_ids_condition(authenticated_user_id, ids))
+        statement = (
+            update(Task)
+            .where(Task.id == previous.c.id)
+            .values(status="completed", updated_at=datetime.utcnow())
+            .returning(Task, previous.c.status, previous.c.priority, previous.c.due_date)
+        )
+        rows = (await session.exec(statement)).all()
+        completed = {task.id: task for task, *_ in rows}
+        await record_task_changes(
+            session, authenticated_user_id,
+            removed=[tuple(old) for _, *old in rows],
+            added=[(task.status, task.priority, task.due_date) for task, *_ in rows]
+        )
+        await session.commit()
+        if completed:
+            await get_task_cache().invalidate(authenticated_user_id)
+    except Exception as e:
+        await session.rollback()
+        logger.exception("Failed to complete task batch")
+        raise HTTPException(status_code=500, detail=f"Failed to complete tasks: {str(e)}")
+
+    logger.info("Task batch completed", extra={"count": len(completed)})
+    return {
+        "completed": len(completed),
+        "not_found": len(ids) - len(completed),
+        "results": [
+            {"id": task_id, "status": "completed", "task": completed[task_id]}
+            if task_id in completed else {"id": task_id, "status": "not_found"}
+            for task_id in ids
+        ]
+    }
+
+@router.delete("/api/tasks", response_model=TaskBatchDeleteResponse)
+async def delete_tasks_batch(
+    ids: List[int] = Query(..., description="Task ids to delete, e.g. ?ids=1&ids=2"),
+    authenticated_user_id: int = Depends(get_current_user_id),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Delete many tasks with one DELETE ... WHERE id = ANY(...) RETURNING"""
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} ids per request")
+
+    try:
+        statement = (
+            delete(Task)
+            .where(owned_ids_condition(authenticated_user_id, ids))
+            .returning(Task.id, Task.status, Task.priority, Task.due_date)
+        )
+        rows = (await session.exec(statement)).all()
+        deleted = {task_id for task_id, *_ in rows}
+        await record_task_changes(session, authenticated_user_id, removed=[tuple(old) for _, *old in rows])
+        await record_task_deletions(session, authenticated_user_id, sorted(deleted))
+        await session.commit()
+        if deleted:
+            await get_task_cache().invalidate(authenticated_user_id)
+    except Exception as e:
+        await session.rollback()
+        logger.exception("Failed to delete task batch")
+        raise HTTPException(status_code=500, detail=f"Failed to delete tasks: {str(e)}")
+
+    logger.info("Task batch deleted", extra={"count": len(deleted)})
+    return {
+        "deleted": len(deleted),
+        "not_found": len(ids) - len(deleted),
+        "results": [
+            {"id": task_id, "status": "deleted" if task_id in deleted else "not_found"}
+            for task_id in ids
+        ]
+    }
+
+@router.get("/api/tasks/{task_id}", response_model=TaskRead)
 async def get_task(
     task_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     authenticated_user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_db_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Get a single task by ID"""
-    statement = select(Task).where(
-        Task.id == task_id,
-        Task.user_id == authenticated_user_id
-    )
-    task = session.exec(statement).first()
+    """Get a single task by ID
+
+    The ETag is derived from the task's updated_at. Without If-None-Match the
+    row is loaded once and the ETag computed from it; with the header only
+    updated_at is read first, and a match returns 304 without the row.
+    """
+    cache = get_task_cache()
+    cache_key = f"task:{task_id}"
+    generation, cached = await cache.get(authenticated_user_id, cache_key)
+    if cached is not None:
+        return cached_response(cached, if_none_match)
+
+    if if_none_match:
+        statement = select(Task.id, Task.updated_at).where(owned_task_condition(authenticated_user_id, task_id))
+        row = (await session.exec(statement)).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        etag = make_etag("task", task_id, updated_at_micros(row.updated_at))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    statement = select(Task).where(owned_task_condition(authenticated_user_id, task_id))
+    task = (await session.exec(statement)).first()
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    headers = {
+        "ETag": make_etag("task", task.id, updated_at_micros(task.updated_at)),
+        "Cache-Control": CONDITIONAL_CACHE_CONTROL,
+    }
+    if cache.enabled:
+        body = TASK_ADAPTER.dump_json(TASK_ADAPTER.validate_python(task, from_attributes=True))
+        await cache.set(authenticated_user_id, generation, cache_key, pack_cached_response(headers, body))
+        return Response(content=body, media_type="application/json", headers=headers)
+    response.headers.update(headers)
     return task
 
-@router.put("/api/tasks/{task_id}")
+def task_values_from_update(task_data: TaskUpdate) -> dict:
+    """Validate a TaskUpdate payload and return only the columns to change"""
+    values = {}
+    if task_data.title is not None:
+        values["title"] = task_data.title
+    if task_data.description is not None:
+        values["description"] = task_data.description
+    if task_data.priority is not None:
+        if task_data.priority not in ["low", "medium", "high"]:
+            raise HTTPException(status_code=400, detail="Priority must be 'low', 'medium', or 'high'")
+        values["priority"] = task_data.priority
+    if task_data.status is not None:
+        if task_data.status not in ["pending", "completed"]:
+            raise HTTPException(status_code=400, detail="Status must be 'pending' or 'completed'")
+        values["status"] = task_data.status
+    if task_data.due_date is not None:
+        if task_data.due_date == "":
+            values["due_date"] = None
+        else:
+            try:
+                values["due_date"] = parse_due_date(task_data.due_date)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid due_date format. Use ISO format.")
+
+    values["updated_at"] = datetime.utcnow()
+    return values
+
+def owned_task_condition(user_id: int, task_id: int):
+    """WHERE clause that only matches the task if the user owns it"""
+    return and_(Task.id == task_id, Task.user_id == user_id)
+
+@router.put("/api/tasks/{task_id}", response_model=TaskRead)
 async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     authenticated_user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_db_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Update an existing task"""
+    """Update an existing task with a single UPDATE ... RETURNING"""
+    values = task_values_from_update(task_data)
     try:
-        statement = select(Task).where(
-            Task.id == task_id,
-            Task.user_id == authenticated_user_id
+        previous = locked_previous_values(owned_task_condition(authenticated_user_id, task_id))
+        statement = (
+            update(Task)
+            .where(Task.id == previous.c.id)
+            .values(**values)
+            .returning(Task, previous.c.status, previous.c.priority, previous.c.due_date)
         )
-        task = session.exec(statement).first()
+        row = (await session.exec(statement)).first()
 
-        if not task:
+        if not row:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        # Update fields if provided
-        if task_data.title is not None:
-            task.title = task_data.title
-        if task_data.description is not None:
-            task.description = task_data.description
-        if task_data.priority is not None:
-            if task_data.priority not in ["low", "medium", "high"]:
-                raise HTTPException(status_code=400, detail="Priority must be 'low', 'medium', or 'high'")
-            task.priority = task_data.priority
-        if task_data.status is not None:
-            if task_data.status not in ["pending", "completed"]:
-                raise HTTPException(status_code=400, detail="Status must be 'pending' or 'completed'")
-            task.status = task_data.status
-        if task_data.due_date is not None:
-            if task_data.due_date == "":
-                task.due_date = None
-            else:
-                try:
-                    task.due_date = datetime.fromisoformat(task_data.due_date.replace('Z', '+00:00'))
-                except ValueError:
-                    raise HTTPException(status_code=400, detail="Invalid due_date format. Use ISO format.")
-
-        task.updated_at = datetime.utcnow()
-
-        session.add(task)
-        session.commit()
-        session.refresh(task)
-        print(f"✅ Task updated successfully: {task.id} - {task.title}", file=sys.stderr, flush=True)
+        task, *old = row
+        await record_task_changes(
+            session, authenticated_user_id,
+            removed=[tuple(old)], added=[(task.status, task.priority, task.due_date)]
+        )
+        await session.commit()
+        await get_task_cache().invalidate(authenticated_user_id)
+        logger.info("Task updated", extra={"task_id": task.id})
         return task
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
-        print(f"❌ Failed to update task: {e}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+        await session.rollback()
+        logger.exception("Failed to update task", extra={"task_id": task_id})
         raise HTTPException(status_code=500, detail=f"Failed to update task: {str(e)}")
 
 @router.delete("/api/tasks/{task_id}", status_code=204)
 async def delete_task(
     task_id: int,
     authenticated_user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_db_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Delete a task"""
+    """Delete a task with a single DELETE ... RETURNING"""
     try:
-        statement = select(Task).where(
-            Task.id == task_id,
-            Task.user_id == authenticated_user_id
+        statement = (
+            delete(Task)
+            .where(owned_task_condition(authenticated_user_id, task_id))
+            .returning(Task.status, Task.priority, Task.due_date)
         )
-        task = session.exec(statement).first()
+        old = (await session.exec(statement)).first()
 
-        if not task:
+        if old is None:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task_title = task.title
-        session.delete(task)
-        session.commit()
-        print(f"✅ Task deleted successfully: {task_id} - {task_title}", file=sys.stderr, flush=True)
+        await record_task_changes(session, authenticated_user_id, removed=[tuple(old)])
+        await record_task_deletions(session, authenticated_user_id, [task_id])
+        await session.commit()
+        await get_task_cache().invalidate(authenticated_user_id)
+        logger.info("Task deleted", extra={"task_id": task_id})
         return None
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
-        print(f"❌ Failed to delete task: {e}", file=sys.stderr, flush=True)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+        await session.rollback()
+        logger.exception("Failed to delete task", extra={"task_id": task_id})
         raise HTTPException(status_code=500, detail=f"Failed to delete task: {str(e)}")
 
-@router.patch("/api/tasks/{task_id}/complete")
+@router.patch("/api/tasks/{task_id}/complete", response_model=TaskRead)
 async def complete_task(
     task_id: int,
     authenticated_user_id: int = Depends(get_current_user_id),
-    session: Session = Depends(get_db_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
-    """Mark a task as completed"""
+    """Mark a task as completed with a single UPDATE ... RETURNING"""
     try:
-        statement = select(Task).where(
-            Task.id == task_id,
-            Task.user_id == authenticated_user_id
+        previous = locked_previous_values(owned_task_condition(authenticated_user_id, task_id))
+        statement = (
+            update(Task)
+            .where(Task.id == previous.c.id)
+            .values(status="completed", updated_at=datetime.utcnow())
+            .returning(Task, previous.c.status, previous.c.priority, previous.c.due_date)
         )
-        task = session.exec(statement).first()
+        row = (await session.exec(statement)).first()
 
-        if not task:
+        if not row:
             raise HTTPException(status_code=404, detail="Task not found")
 
-        task.status = "completed"
-        task.updated_at = datetime.utcnow()
-
-        session.add(task)
-        session.commit()
-        session.refresh(task)
-        print(f"✅ Task completed successfully: {task.id} - {task.title}", file=sys.stderr, flush=True)
+        task, *old = row
+        await record_task_changes(
+            session, authenticated_user_id,
+            removed=[tuple(old)], added=[(task.status, task.priority, task.due_date)]
+        )
+        await session.commit()
+        await get_task_cache().invalidate(authenticated_user_id)
+        logger.info("Task completed", extra={"task_id": task.id})
         return task
     except HTTPException:
         raise
     except Exception as e:
-        session.rollback()
-        print(f"❌ Error completing task {task_id}: {str(e)}", file=sys.stderr, flush=True)
+        await session.rollback()
+        logger.exception("Failed to complete task", extra={"task_id": task_id})
         raise HTTPException(status_code=500, detail=f"Failed to complete task: {str(e)}")
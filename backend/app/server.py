@@ -0,0 +1,105 @@
+"""
+Production launcher: python -m app.server
+
+SERVER_MODE=gunicorn (the container default) runs gunicorn with the
+settings in gunicorn.conf.py:
+- The app is imported once in the master and the workers are forked from
+  it (preload), so they share its memory pages and a broken import stops
+  startup instead of crash-looping each worker.
+- SERVER_WORKERS uvicorn workers, or one per CPU of the container's quota
+  when 0. The quota comes from the cgroup (cpu.max, or cfs_quota_us on
+  cgroup v1) rather than os.cpu_count(), which reports the node's CPUs.
+- uvloop and httptools are used when installed (uvicorn[standard]).
+- A worker is replaced after SERVER_MAX_REQUESTS requests, which bounds
+  memory growth from fragmentation or leaks.
+- SIGTERM stops accepting connections and lets in-flight requests finish
+  for up to SERVER_GRACEFUL_TIMEOUT seconds before the workers exit.
+
+SERVER_MODE=uvicorn runs one uvicorn process with the same host, port and
+graceful timeout, for hosts without gunicorn or fork (e.g. Windows).
+
+Each worker has its own connection pool, password hashing threads, memory
+task cache and memory rate limits; size DB_POOL_SIZE for workers x
+replicas, and use the redis backends to share the caches and limits.
+"""
+import logging
+import math
+import os
+import sys
+from pathlib import Path
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP = "api.index:app"
+BACKEND_DIR = Path(__file__).parent.parent
+GUNICORN_CONFIG = BACKEND_DIR / "gunicorn.conf.py"
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> float | None:
+    """CPUs allowed by the cgroup's CFS quota, or None when there is no quota"""
+    try:
+        # cgroup v2: "<quota> <period>", quota "max" when unlimited
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: quota -1 when unlimited
+        quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+def available_cpus() -> int:
+    """CPUs this process may run on (affinity mask, else all of them)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def default_worker_count() -> int:
+    """One worker per CPU of the quota (rounded up), capped by the CPUs available"""
+    cpus = available_cpus()
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+def worker_count() -> int:
+    """SERVER_WORKERS, or default_worker_count() when it is 0"""
+    return settings.server_workers if settings.server_workers > 0 else default_worker_count()
+
+def run_gunicorn() -> None:
+    # Replace this process so gunicorn receives the container's signals directly
+    os.chdir(BACKEND_DIR)
+    os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "--config", str(GUNICORN_CONFIG), APP])
+
+def run_uvicorn() -> None:
+    import uvicorn
+
+    os.chdir(BACKEND_DIR)
+    uvicorn.run(
+        APP,
+        host=settings.server_host,
+        port=settings.server_port,
+        timeout_keep_alive=settings.server_keepalive,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+    )
+
+def main() -> None:
+    mode = settings.server_mode.lower()
+    if mode == "gunicorn":
+        try:
+            import gunicorn  # noqa: F401
+            import fcntl  # noqa: F401 (gunicorn only runs on Unix)
+        except ImportError:
+            logger.warning("SERVER_MODE=gunicorn but gunicorn is not available; running a single uvicorn process")
+        else:
+            return run_gunicorn()
+    elif mode != "uvicorn":
+        logger.warning("Unknown SERVER_MODE '%s'; running a single uvicorn process", mode)
+    run_uvicorn()
+
+if __name__ == "__main__":
+    main()
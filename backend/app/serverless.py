@@ -0,0 +1,59 @@
+"""
+Serverless entry point: app.serverless.handler (AWS Lambda and compatible
+runtimes, through Mangum; API Gateway, function URL and ALB events).
+
+A function instance imports this module once and then serves invocations
+one at a time until it is frozen or recycled. Everything that can outlive
+an invocation does:
+- The event loop. asyncpg connections belong to the loop that opened them,
+  so a warm invocation can only reuse the pooled connection on the same loop.
+- The app's startup (JWT secret, schema version check) runs on the first
+  invocation only. Mangum would otherwise run the lifespan startup and
+  shutdown around every invocation, a database round trip each time.
+- The database engine, created on first use by app.dependencies.database.
+
+Pick the pool with DB_POOL_PROFILE (this module defaults it to serverless):
+- serverless: keep one connection per instance and reuse it across warm
+  invocations (checked with a ping after a freeze).
+- external_pooler: behind PgBouncer-style transaction poolers (RDS Proxy,
+  Supabase/Neon poolers). Connect per request with a short timeout and no
+  prepared-statement caching; the pooler holds the server connections.
+
+benchmarks/serverless_invocations.py measures cold and warm invocations
+locally with both profiles.
+"""
+import asyncio
+import logging
+import os
+import time
+from mangum import Mangum
+
+# The app's default is the worker pool; set before app.config reads the environment
+os.environ.setdefault("DB_POOL_PROFILE", "serverless")
+
+from api.index import app
+
+logger = logging.getLogger(__name__)
+
+_handler = Mangum(app, lifespan="off")
+_lifespan = None
+_cold = True
+
+def start_app(loop: asyncio.AbstractEventLoop) -> None:
+    """Run the app's lifespan startup once; its shutdown never runs (instances are frozen, not stopped)"""
+    global _lifespan
+    if _lifespan is None:
+        lifespan = app.router.lifespan_context(app)
+        loop.run_until_complete(lifespan.__aenter__())
+        _lifespan = lifespan
+
+def handler(event: dict, context) -> dict:
+    global _cold
+    cold, _cold = _cold, False
+    start = time.perf_counter()
+    # Mangum set up this thread's loop when it was created; it serves every invocation
+    start_app(asyncio.get_event_loop())
+    response = _handler(event, context)
+    if cold:
+        logger.info("Cold invocation served", extra={"duration_ms": round((time.perf_counter() - start) * 1000, 1)})
+    return response
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+import asyncio
+import threading
+import time
+from app.config import settings
+from app.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_QUEUE_WAIT
+
+T = TypeVar("T")
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be shed"""
+
+class PasswordHasher:
+    """Bounded thread pool that runs bcrypt off the event loop
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the fork/pickle cost of a process pool. At most `workers` hashes
+    run at once and at most `max_queue` more may wait; anything beyond that
+    is rejected immediately instead of piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._hash_time_total = 0.0
+        self._hash_time_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so importing the app does not start threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run a hashing function in the pool, raising PasswordHasherBusy when full"""
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusy("Password hashing queue is full")
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def timed_call():
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started, time.perf_counter()
+
+        try:
+            future = self._get_executor().submit(timed_call)
+        except Exception:
+            self._release()
+            raise
+        # Freed when the hash finishes (or is cancelled before it starts), not
+        # when the caller stops waiting: a cancelled request's bcrypt still
+        # holds its thread until it returns
+        future.add_done_callback(lambda _: self._release())
+        result, started, finished = await asyncio.wrap_future(future)
+
+        self._record(started - submitted, finished - started)
+        PASSWORD_HASH_QUEUE_WAIT.labels(fn.__name__).observe(started - submitted)
+        PASSWORD_HASH_DURATION.labels(fn.__name__).observe(finished - started)
+        return result
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self._completed += 1
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._hash_time_total += hash_time
+            self._hash_time_max = max(self._hash_time_max, hash_time)
+
+    def stats(self) -> dict:
+        """Snapshot of pool usage and timings (milliseconds)"""
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.workers),
+                "queued": max(0, self._pending - self.workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_avg_ms": round(self._queue_wait_total / completed * 1000, 2),
+                "queue_wait_max_ms": round(self._queue_wait_max * 1000, 2),
+                "hash_time_avg_ms": round(self._hash_time_total / completed * 1000, 2),
+                "hash_time_max_ms": round(self._hash_time_max * 1000, 2),
+            }
+
+_password_hasher: PasswordHasher | None = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hashing pool"""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            workers=settings.password_hash_workers,
+            max_queue=settings.password_hash_max_queue,
+        )
+    return _password_hasher
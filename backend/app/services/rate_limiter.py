@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import math
+import time
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Buckets kept by the memory backend; the least recently used are dropped first
+MAX_TRACKED_BUCKETS = 100_000
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Token bucket: up to `capacity` requests at once, refilled evenly over `period` seconds"""
+
+    capacity: int
+    period: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+def parse_rate_limit(value: str) -> RateLimit | None:
+    """Parse '20/minute' (also second, hour, day); empty or '0/...' disables the limit"""
+    if not value.strip():
+        return None
+    count, _, period = value.strip().partition("/")
+    try:
+        capacity = int(count)
+        seconds = PERIODS[period.strip().lower().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit '{value}': expected e.g. '20/minute'")
+    return RateLimit(capacity, seconds) if capacity > 0 else None
+
+# (key, limit) of one bucket a request is checked against
+Bucket = tuple[str, RateLimit]
+
+class RateLimiter:
+    """Token-bucket rate limits per key (no-op base class)
+
+    hit() checks a request against all of its buckets and takes one token
+    from each only if every one has a token, so a request rejected by one
+    rule does not use up the others. It returns the seconds until each
+    bucket has a token (0 for the ones that had one); the request may go
+    ahead when all are 0.
+    """
+
+    backend = "none"
+
+    async def hit(self, buckets: list[Bucket]) -> list[float]:
+        return [0.0] * len(buckets)
+
+    async def stats(self) -> dict:
+        return {"backend": self.backend}
+
+class MemoryRateLimiter(RateLimiter):
+    """Buckets in this process
+
+    Each worker process and replica has its own buckets, so the effective
+    limit is the configured one times the number of processes.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_buckets: int = MAX_TRACKED_BUCKETS):
+        self.max_buckets = max_buckets
+        # key -> [tokens, monotonic time of the last update]
+        self._buckets: OrderedDict[str, list] = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    async def hit(self, buckets: list[Bucket]) -> list[float]:
+        return self.take(buckets)
+
+    def take(self, buckets: list[Bucket]) -> list[float]:
+        now = time.monotonic()
+        refilled = [self._refill(key, limit, now) for key, limit in buckets]
+        waits = [0.0 if bucket[0] >= 1 else (1 - bucket[0]) / limit.refill_per_second
+                 for bucket, (_, limit) in zip(refilled, buckets)]
+        if any(waits):
+            self.limited += 1
+            return waits
+        for bucket in refilled:
+            bucket[0] -= 1
+        self.allowed += 1
+        return waits
+
+    def _refill(self, key: str, limit: RateLimit, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(limit.capacity), now]
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.refill_per_second)
+            bucket[1] = now
+        return bucket
+
+    async def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "buckets": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+# One hash per bucket with the tokens left and the server time of the last
+# update. Using the Redis clock keeps replicas with skewed clocks consistent.
+# ARGV holds capacity and refill rate per key; tokens are only taken when
+# every bucket has one.
+_REDIS_TAKE = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local waits = {}
+local limited = false
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local refill = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local left = tonumber(bucket[1])
+    if left == nil then
+        left = capacity
+    else
+        left = math.min(capacity, left + (now - tonumber(bucket[2])) * refill)
+    end
+    waits[i] = '0'
+    if left < 1 then
+        waits[i] = tostring((1 - left) / refill)
+        limited = true
+    end
+    tokens[i] = left
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local refill = tonumber(ARGV[2 * i])
+    if not limited then
+        tokens[i] = tokens[i] - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'updated', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / refill) + 1)
+end
+return waits
+"""
+
+class RedisRateLimiter(RateLimiter):
+    """Buckets shared by every replica through a Redis-compatible server
+
+    When Redis fails, the request is checked against a per-process
+    MemoryRateLimiter instead, so the limits degrade to per-process ones
+    rather than disappearing.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, prefix: str = "ratelimit"):
+        import redis.asyncio as redis_asyncio
+
+        self.prefix = prefix
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._take_script = self._client.register_script(_REDIS_TAKE)
+        self._fallback = MemoryRateLimiter()
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def hit(self, buckets: list[Bucket]) -> list[float]:
+        try:
+            waits = [float(wait) for wait in await self._take_script(
+                keys=[f"{self.prefix}:{key}" for key, _ in buckets],
+                args=[value for _, limit in buckets for value in (limit.capacity, limit.refill_per_second)]
+            )]
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Rate limiter check failed, using per-process limits: %s", e)
+            return self._fallback.take(buckets)
+        if any(waits):
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return waits
+
+    async def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+            "fallback": await self._fallback.stats(),
+        }
+
+_rate_limiter: RateLimiter | None = None
+
+def create_rate_limiter() -> RateLimiter:
+    """Build the limiter selected by RATE_LIMIT_BACKEND ("none", "memory" or "redis")"""
+    backend = settings.rate_limit_backend.lower()
+    if backend == "memory":
+        return MemoryRateLimiter()
+    if backend == "redis":
+        if not settings.redis_url:
+            logger.warning("RATE_LIMIT_BACKEND=redis but REDIS_URL is not set; using per-process rate limits")
+            return MemoryRateLimiter()
+        try:
+            return RedisRateLimiter(settings.redis_url)
+        except ImportError:
+            logger.warning("RATE_LIMIT_BACKEND=redis but the redis package is not installed; using per-process rate limits")
+            return MemoryRateLimiter()
+    if backend != "none":
+        logger.warning("Unknown RATE_LIMIT_BACKEND '%s'; using per-process rate limits", backend)
+        return MemoryRateLimiter()
+    return RateLimiter()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = create_rate_limiter()
+    return _rate_limiter
+
+def retry_after_seconds(wait: float) -> int:
+    """Whole seconds for a Retry-After header (at least 1)"""
+    return max(1, math.ceil(wait))
@@ -0,0 +1,250 @@
+from collections import OrderedDict
+import logging
+import time
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Generations kept for the memory backend; older users fall back to generation 0
+MAX_TRACKED_GENERATIONS = 100_000
+
+class TaskCache:
+    """Per-user cache of serialized task reads (no-op base class)
+
+    Entries are opaque bytes stored under (user_id, key). Readers take the
+    user's generation from get() and hand it back to set(); invalidate()
+    moves the user to a new generation, so a read that loaded rows before a
+    concurrent write cannot store its stale result afterwards.
+    """
+
+    backend = "none"
+    enabled = False
+
+    async def get(self, user_id: int, key: str) -> tuple[int, bytes | None]:
+        return 0, None
+
+    async def set(self, user_id: int, generation: int, key: str, value: bytes) -> None:
+        return None
+
+    async def invalidate(self, user_id: int) -> None:
+        return None
+
+    async def stats(self) -> dict:
+        return {"backend": self.backend}
+
+class MemoryTaskCache(TaskCache):
+    """In-process LRU bounded by total bytes, with a TTL per entry
+
+    Only suitable for a single worker process: writes handled by another
+    process or replica do not invalidate this one, so its entries can be
+    stale for up to `ttl` seconds there.
+    """
+
+    backend = "memory"
+    enabled = True
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[int, str], tuple[float, bytes]] = OrderedDict()
+        self._user_keys: dict[int, set[str]] = {}
+        self._generations: OrderedDict[int, int] = OrderedDict()
+        self._next_generation = 1
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, entry_key: tuple[int, str]) -> None:
+        _, value = self._entries.pop(entry_key)
+        self._bytes -= len(value)
+        user_keys = self._user_keys.get(entry_key[0])
+        if user_keys is not None:
+            user_keys.discard(entry_key[1])
+            if not user_keys:
+                del self._user_keys[entry_key[0]]
+
+    async def get(self, user_id: int, key: str) -> tuple[int, bytes | None]:
+        generation = self._generations.get(user_id, 0)
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            self.misses += 1
+            return generation, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove((user_id, key))
+            self.evictions += 1
+            self.misses += 1
+            return generation, None
+        self._entries.move_to_end((user_id, key))
+        self.hits += 1
+        return generation, value
+
+    async def set(self, user_id: int, generation: int, key: str, value: bytes) -> None:
+        if generation != self._generations.get(user_id, 0) or len(value) > self.max_bytes:
+            return
+        if (user_id, key) in self._entries:
+            self._remove((user_id, key))
+        self._entries[(user_id, key)] = (time.monotonic() + self.ttl, value)
+        self._user_keys.setdefault(user_id, set()).add(key)
+        self._bytes += len(value)
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def invalidate(self, user_id: int) -> None:
+        self.invalidations += 1
+        self._generations[user_id] = self._next_generation
+        self._generations.move_to_end(user_id)
+        self._next_generation += 1
+        while len(self._generations) > MAX_TRACKED_GENERATIONS:
+            self._generations.popitem(last=False)
+        for key in list(self._user_keys.get(user_id, ())):
+            self._remove((user_id, key))
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "entries": len(self._entries),
+            "users": len(self._user_keys),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# Each user has a generation counter and one hash of entries whose fields are
+# prefixed with the generation they were read at. Both keys share the {user}
+# hash tag, so the scripts also work on Redis Cluster.
+_REDIS_GET = """
+local generation = redis.call('GET', KEYS[1]) or '0'
+return {generation, redis.call('HGET', KEYS[2], generation .. ':' .. ARGV[1])}
+"""
+
+_REDIS_SET = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[1] .. ':' .. ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+"""
+
+class RedisTaskCache(TaskCache):
+    """Cache shared by every replica through a Redis-compatible server
+
+    Writes on any replica invalidate the entries seen by all of them. Redis
+    errors are counted and treated as misses so the database stays the
+    source of truth.
+    """
+
+    backend = "redis"
+    enabled = True
+
+    def __init__(self, url: str, ttl: float, prefix: str = "taskcache"):
+        import redis.asyncio as redis_asyncio
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._get_script = self._client.register_script(_REDIS_GET)
+        self._set_script = self._client.register_script(_REDIS_SET)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def _keys(self, user_id: int) -> list[str]:
+        return [f"{self.prefix}:{{{user_id}}}:generation", f"{self.prefix}:{{{user_id}}}:entries"]
+
+    def _report_error(self, operation: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning("Task cache %s failed: %s", operation, error)
+
+    async def get(self, user_id: int, key: str) -> tuple[int, bytes | None]:
+        try:
+            generation, value = await self._get_script(keys=self._keys(user_id), args=[key])
+        except Exception as e:
+            self._report_error("get", e)
+            # -1 never matches a stored generation, so set() becomes a no-op
+            return -1, None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return int(generation), value
+
+    async def set(self, user_id: int, generation: int, key: str, value: bytes) -> None:
+        if generation < 0:
+            return
+        try:
+            await self._set_script(
+                keys=self._keys(user_id),
+                args=[generation, key, value, max(1, int(self.ttl))]
+            )
+        except Exception as e:
+            self._report_error("set", e)
+
+    async def invalidate(self, user_id: int) -> None:
+        self.invalidations += 1
+        generation_key, entries_key = self._keys(user_id)
+        try:
+            async with self._client.pipeline(transaction=True) as pipeline:
+                pipeline.incr(generation_key)
+                # Outlive any entry so a generation is never reused while entries may exist
+                pipeline.expire(generation_key, max(86400, int(self.ttl) * 2))
+                pipeline.delete(entries_key)
+                await pipeline.execute()
+        except Exception as e:
+            self._report_error("invalidate", e)
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": self.backend,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+        try:
+            memory = await self._client.info("memory")
+            stats["server_used_memory_bytes"] = memory.get("used_memory")
+        except Exception as e:
+            self._report_error("stats", e)
+        return stats
+
+_task_cache: TaskCache | None = None
+
+def create_task_cache() -> TaskCache:
+    """Build the cache selected by TASK_CACHE_BACKEND ("none", "memory" or "redis")"""
+    backend = settings.task_cache_backend.lower()
+    if backend == "memory":
+        return MemoryTaskCache(settings.task_cache_max_bytes, settings.task_cache_ttl)
+    if backend == "redis":
+        if not settings.redis_url:
+            logger.warning("TASK_CACHE_BACKEND=redis but REDIS_URL is not set; task cache disabled")
+            return TaskCache()
+        try:
+            return RedisTaskCache(settings.redis_url, settings.task_cache_ttl)
+        except ImportError:
+            logger.warning("TASK_CACHE_BACKEND=redis but the redis package is not installed; task cache disabled")
+            return TaskCache()
+    if backend != "none":
+        logger.warning("Unknown TASK_CACHE_BACKEND '%s'; task cache disabled", backend)
+    return TaskCache()
+
+def get_task_cache() -> TaskCache:
+    """Get the process-wide task read cache"""
+    global _task_cache
+    if _task_cache is None:
+        _task_cache = create_task_cache()
+    return _task_cache
@@ -0,0 +1,204 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+import base64
+import binascii
+import json
+import logging
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import BigInteger, Text, cast, delete, exists, func, insert, tuple_
+from app.config import settings
+from app.metrics import TASK_CHANGE_FEED_STALLS
+from app.models import Task, TaskTombstone
+
+logger = logging.getLogger(__name__)
+
+# Tombstones outlive the cursors that may need them by this much, for deletes
+# whose transaction was already open when a cursor was issued
+TOMBSTONE_SLACK = timedelta(days=1)
+
+# (change_xid, task id): a position in a user's change feed
+ChangePosition = tuple[int, int]
+MAX_BIGINT = 2**63 - 1
+
+class CursorExpired(Exception):
+    """The cursor is older than TASK_CHANGE_RETENTION_DAYS; tombstones it needs may be gone"""
+
+class FeedStalled(CursorExpired):
+    """A transaction left open has held the feed back longer than TASK_CHANGE_MAX_LAG_SECONDS"""
+
+@dataclass
+class TaskChanges:
+    tasks: list[Task]
+    deleted: list[int]
+    cursor: str
+    has_more: bool
+
+@dataclass(frozen=True)
+class ChangeCursor:
+    """A client's place in its change feed
+
+    `issued` is when the client had seen every change before `position`.
+    `held` is since when the feed has stood at `position`, for final cursors;
+    it only differs from `issued` while an open transaction holds the horizon.
+    `resume` is set on the pages of a sync without `since`: the horizon the
+    sync started at, where the feed continues once every page is sent.
+    """
+    position: ChangePosition
+    issued: datetime
+    held: Optional[datetime] = None
+    resume: Optional[int] = None
+
+def snapshot_xmin():
+    """Oldest transaction id still running, as a BIGINT
+
+    Every write below it has committed or rolled back, so the feed never
+    moves its cursor past a change that could still appear.
+    """
+    return cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+def encode_change_cursor(cursor: ChangeCursor) -> str:
+    """Encode a cursor for the client; the optional fields are left out when unset"""
+    payload = {"xid": cursor.position[0], "id": cursor.position[1], "issued": cursor.issued.isoformat()}
+    if cursor.held is not None:
+        payload["held"] = cursor.held.isoformat()
+    if cursor.resume is not None:
+        payload["resume"] = cursor.resume
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def _bigint_field(payload: dict, name: str) -> int:
+    value = payload[name]
+    # bool is an int subclass; the positions are compared with BIGINT columns
+    if type(value) is not int or not 0 <= value <= MAX_BIGINT:
+        raise ValueError(f"'{name}' must be an integer from 0 to {MAX_BIGINT}")
+    return value
+
+def _time_field(payload: dict, name: str) -> datetime:
+    value = datetime.fromisoformat(payload[name])
+    if value.tzinfo is None:
+        # Compared with the database's now(), which has a time zone
+        raise ValueError(f"'{name}' must have a time zone")
+    return value
+
+def decode_change_cursor(cursor: str) -> ChangeCursor:
+    """Decode a cursor from encode_change_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return ChangeCursor(
+            position=(_bigint_field(payload, "xid"), _bigint_field(payload, "id")),
+            issued=_time_field(payload, "issued"),
+            held=_time_field(payload, "held") if "held" in payload else None,
+            resume=_bigint_field(payload, "resume") if "resume" in payload else None,
+        )
+    except KeyError as e:
+        raise ValueError(f"missing field {e}")
+    except (TypeError, binascii.Error, UnicodeDecodeError) as e:
+        # Not base64 or not a JSON object (JSON syntax errors are ValueErrors already)
+        raise ValueError(f"expected a base64 JSON object ({e})")
+
+def held_since(start: ChangeCursor, horizon: int, now: datetime) -> datetime:
+    """Since when the feed has stood still at `horizon`, seen from the cursor a call started at
+
+    A call that ends at the position it started from passes the time on to
+    its cursor; any other cursor starts counting again.
+    """
+    if start.resume is None and start.position == (horizon, 0):
+        return start.held or start.issued
+    return now
+
+async def record_task_deletions(session: AsyncSession, user_id: int, task_ids: Iterable[int]) -> None:
+    """Leave tombstones for deleted tasks in the caller's transaction
+
+    The same statement prunes the user's tombstones that no unexpired cursor
+    can need any more, so they stay bounded without a cleanup job.
+    """
+    rows = [{"task_id": task_id, "user_id": user_id} for task_id in task_ids]
+    if not rows:
+        return
+    statement = insert(TaskTombstone).values(rows)
+    if settings.task_change_retention_days > 0:
+        keep = timedelta(days=settings.task_change_retention_days) + TOMBSTONE_SLACK
+        expired = (
+            delete(TaskTombstone)
+            .where(TaskTombstone.user_id == user_id, TaskTombstone.deleted_at < func.now() - keep)
+            .cte("expired")
+        )
+        statement = statement.add_cte(expired)
+    await session.exec(statement)
+
+async def load_task_changes(session: AsyncSession, user_id: int, cursor: Optional[str], limit: int) -> TaskChanges:
+    """Tasks written and deleted after `cursor` (everything without one), oldest change first
+
+    Both tables are read through their (user_id, change_xid, id) indexes from
+    the cursor's position, so the cost follows the number of changes rather
+    than the number of tasks. Changes of transactions newer than the oldest
+    one still running are left for the next call; if that has kept this
+    user's changes back for over TASK_CHANGE_MAX_LAG_SECONDS, FeedStalled
+    sends the client to a sync without `since`, which does not wait.
+    """
+    horizon, now = (await session.exec(select(snapshot_xmin(), func.now()))).one()
+    # A sync without `since` reads every row its snapshot sees: changes still
+    # being written are not visible to it, and its last cursor goes back to
+    # the horizon it started at, so the feed picks them up from there
+    start = decode_change_cursor(cursor) if cursor else ChangeCursor((0, 0), now, resume=horizon)
+    retention = settings.task_change_retention_days
+    if retention > 0 and start.issued < now - timedelta(days=retention):
+        raise CursorExpired(f"cursor is older than {retention} days")
+    held = held_since(start, horizon, now)
+    max_lag = settings.task_change_max_lag_seconds
+    if max_lag > 0 and now - held > timedelta(seconds=max_lag) and await _has_withheld_changes(session, user_id, horizon):
+        TASK_CHANGE_FEED_STALLS.inc()
+        logger.warning(
+            "Change feed held at transaction %s for %.0fs by a transaction left open; user %s resyncs",
+            horizon, (now - held).total_seconds(), user_id
+        )
+        raise FeedStalled(f"changes have been held back for over {max_lag} seconds by a long-running transaction")
+
+    task_filter = [Task.user_id == user_id, tuple_(Task.change_xid, Task.id) > tuple_(*start.position)]
+    tombstone_filter = [
+        TaskTombstone.user_id == user_id,
+        tuple_(TaskTombstone.change_xid, TaskTombstone.task_id) > tuple_(*start.position)
+    ]
+    if start.resume is None:
+        task_filter.append(Task.change_xid < horizon)
+        tombstone_filter.append(TaskTombstone.change_xid < horizon)
+    tasks = (await session.exec(
+        select(Task).where(*task_filter).order_by(Task.change_xid, Task.id).limit(limit + 1)
+    )).all()
+    tombstones = (await session.exec(
+        select(TaskTombstone.change_xid, TaskTombstone.task_id)
+        .where(*tombstone_filter)
+        .order_by(TaskTombstone.change_xid, TaskTombstone.task_id)
+        .limit(limit + 1)
+    )).all()
+
+    # Task ids are never reused, so (change_xid, id) orders both kinds of change
+    changes = sorted(
+        [(task.change_xid, task.id, task) for task in tasks] + [(xid, task_id, None) for xid, task_id in tombstones],
+        key=lambda change: change[:2]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        # Mid-way: the client has still only seen everything up to the original cursor
+        next_cursor = ChangeCursor(changes[-1][:2], start.issued, start.held, start.resume)
+    elif start.resume is not None:
+        next_cursor = ChangeCursor((start.resume, 0), now)
+    else:
+        next_cursor = ChangeCursor((horizon, 0), now, held)
+    return TaskChanges(
+        tasks=[task for _, _, task in changes if task is not None],
+        deleted=[task_id for _, task_id, task in changes if task is None],
+        cursor=encode_change_cursor(next_cursor),
+        has_more=has_more,
+    )
+
+async def _has_withheld_changes(session: AsyncSession, user_id: int, horizon: int) -> bool:
+    """Whether the user has changes at or past the horizon, which the feed is holding back"""
+    withheld = select(
+        exists().where(Task.user_id == user_id, Task.change_xid >= horizon)
+        | exists().where(TaskTombstone.user_id == user_id, TaskTombstone.change_xid >= horizon)
+    )
+    return (await session.exec(withheld)).one()
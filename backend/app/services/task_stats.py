@@ -0,0 +1,177 @@
+from collections import Counter
+from datetime import date, datetime
+from typing import Iterable, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import any_, bindparam, cast, delete, func, Date
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from app.models import Task, TaskStats, TaskDueStats
+from app.models.task import current_xact_id
+
+# (status, priority, due_date) of a task before or after a write
+TaskSnapshot = tuple[str, str, Optional[datetime]]
+
+COUNTER_COLUMNS = ["total", "pending", "completed", "priority_low", "priority_medium", "priority_high"]
+
+def task_snapshot(values: dict) -> TaskSnapshot:
+    """(status, priority, due_date) of a task, as counted by the task stats"""
+    return values["status"], values["priority"], values["due_date"]
+
+def task_stats_deltas(
+    removed: Iterable[TaskSnapshot] = (),
+    added: Iterable[TaskSnapshot] = ()
+) -> tuple[Counter, dict[date, Counter]]:
+    """Counter changes for tasks leaving (`removed`) and entering (`added`) a user's list
+
+    An update is its old snapshot removed and its new one added, so fields it
+    did not change cancel out.
+    """
+    counters = Counter()
+    days: dict[date, Counter] = {}
+    for sign, snapshots in ((-1, removed), (1, added)):
+        for status, priority, due_date in snapshots:
+            counters["total"] += sign
+            if status in ("pending", "completed"):
+                counters[status] += sign
+            if priority in ("low", "medium", "high"):
+                counters[f"priority_{priority}"] += sign
+            if due_date is not None:
+                day = days.setdefault(due_date.date(), Counter())
+                day["total"] += sign
+                if status == "pending":
+                    day["pending"] += sign
+    return counters, {day: counts for day, counts in days.items() if any(counts.values())}
+
+async def record_task_changes(
+    session: AsyncSession,
+    user_id: int,
+    removed: Iterable[TaskSnapshot] = (),
+    added: Iterable[TaskSnapshot] = ()
+) -> None:
+    """Apply the counter changes of a task write in the caller's transaction
+
+    The user's task_stats row is always written first, so it also serialises
+    concurrent writers and rebuilds for that user. It is written even when no
+    counter changes (a title edit), to move the list version on. Due days
+    are upserted in date order to keep lock order consistent between
+    transactions.
+    """
+    removed, added = list(removed), list(added)
+    if not removed and not added:
+        return
+    counters, days = task_stats_deltas(removed, added)
+
+    statement = pg_insert(TaskStats).values(
+        user_id=user_id, version=current_xact_id(), **{column: counters[column] for column in COUNTER_COLUMNS}
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[TaskStats.user_id],
+        set_={
+            **{column: getattr(TaskStats, column) + statement.excluded[column] for column in COUNTER_COLUMNS},
+            "version": statement.excluded.version,
+        }
+    )
+    await session.exec(statement)
+
+    if not days:
+        return
+    statement = pg_insert(TaskDueStats).values([
+        {"user_id": user_id, "due_day": day, "total": days[day]["total"], "pending": days[day]["pending"]}
+        for day in sorted(days)
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[TaskDueStats.user_id, TaskDueStats.due_day],
+        set_={
+            "total": TaskDueStats.total + statement.excluded.total,
+            "pending": TaskDueStats.pending + statement.excluded.pending,
+        }
+    )
+    await session.exec(statement)
+
+    emptied = [day for day, counts in days.items() if counts["total"] < 0]
+    if emptied:
+        await session.exec(
+            delete(TaskDueStats).where(
+                TaskDueStats.user_id == user_id,
+                TaskDueStats.due_day == any_(bindparam("days", emptied, type_=ARRAY(Date))),
+                TaskDueStats.total <= 0
+            )
+        )
+
+async def rebuild_task_stats(session: AsyncSession, user_id: int) -> None:
+    """Recompute a user's counters from the tasks table with GROUP BY and commit
+
+    Used when a user has no counters yet (or they went negative after writes
+    that bypassed the API). Locking the task_stats row first makes concurrent
+    writers wait, so their deltas land on top of the rebuilt values.
+    """
+    # A new row gets a fresh version, so list ETags issued before the
+    # counters were dropped cannot match again
+    lock = pg_insert(TaskStats).values(user_id=user_id, version=current_xact_id()).on_conflict_do_update(
+        index_elements=[TaskStats.user_id],
+        set_={"total": TaskStats.total}
+    )
+    await session.exec(lock)
+
+    counts = (await session.exec(
+        select(
+            func.count(),
+            func.count().filter(Task.status == "pending"),
+            func.count().filter(Task.status == "completed"),
+            func.count().filter(Task.priority == "low"),
+            func.count().filter(Task.priority == "medium"),
+            func.count().filter(Task.priority == "high"),
+        ).where(Task.user_id == user_id)
+    )).one()
+    stats = await session.get(TaskStats, user_id, populate_existing=True)
+    for column, value in zip(COUNTER_COLUMNS, counts):
+        setattr(stats, column, value)
+
+    due_day = cast(Task.due_date, Date)
+    days = (await session.exec(
+        select(due_day, func.count(), func.count().filter(Task.status == "pending"))
+        .where(Task.user_id == user_id, Task.due_date.is_not(None))
+        .group_by(due_day)
+    )).all()
+    await session.exec(delete(TaskDueStats).where(TaskDueStats.user_id == user_id))
+    if days:
+        await session.exec(pg_insert(TaskDueStats).values([
+            {"user_id": user_id, "due_day": day, "total": total, "pending": pending}
+            for day, total, pending in days
+        ]))
+    await session.commit()
+
+async def load_task_stats(session: AsyncSession, user_id: int, today: date) -> Optional[dict]:
+    """Read a user's counters plus overdue and due-today counts for `today`
+
+    One primary-key lookup plus reads of the user's due-day rows, so the cost
+    depends on how many distinct days have tasks due, not on how many tasks
+    there are. Returns None when the counters are missing or inconsistent
+    and need a rebuild.
+    """
+    overdue = (
+        select(func.coalesce(func.sum(TaskDueStats.pending), 0))
+        .where(TaskDueStats.user_id == user_id, TaskDueStats.due_day < today)
+        .scalar_subquery()
+    )
+    due_today = (
+        select(func.coalesce(func.sum(TaskDueStats.total), 0))
+        .where(TaskDueStats.user_id == user_id, TaskDueStats.due_day == today)
+        .scalar_subquery()
+    )
+    row = (await session.exec(
+        select(TaskStats, overdue, due_today).where(TaskStats.user_id == user_id)
+    )).first()
+    if row is None:
+        return None
+
+    stats, overdue_count, due_today_count = row
+    if min(getattr(stats, column) for column in COUNTER_COLUMNS) < 0 or overdue_count < 0:
+        return None
+    return {
+        "total": stats.total,
+        "by_status": {"pending": stats.pending, "completed": stats.completed},
+        "by_priority": {"low": stats.priority_low, "medium": stats.priority_medium, "high": stats.priority_high},
+        "overdue": overdue_count,
+        "due_today": due_today_count,
+    }
@@ -0,0 +1,187 @@
+from collections import defaultdict
+import asyncio
+import contextvars
+import logging
+import time
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.dependencies.database import get_async_engine
+from app.metrics import TASK_GROUP_COMMIT_BATCH_SIZE, TASK_GROUP_COMMIT_DURATION, TASK_GROUP_COMMIT_FALLBACKS
+from app.models import Task
+from app.request_timing import timed
+from app.services.task_cache import get_task_cache
+from app.services.task_stats import record_task_changes, task_snapshot
+
+logger = logging.getLogger(__name__)
+
+class TaskWriter:
+    """Writes single task creates in the request's own transaction (base class)
+
+    One INSERT, the stats upserts and a commit per request: the default, and
+    the right choice unless many creates arrive at the same moment.
+    """
+
+    mode = "direct"
+
+    async def create(self, session: AsyncSession, values: dict) -> Task:
+        # Let the database fill created_at and updated_at via server defaults
+        task = Task(**values)
+        session.add(task)
+        await record_task_changes(session, values["user_id"], added=[task_snapshot(values)])
+        await session.commit()
+        await get_task_cache().invalidate(values["user_id"])
+        await session.refresh(task)
+        return task
+
+    def stats(self) -> dict:
+        return {"mode": self.mode}
+
+class GroupCommitTaskWriter(TaskWriter):
+    """Coalesces task creates from concurrent requests into shared transactions
+
+    The first create starts a window of `window` seconds. Creates arriving
+    on this worker meanwhile (from any user) join it, and it is written when
+    the window ends or `max_batch` rows are waiting: one multi-row
+    INSERT ... RETURNING, the stats upserts of each user and one commit, on
+    a connection of its own. Each request then gets its own row back.
+
+    If the group fails, its rows are retried one per transaction, so a bad
+    row fails only its own request. A request cancelled before its group is
+    taken leaves it; after that its row is written anyway.
+    """
+
+    mode = "group_commit"
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # Strong references: the loop only keeps weak ones to running tasks
+        self._flushes: set[asyncio.Task] = set()
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+        self.errors = 0
+
+    async def create(self, session: AsyncSession, values: dict) -> Task:
+        loop = asyncio.get_running_loop()
+        entry = (values, loop.create_future())
+        self._pending.append(entry)
+        if len(self._pending) >= self.max_batch:
+            self._start_flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._start_flush, loop)
+        try:
+            # The statements run outside this request, so its Server-Timing
+            # shows the wait here instead of database time
+            with timed("group_commit"):
+                return await entry[1]
+        except asyncio.CancelledError:
+            self._pending = [pending for pending in self._pending if pending is not entry]
+            raise
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if self._pending:
+            self._timer = loop.call_later(self.window, self._start_flush, loop)
+        if not batch:
+            return
+        # Run in an empty context: the group's statements belong to no single
+        # request's Server-Timing or log fields
+        task = contextvars.Context().run(loop.create_task, self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.rows += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        TASK_GROUP_COMMIT_BATCH_SIZE.observe(len(batch))
+
+        start = time.perf_counter()
+        try:
+            created = await self._write([values for values, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self.errors += 1
+                _resolve(batch[0][1], error=e)
+                return
+            self.fallbacks += 1
+            TASK_GROUP_COMMIT_FALLBACKS.inc()
+            logger.warning("Group commit of %d tasks failed (%s); writing them one by one", len(batch), e)
+            for values, future in batch:
+                try:
+                    _resolve(future, (await self._write([values]))[0])
+                except Exception as row_error:
+                    self.errors += 1
+                    _resolve(future, error=row_error)
+            return
+        finally:
+            TASK_GROUP_COMMIT_DURATION.observe(time.perf_counter() - start)
+
+        for (_, future), task in zip(batch, created):
+            _resolve(future, task)
+
+    async def _write(self, rows: list[dict]) -> list[Task]:
+        """Insert `rows` and update their users' stats in one transaction"""
+        snapshots = defaultdict(list)
+        for row in rows:
+            snapshots[row["user_id"]].append(task_snapshot(row))
+
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+            statement = insert(Task).returning(Task, sort_by_parameter_order=True)
+            created = (await session.exec(statement, params=rows)).scalars().all()
+            # Users in id order, so concurrent groups lock their stats rows in the same order
+            for user_id in sorted(snapshots):
+                await record_task_changes(session, user_id, added=snapshots[user_id])
+            await session.commit()
+
+        cache = get_task_cache()
+        for user_id in snapshots:
+            await cache.invalidate(user_id)
+        return created
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "waiting": len(self._pending),
+            "flushing": len(self._flushes),
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "fallbacks": self.fallbacks,
+            "errors": self.errors,
+        }
+
+def _resolve(future: asyncio.Future, result: Task | None = None, error: Exception | None = None) -> None:
+    # The request may have been cancelled while its row was being written
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+_task_writer: TaskWriter | None = None
+
+def create_task_writer() -> TaskWriter:
+    """Build the writer selected by TASK_GROUP_COMMIT_WINDOW_MS (0: direct)"""
+    if settings.task_group_commit_window_ms > 0 and settings.task_group_commit_max_batch > 1:
+        return GroupCommitTaskWriter(settings.task_group_commit_window_ms / 1000, settings.task_group_commit_max_batch)
+    return TaskWriter()
+
+def get_task_writer() -> TaskWriter:
+    """Get the process-wide writer of single task creates"""
+    global _task_writer
+    if _task_writer is None:
+        _task_writer = create_task_writer()
+    return _task_writer
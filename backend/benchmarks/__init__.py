@@ -0,0 +1 @@
+# Performance benchmarks (run from the backend directory: python -m benchmarks.<name>)
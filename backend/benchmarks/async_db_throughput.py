@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput of one worker: sync Session vs AsyncSession.
+
+Both variants run inside `async def` handlers on a single event loop, which is
+exactly how one uvicorn worker serves traffic. The "sync" variant reproduces the
+old handlers (blocking Session.exec inside an async route); the "async" variant
+uses the asyncpg engine from app.dependencies.database.
+
+While each variant is under load, a probe route that never touches the database
+is polled so the report also shows how much a blocked event loop delays
+unrelated requests.
+
+Usage (from the backend directory, DATABASE_URL pointing at a test database):
+    python -m benchmarks.async_db_throughput --requests 400 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.dependencies.database import get_async_database_url, get_database_url
+
+def build_app(pool_size: int, query_seconds: float) -> FastAPI:
+    """Build a throwaway app with one sync-session and one async-session route"""
+    db_url = get_database_url()
+    async_url, ssl_mode = get_async_database_url()
+    sync_engine = create_engine(db_url, pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(
+        async_url, pool_size=pool_size, max_overflow=0, connect_args={"ssl": ssl_mode}
+    )
+    query = text("SELECT pg_sleep(:seconds)")
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_route():
+        with Session(sync_engine) as session:
+            session.exec(query, params={"seconds": query_seconds})
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_route():
+        async with AsyncSession(async_engine) as session:
+            await session.exec(query, params={"seconds": query_seconds})
+        return {"ok": True}
+
+    @app.get("/probe")
+    async def probe():
+        return {"ok": True}
+
+    app.state.engines = (sync_engine, async_engine)
+    return app
+
+async def run_variant(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    """Fire `total` requests at `path` with bounded concurrency while probing latency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    probe_latencies: list[float] = []
+    done = asyncio.Event()
+
+    async def one_request():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    async def probe_loop():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/probe")
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    prober = asyncio.create_task(probe_loop())
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await prober
+
+    probe_latencies.sort()
+    return {
+        "requests": total,
+        "seconds": elapsed,
+        "throughput_rps": total / elapsed,
+        "probe_p50_ms": statistics.median(probe_latencies) if probe_latencies else 0.0,
+        "probe_max_ms": probe_latencies[-1] if probe_latencies else 0.0,
+    }
+
+async def main(args: argparse.Namespace) -> None:
+    app = build_app(args.pool_size, args.query_ms / 1000)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm both pools so connection setup is not measured
+        await client.get("/sync")
+        await client.get("/async")
+
+        results = {}
+        for label, path in (("sync Session (before)", "/sync"), ("AsyncSession (after)", "/async")):
+            results[label] = await run_variant(client, path, args.requests, args.concurrency)
+
+    sync_engine, async_engine = app.state.engines
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"pool_size {args.pool_size}, query {args.query_ms} ms, one event loop"
+    )
+    print(f"{'variant':<24}{'req/s':>10}{'seconds':>10}{'probe p50 ms':>15}{'probe max ms':>15}")
+    for label, result in results.items():
+        print(
+            f"{label:<24}{result['throughput_rps']:>10.1f}{result['seconds']:>10.2f}"
+            f"{result['probe_p50_ms']:>15.1f}{result['probe_max_ms']:>15.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="requests per variant")
+    parser.add_argument("--concurrency", type=int, default=20, help="in-flight requests")
+    parser.add_argument("--pool-size", type=int, default=20, help="connections per engine")
+    parser.add_argument("--query-ms", type=float, default=20.0, help="simulated query time (pg_sleep)")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
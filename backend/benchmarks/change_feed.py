@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Delta sync (GET /api/tasks/changes) vs re-downloading the full task list.
+
+For each --sizes entry, one seeded account gets that many tasks. A client
+syncs from scratch to get a cursor. Then --changes tasks are updated and a
+quarter as many deleted, through the route functions, and the report times:
+- delta: load_task_changes() from the cursor (the changed rows plus tombstones)
+- full list: every task of the account, as GET /api/tasks returned it before
+
+The delta time should stay flat as the account grows; the full list grows
+with it. The database must be disposable: it is migrated and seeded.
+
+Usage (from the backend directory):
+    python -m benchmarks.change_feed --database-url postgresql://... --sizes 1000,10000,100000 --changes 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from benchmarks.load_test import migrate_and_seed, percentile
+from benchmarks.serverless_invocations import seeded_account
+
+async def measure(runs: int, query) -> tuple[float, float, int]:
+    from app.dependencies.database import get_async_engine
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    latencies = []
+    rows = 0
+    for _ in range(runs):
+        # A fresh session per call, like one request
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+            start = time.perf_counter()
+            rows = await query(session)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), percentile(latencies, 0.95), rows
+
+async def run_size(args: argparse.Namespace, user_id: int) -> dict:
+    from sqlmodel import select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.dependencies.database import get_async_engine
+    from app.models import Task
+    from app.routes.tasks import MAX_CHANGES_LIMIT, TaskUpdate, delete_task, update_task
+    from app.services.task_changes import load_task_changes
+
+    engine = get_async_engine()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        cursor, has_more = None, True
+        while has_more:
+            changes = await load_task_changes(session, user_id, cursor, MAX_CHANGES_LIMIT)
+            cursor, has_more = changes.cursor, changes.has_more
+        task_ids = (await session.exec(select(Task.id).where(Task.user_id == user_id))).all()
+
+    rng = random.Random(args.seed)
+    picked = rng.sample(task_ids, args.changes + args.changes // 4)
+    for task_id in picked[:args.changes]:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await update_task(task_id, TaskUpdate(title=f"changed {task_id}"), user_id, session)
+    for task_id in picked[args.changes:]:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await delete_task(task_id, user_id, session)
+
+    async def delta(session) -> int:
+        changes = await load_task_changes(session, user_id, cursor, MAX_CHANGES_LIMIT)
+        return len(changes.tasks) + len(changes.deleted)
+
+    async def full_list(session) -> int:
+        statement = select(Task).where(Task.user_id == user_id).order_by(Task.created_at, Task.id)
+        return len((await session.exec(statement)).all())
+
+    return {"delta": await measure(args.runs, delta), "full": await measure(args.runs, full_list)}
+
+def main(args: argparse.Namespace) -> None:
+    # app.config reads DATABASE_URL when it is first imported
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.dependencies.database import get_async_engine
+
+    print(f"{args.changes} updates + {args.changes // 4} deletes after the cursor, {args.runs} calls each (ms)")
+    print(f"{'tasks':>8}{'delta p50':>12}{'delta p95':>12}{'changes':>9}{'full p50':>12}{'full p95':>12}{'rows':>9}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        migrate_and_seed(args.database_url, users=1, tasks_per_user=size)
+        user_id, _ = seeded_account(args.database_url)
+
+        async def run() -> dict:
+            try:
+                return await run_size(args, user_id)
+            finally:
+                await get_async_engine().dispose()
+
+        result = asyncio.run(run())
+        delta_p50, delta_p95, changes = result["delta"]
+        full_p50, full_p95, rows = result["full"]
+        print(f"{size:>8}{delta_p50:>12.2f}{delta_p95:>12.2f}{changes:>9}{full_p50:>12.2f}{full_p95:>12.2f}{rows:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="disposable database (default: DATABASE_URL)")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated task counts of the account")
+    parser.add_argument("--changes", type=int, default=20, help="tasks updated after the cursor")
+    parser.add_argument("--runs", type=int, default=50, help="timed calls per variant")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for picking the changed tasks")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
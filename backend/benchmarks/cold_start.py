@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cold start of the API: import, lifespan startup and first request in a fresh process.
+
+Each run spawns a new interpreter (nothing cached in memory) that imports
+api.index, runs the app's lifespan startup and serves GET /api/health once,
+then GET /openapi.json (generated on that first request unless
+OPENAPI_SCHEMA_FILE points at a precomputed schema). The report shows the
+median of each phase and the number of SQL statements sent during import
+(should be none) and before the first response. Against a remote database
+each statement is a network round trip, which a local socket hides.
+
+Usage (from the backend directory, DATABASE_URL pointing at a local Postgres):
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+CHILD_SCRIPT = """
+import asyncio, json, os, sys, time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+# Class-level listener: counts statements from every engine, sync or async
+event.listen(Engine, "before_cursor_execute", lambda *args: statements.append(1))
+start = time.perf_counter()
+from api.index import app
+imported = time.perf_counter()
+import_statements = len(statements)
+
+async def serve_first_request():
+    import httpx
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/api/health")
+            response.raise_for_status()
+            answered = time.perf_counter()
+            statement_count = len(statements)
+            (await client.get("/openapi.json")).raise_for_status()
+        return started, answered, statement_count, time.perf_counter()
+
+started, answered, statement_count, documented = asyncio.run(serve_first_request())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+    "total_ms": (answered - start) * 1000,
+    "openapi_ms": (documented - answered) * 1000,
+    "import_statements": import_statements,
+    "statements": statement_count,
+}), file=sys.__stdout__, flush=True)
+"""
+
+PHASES = ("import_ms", "startup_ms", "first_request_ms", "total_ms", "openapi_ms")
+
+def run_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise ValueError(f"cold start run failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(args: argparse.Namespace) -> None:
+    # One untimed run warms the OS file cache and .pyc files
+    run_once()
+    runs = [run_once() for _ in range(args.runs)]
+
+    print(
+        f"{args.runs} fresh processes, {runs[0]['import_statements']} SQL statements during import, "
+        f"{runs[0]['statements']} before the first response"
+    )
+    print(f"{'phase':<18}{'median ms':>12}{'max ms':>10}")
+    for phase in PHASES:
+        values = [run[phase] for run in runs]
+        print(f"{phase:<18}{statistics.median(values):>12.1f}{max(values):>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh processes to time")
+    try:
+        main(parser.parse_args())
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Import time of api.index, measured with `python -X importtime` in fresh processes.
+
+Each run imports the app in a new interpreter and parses the importtime
+report on stderr. The report shows the median of:
+- total: cumulative time of `import api.index`
+- own code: self time of this backend's modules (app.*, api.*), i.e. their
+  module-level code, route registration and model definitions
+- the packages that cost the most, by summed self time
+
+The run fails (exit 1) when a median is over the budget. The defaults are
+the budget documented in README.md; pass --budget-ms/--own-budget-ms to
+check other numbers. Importing must not touch the database, so no
+DATABASE_URL is needed.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_time --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Import-time budget of api.index (see "Cold start" in README.md)
+IMPORT_BUDGET_MS = 1100
+OWN_CODE_BUDGET_MS = 110
+OWN_PACKAGES = ("app", "api")
+
+def parse_importtime(report: str) -> tuple[float, dict[str, float]]:
+    """Cumulative ms of api.index and self ms summed per top-level package"""
+    total = None
+    by_package: dict[str, float] = defaultdict(float)
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        name = name.strip()
+        by_package[name.split(".")[0]] += int(self_us) / 1000
+        if name == "api.index":
+            total = int(cumulative_us) / 1000
+    if total is None:
+        raise ValueError("api.index was not imported")
+    return total, dict(by_package)
+
+def run_once() -> tuple[float, dict[str, float]]:
+    # The database and .env settings play no part in importing; a placeholder
+    # URL keeps the run independent of the caller's environment
+    env = {**os.environ, "DATABASE_URL": os.environ.get("DATABASE_URL") or "postgresql://bench@localhost/bench"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.index"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise ValueError(f"import failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def main(args: argparse.Namespace) -> int:
+    # One untimed run warms the OS file cache and .pyc files
+    run_once()
+    runs = [run_once() for _ in range(args.runs)]
+
+    totals = [total for total, _ in runs]
+    own = [sum(packages.get(name, 0.0) for name in OWN_PACKAGES) for _, packages in runs]
+    package_names = {name for _, packages in runs for name in packages}
+    package_ms = {
+        name: statistics.median(packages.get(name, 0.0) for _, packages in runs)
+        for name in package_names
+    }
+
+    print(f"import api.index, {args.runs} fresh processes (medians)")
+    print(f"{'total':<24}{statistics.median(totals):>10.1f} ms  (budget {args.budget_ms} ms)")
+    print(f"{'own code (app, api)':<24}{statistics.median(own):>10.1f} ms  (budget {args.own_budget_ms} ms)")
+    print("\nslowest packages (self time)")
+    for name, ms in sorted(package_ms.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<22}{ms:>10.1f} ms")
+
+    over = []
+    if statistics.median(totals) > args.budget_ms:
+        over.append("total")
+    if statistics.median(own) > args.own_budget_ms:
+        over.append("own code")
+    if over:
+        print(f"\n❌ over budget: {', '.join(over)}", file=sys.stderr, flush=True)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh processes to time")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="budget for the whole import")
+    parser.add_argument("--own-budget-ms", type=float, default=OWN_CODE_BUDGET_MS, help="budget for app.* and api.* module code")
+    try:
+        sys.exit(main(parser.parse_args()))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
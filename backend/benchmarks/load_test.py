@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the API with JSON baselines and regression reports.
+
+`run` starts `uvicorn api.index:app` in a subprocess against a disposable
+Postgres, migrates and seeds it, then drives a weighted mix of register,
+login, list, get, create, update, complete, delete, search and stats
+requests over real HTTP from closed-loop virtual users (each sends its next
+request as soon as the previous one returns, after an optional think time).
+Each virtual user works on one seeded account. The report shows throughput
+and p50/p95/p99 latency per endpoint and can be saved as a JSON baseline.
+
+By default a temporary Postgres cluster is created with initdb/pg_ctl (from
+PATH or --pg-bin; they refuse to run as root) and removed afterwards. Pass
+--database-url to use an existing database instead; it must be disposable,
+since seeding adds users and tasks to it.
+
+`compare` prints the change per endpoint between two saved results and
+exits with status 1 when a latency percentile or throughput regressed by
+more than --threshold percent, so it can gate CI.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_test run --users 50 --tasks-per-user 500 --concurrency 50 --duration 60 \\
+        --output benchmarks/results/baseline.json
+    python -m benchmarks.load_test run --baseline benchmarks/results/baseline.json --env TASK_CACHE_BACKEND=memory
+    python -m benchmarks.load_test compare benchmarks/results/baseline.json benchmarks/results/latest.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+from sqlalchemy import create_engine, text
+
+BACKEND_DIR = Path(__file__).parent.parent
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+# Seeded accounts share one password, so a single bcrypt hash serves all of them
+SEED_EMAIL = "load-{index}@loadtest.example.com"
+SEED_PASSWORD = "load-test-password"
+# Words for seeded titles and search queries, so searches find a realistic share of tasks
+WORDS = [
+    "invoice", "report", "meeting", "groceries", "deploy", "review", "dentist", "budget",
+    "release", "backup", "garden", "taxes", "presentation", "flight", "laundry", "refactor",
+]
+
+# Operation -> default weight in the mix
+DEFAULT_MIX = {
+    "list": 30, "get": 15, "create": 12, "update": 10, "complete": 8,
+    "delete": 8, "search": 7, "stats": 5, "login": 3, "register": 2,
+}
+
+# Endpoint label of each operation in reports (route templates, as in /metrics)
+ENDPOINTS = {
+    "list": "GET /api/tasks",
+    "get": "GET /api/tasks/{task_id}",
+    "create": "POST /api/tasks",
+    "update": "PUT /api/tasks/{task_id}",
+    "complete": "PATCH /api/tasks/{task_id}/complete",
+    "delete": "DELETE /api/tasks/{task_id}",
+    "search": "GET /api/tasks/search",
+    "stats": "GET /api/tasks/stats",
+    "login": "POST /api/auth/login",
+    "register": "POST /api/auth/register",
+}
+
+SEED_TASKS_SQL = """
+INSERT INTO tasks (user_id, title, description, priority, status, due_date, created_at, updated_at)
+SELECT u.id,
+       (:words)[1 + (g * 7 + u.id) % :word_count] || ' ' || (:words)[1 + (g * 3) % :word_count] || ' ' || g,
+       CASE WHEN g % 3 = 0 THEN 'Seeded task ' || g || ' for ' || (:words)[1 + (g * 5) % :word_count] END,
+       (ARRAY['low', 'medium', 'high'])[1 + g % 3],
+       CASE WHEN g % 4 = 0 THEN 'completed' ELSE 'pending' END,
+       CASE WHEN g % 2 = 0 THEN date_trunc('day', now()) + make_interval(days => g % 60 - 20) END,
+       now() - make_interval(mins => :tasks - g),
+       now() - make_interval(mins => :tasks - g)
+FROM users u CROSS JOIN generate_series(1, :tasks) AS g
+WHERE u.id = ANY(:user_ids)
+"""
+
+# Same backfill as migration 5, for the seeded users only
+SEED_STATS_SQL = [
+    """
+    INSERT INTO task_stats (user_id, total, pending, completed, priority_low, priority_medium, priority_high)
+    SELECT user_id, count(*),
+           count(*) FILTER (WHERE status = 'pending'),
+           count(*) FILTER (WHERE status = 'completed'),
+           count(*) FILTER (WHERE priority = 'low'),
+           count(*) FILTER (WHERE priority = 'medium'),
+           count(*) FILTER (WHERE priority = 'high')
+    FROM tasks WHERE user_id = ANY(:user_ids) GROUP BY user_id
+    """,
+    """
+    INSERT INTO task_due_stats (user_id, due_day, total, pending)
+    SELECT user_id, CAST(due_date AS DATE), count(*), count(*) FILTER (WHERE status = 'pending')
+    FROM tasks WHERE user_id = ANY(:user_ids) AND due_date IS NOT NULL
+    GROUP BY user_id, CAST(due_date AS DATE)
+    """,
+]
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse --mix: 'list=50,create=20,...'; operations left out keep their default weight"""
+    mix = dict(DEFAULT_MIX)
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        operation, _, weight = item.partition("=")
+        operation = operation.strip()
+        if operation not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation '{operation}' in --mix; choose from {', '.join(DEFAULT_MIX)}")
+        try:
+            mix[operation] = int(weight)
+        except ValueError:
+            raise ValueError(f"Invalid --mix entry '{item.strip()}': expected 'operation=weight'")
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("--mix leaves no operation with a positive weight")
+    return mix
+
+def parse_env(values: list[str]) -> dict[str, str]:
+    env = {}
+    for value in values:
+        key, separator, setting = value.partition("=")
+        if not separator:
+            raise ValueError(f"Invalid --env '{value}': expected KEY=VALUE")
+        env[key] = setting
+    return env
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+@contextmanager
+def temporary_postgres(pg_bin: str | None):
+    """Create, start and finally remove a throwaway Postgres cluster listening on a Unix socket"""
+    bin_dir = Path(pg_bin) if pg_bin else None
+    initdb = str(bin_dir / "initdb") if bin_dir else shutil.which("initdb")
+    pg_ctl = str(bin_dir / "pg_ctl") if bin_dir else shutil.which("pg_ctl")
+    if not initdb or not pg_ctl:
+        raise ValueError("initdb/pg_ctl not found: put the Postgres bin directory on PATH, pass --pg-bin, or use --database-url")
+
+    base = Path(tempfile.mkdtemp(prefix="load-test-pg-"))
+    data_dir = base / "data"
+    try:
+        subprocess.run(
+            [initdb, "-D", str(data_dir), "-U", "postgres", "-A", "trust", "--no-sync"],
+            check=True, capture_output=True, text=True
+        )
+        subprocess.run(
+            [pg_ctl, "-D", str(data_dir), "-l", str(base / "postgres.log"), "-w",
+             "-o", f"-c listen_addresses='' -k {base} -c max_connections=200", "start"],
+            check=True, capture_output=True, text=True
+        )
+    except subprocess.CalledProcessError as e:
+        shutil.rmtree(base, ignore_errors=True)
+        raise ValueError(f"could not start a temporary Postgres:\n{e.stderr or e.stdout}")
+    try:
+        yield f"postgresql://postgres@/postgres?host={base}"
+    finally:
+        subprocess.run([pg_ctl, "-D", str(data_dir), "-m", "fast", "-w", "stop"], capture_output=True)
+        shutil.rmtree(base, ignore_errors=True)
+
+def migrate_and_seed(database_url: str, users: int, tasks_per_user: int) -> None:
+    """Apply migrations, then add the seeded accounts and their tasks (idempotent per run id)"""
+    migration = subprocess.run(
+        [sys.executable, "-m", "app.migrations", "upgrade"],
+        cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": database_url},
+        capture_output=True, text=True
+    )
+    if migration.returncode != 0:
+        raise ValueError(f"migrations failed:\n{migration.stderr[-2000:]}")
+
+    from app.routes.auth import hash_password
+
+    password_hash = hash_password(SEED_PASSWORD)
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        # A previous run against the same database leaves its accounts behind; start fresh
+        existing = connection.execute(
+            text("SELECT id FROM users WHERE email LIKE 'load-%@loadtest.example.com'")
+        ).scalars().all()
+        if existing:
+            for table in ("task_tombstones", "task_due_stats", "task_stats", "tasks"):
+                connection.execute(text(f"DELETE FROM {table} WHERE user_id = ANY(:ids)"), {"ids": existing})
+            connection.execute(text("DELETE FROM users WHERE id = ANY(:ids)"), {"ids": existing})
+
+        user_ids = connection.execute(
+            text(
+                "INSERT INTO users (email, password_hash, name, created_at) "
+                "SELECT 'load-' || i || '@loadtest.example.com', :password_hash, 'Load ' || i, now() "
+                "FROM generate_series(0, :last) AS i RETURNING id"
+            ),
+            {"password_hash": password_hash, "last": users - 1}
+        ).scalars().all()
+        if tasks_per_user:
+            connection.execute(
+                text(SEED_TASKS_SQL),
+                {"words": WORDS, "word_count": len(WORDS), "tasks": tasks_per_user, "user_ids": user_ids}
+            )
+        for statement in SEED_STATS_SQL:
+            connection.execute(text(statement), {"user_ids": user_ids})
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM ANALYZE tasks"))
+    engine.dispose()
+
+@contextmanager
+def api_server(database_url: str, workers: int, extra_env: dict[str, str]):
+    """Run uvicorn api.index:app in a subprocess and yield its base URL once it answers"""
+    port = free_port()
+    log = tempfile.NamedTemporaryFile(prefix="load-test-api-", suffix=".log", delete=False)
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "BETTER_AUTH_SECRET": os.environ.get("BETTER_AUTH_SECRET") or "load-test-secret",
+        "LOG_LEVEL": "WARNING",
+        # Every virtual user logs in from 127.0.0.1
+        "RATE_LIMIT_BACKEND": "none",
+        **extra_env,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.index:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--no-access-log"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                raise ValueError(f"API server exited with status {process.returncode}:\n{Path(log.name).read_text()[-3000:]}")
+            try:
+                if httpx.get(f"{base_url}/api/health", timeout=2).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise ValueError(f"API server did not answer within 60 s:\n{Path(log.name).read_text()[-3000:]}")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+        os.unlink(log.name)
+
+class VirtualUser:
+    """One closed-loop client working on one seeded account"""
+
+    def __init__(self, client: httpx.AsyncClient, index: int, rng: random.Random, record):
+        self.client = client
+        self.email = SEED_EMAIL.format(index=index)
+        self.rng = rng
+        self.record = record
+        self.headers: dict[str, str] = {}
+        self.task_ids: list[int] = []
+        self.created_ids: list[int] = []
+
+    async def request(self, operation: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.record(operation, time.perf_counter() - start, None)
+            return None
+        self.record(operation, time.perf_counter() - start, response.status_code)
+        return response
+
+    async def start(self) -> None:
+        """Log in and learn some task ids (not measured)"""
+        response = await self.client.post("/api/auth/login", json={"email": self.email, "password": SEED_PASSWORD})
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['token']}"}
+        response = await self.client.get("/api/tasks", params={"limit": 100, "sort": "created_at", "order": "desc"}, headers=self.headers)
+        response.raise_for_status()
+        self.task_ids = [task["id"] for task in response.json()]
+
+    def some_task_id(self) -> int | None:
+        pool = self.task_ids or self.created_ids
+        return self.rng.choice(pool) if pool else None
+
+    async def run(self, operation: str) -> None:
+        rng = self.rng
+        if operation == "list":
+            params = {"limit": 50, "sort": rng.choice(["created_at", "due_date"]), "order": "desc"}
+            if rng.random() < 0.5:
+                params["status"] = "pending"
+            await self.request(operation, "GET", "/api/tasks", params=params)
+        elif operation == "get":
+            task_id = self.some_task_id()
+            if task_id is not None:
+                await self.request(operation, "GET", f"/api/tasks/{task_id}")
+        elif operation == "create":
+            due = None if rng.random() < 0.5 else f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00"
+            response = await self.request(operation, "POST", "/api/tasks", json={
+                "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+                "description": "Created by the load test",
+                "priority": rng.choice(["low", "medium", "high"]),
+                "due_date": due,
+            })
+            if response is not None and response.status_code == 201:
+                self.created_ids.append(response.json()["id"])
+        elif operation == "update":
+            task_id = self.some_task_id()
+            if task_id is not None:
+                await self.request(operation, "PUT", f"/api/tasks/{task_id}", json={
+                    "title": f"{rng.choice(WORDS)} {rng.choice(WORDS)} updated",
+                    "priority": rng.choice(["low", "medium", "high"]),
+                })
+        elif operation == "complete":
+            task_id = self.some_task_id()
+            if task_id is not None:
+                await self.request(operation, "PATCH", f"/api/tasks/{task_id}/complete")
+        elif operation == "delete":
+            # Only tasks this run created, so the seeded data keeps its size
+            if self.created_ids:
+                task_id = self.created_ids.pop(rng.randrange(len(self.created_ids)))
+                await self.request(operation, "DELETE", f"/api/tasks/{task_id}")
+        elif operation == "search":
+            await self.request(operation, "GET", "/api/tasks/search", params={"q": rng.choice(WORDS), "limit": 20})
+        elif operation == "stats":
+            await self.request(operation, "GET", "/api/tasks/stats")
+        elif operation == "login":
+            await self.request(operation, "POST", "/api/auth/login", json={"email": self.email, "password": SEED_PASSWORD})
+        elif operation == "register":
+            suffix = f"{os.getpid()}-{rng.getrandbits(48):x}"
+            await self.request(operation, "POST", "/api/auth/register", json={
+                "email": f"load-new-{suffix}@loadtest.example.com", "password": SEED_PASSWORD,
+            })
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(fraction * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+def summarize(samples: dict[str, list], seconds: float) -> dict:
+    endpoints = {}
+    for operation, entries in sorted(samples.items(), key=lambda item: ENDPOINTS[item[0]]):
+        latencies = sorted(latency * 1000 for latency, _ in entries)
+        errors = sum(1 for _, status in entries if status is None or status >= 400)
+        endpoints[ENDPOINTS[operation]] = {
+            "requests": len(entries),
+            "errors": errors,
+            "throughput_rps": round(len(entries) / seconds, 2),
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "max_ms": round(latencies[-1], 3),
+        }
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {
+        "summary": {
+            "seconds": round(seconds, 2),
+            "requests": total,
+            "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+            "throughput_rps": round(total / seconds, 2),
+        },
+        "endpoints": endpoints,
+    }
+
+async def drive(base_url: str, args: argparse.Namespace, mix: dict[str, int]) -> dict:
+    """Run the virtual users for warmup + duration seconds and summarize the measured part"""
+    samples: dict[str, list] = {}
+    measuring = False
+
+    def record(operation: str, seconds: float, status: int | None) -> None:
+        if measuring:
+            samples.setdefault(operation, []).append((seconds, status))
+
+    operations = [operation for operation, weight in mix.items() if weight > 0]
+    weights = [mix[operation] for operation in operations]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        virtual_users = [
+            VirtualUser(client, index % args.users, random.Random(args.seed * 100_003 + index), record)
+            for index in range(args.concurrency)
+        ]
+        # Logins go through the bcrypt pool; start users a few at a time
+        for offset in range(0, len(virtual_users), 8):
+            await asyncio.gather(*(user.start() for user in virtual_users[offset:offset + 8]))
+
+        stop_at = time.monotonic() + args.warmup + args.duration
+
+        async def loop(user: VirtualUser) -> None:
+            while time.monotonic() < stop_at:
+                await user.run(user.rng.choices(operations, weights)[0])
+                if args.think_ms:
+                    await asyncio.sleep(user.rng.expovariate(1000 / args.think_ms))
+
+        runners = [asyncio.create_task(loop(user)) for user in virtual_users]
+        await asyncio.sleep(args.warmup)
+        measuring = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*runners)
+        seconds = time.perf_counter() - measured_from
+    return summarize(samples, seconds)
+
+def print_report(result: dict) -> None:
+    summary = result["summary"]
+    print(
+        f"{summary['requests']} requests in {summary['seconds']:.1f} s, "
+        f"{summary['throughput_rps']:.1f} req/s, {summary['errors']} errors"
+    )
+    print(f"{'endpoint':<40}{'req':>8}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint, stats in result["endpoints"].items():
+        print(
+            f"{endpoint:<40}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+        )
+
+def compare_results(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> list[str]:
+    """Print per-endpoint changes and return the regressions found
+
+    A latency percentile regresses when it grew by more than `threshold`
+    percent and by more than `min_delta_ms` (sub-millisecond noise on fast
+    endpoints is ignored); throughput regresses when it fell by more than
+    `threshold` percent.
+    """
+    def change(old: float, new: float) -> float:
+        return (new - old) / old * 100 if old else 0.0
+
+    regressions = []
+    print(f"{'endpoint':<40}{'metric':>8}{'baseline':>11}{'current':>11}{'change':>9}")
+    for endpoint in sorted(set(baseline["endpoints"]) | set(current["endpoints"])):
+        old, new = baseline["endpoints"].get(endpoint), current["endpoints"].get(endpoint)
+        if old is None or new is None:
+            print(f"{endpoint:<40}  only in {'current' if old is None else 'baseline'}")
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            percent = change(old[metric], new[metric])
+            if metric == "throughput_rps":
+                regressed = percent < -threshold
+            else:
+                regressed = percent > threshold and new[metric] - old[metric] > min_delta_ms
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{endpoint:<40}{metric.removesuffix('_ms').removesuffix('_rps'):>8}"
+                  f"{old[metric]:>11.2f}{new[metric]:>11.2f}{percent:>+8.1f}%{flag}")
+            if regressed:
+                regressions.append(f"{endpoint} {metric} {old[metric]} -> {new[metric]} ({percent:+.1f}%)")
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{endpoint} errors {old['errors']} -> {new['errors']}")
+    return regressions
+
+def run(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    extra_env = parse_env(args.env)
+    if args.concurrency < 1 or args.users < 1:
+        raise ValueError("--users and --concurrency must be at least 1")
+
+    with (nullcontext(args.database_url) if args.database_url else temporary_postgres(args.pg_bin)) as database_url:
+        print(f"Seeding {args.users} users with {args.tasks_per_user} tasks each...", flush=True)
+        migrate_and_seed(database_url, args.users, args.tasks_per_user)
+        with api_server(database_url, args.workers, extra_env) as base_url:
+            print(f"Driving {args.concurrency} virtual users for {args.warmup:g} s warmup + {args.duration:g} s...", flush=True)
+            result = asyncio.run(drive(base_url, args, mix))
+
+    result = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": "external" if args.database_url else "temporary",
+            "workers": args.workers,
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+            "mix": mix,
+            "env": extra_env,
+        },
+        **result,
+    }
+    print_report(result)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"Saved {output}")
+
+    if args.baseline:
+        print()
+        regressions = compare_results(json.loads(Path(args.baseline).read_text()), result, args.threshold, args.min_delta_ms)
+        return report_regressions(regressions)
+    return 0
+
+def report_regressions(regressions: list[str]) -> int:
+    if not regressions:
+        print("\nNo regressions")
+        return 0
+    print(f"\n{len(regressions)} regression(s):")
+    for regression in regressions:
+        print(f"  {regression}")
+    return 1
+
+def compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline_file).read_text())
+    current = json.loads(Path(args.current_file).read_text())
+    for label, result in (("baseline", baseline), ("current", current)):
+        meta = result["meta"]
+        print(f"{label}: {meta['created_at']} commit {meta['git_commit']}, {meta['concurrency']} users, {meta['duration']} s")
+    if baseline["meta"]["mix"] != current["meta"]["mix"] or baseline["meta"]["concurrency"] != current["meta"]["concurrency"]:
+        print("warning: the runs used a different mix or concurrency")
+    print()
+    return report_regressions(compare_results(baseline, current, args.threshold, args.min_delta_ms))
+
+def add_threshold_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore latency increases smaller than this")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed, start the API and drive load")
+    run_parser.add_argument("--database-url", help="existing disposable database (default: temporary cluster)")
+    run_parser.add_argument("--pg-bin", help="directory with initdb and pg_ctl for the temporary cluster")
+    run_parser.add_argument("--users", type=int, default=20, help="seeded accounts")
+    run_parser.add_argument("--tasks-per-user", type=int, default=200, help="seeded tasks per account")
+    run_parser.add_argument("--concurrency", type=int, default=20, help="virtual users (in-flight requests)")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds before measuring")
+    run_parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's requests")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run_parser.add_argument("--mix", default="", help="operation weights, e.g. 'list=50,create=20,register=0'")
+    run_parser.add_argument("--env", action="append", default=[], help="extra KEY=VALUE for the API server (repeatable)")
+    run_parser.add_argument("--seed", type=int, default=1, help="random seed for the request sequence")
+    run_parser.add_argument("--output", help="result JSON path (default: benchmarks/results/load-<time>.json)")
+    run_parser.add_argument("--baseline", help="compare against this saved result after the run")
+    add_threshold_arguments(run_parser)
+
+    compare_parser = commands.add_parser("compare", help="compare two saved results")
+    compare_parser.add_argument("baseline_file")
+    compare_parser.add_argument("current_file")
+    add_threshold_arguments(compare_parser)
+
+    args = parser.parse_args()
+    try:
+        sys.exit(run(args) if args.command == "run" else compare(args))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(2)
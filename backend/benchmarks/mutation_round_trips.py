@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Latency of task mutations: SELECT-modify-commit-refresh vs UPDATE/DELETE ... RETURNING.
+
+The "before" variants reproduce the old handlers (load the row to check ownership,
+change it in Python, commit, then refresh). The "after" variants call the current
+route functions from app.routes.tasks directly, which issue one ownership-scoped
+statement with RETURNING. Both sides also make the writes every task mutation
+needs: the task_stats and due-day counter upserts and, for deletes, the
+tombstone. Statements are counted with an engine event so the report shows
+round trips as well as latency.
+
+A throwaway user and its tasks are created for the run and deleted afterwards.
+
+Usage (from the backend directory, DATABASE_URL pointing at a local Postgres):
+    python -m benchmarks.mutation_round_trips --iterations 300
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from sqlalchemy import delete, event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.dependencies.database import get_async_engine
+from app.models import Task, TaskDueStats, TaskStats, TaskTombstone, User
+from app.routes.tasks import TaskUpdate, complete_task, delete_task, update_task
+from app.services.task_changes import record_task_deletions
+from app.services.task_stats import record_task_changes
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+def snapshot(task: Task) -> tuple:
+    return task.status, task.priority, task.due_date
+
+async def legacy_update(session: AsyncSession, user_id: int, task_id: int):
+    task = (await session.exec(select(Task).where(Task.id == task_id, Task.user_id == user_id))).first()
+    old = snapshot(task)
+    task.title = f"updated {task_id}"
+    task.updated_at = datetime.utcnow()
+    session.add(task)
+    await record_task_changes(session, user_id, removed=[old], added=[snapshot(task)])
+    await session.commit()
+    await session.refresh(task)
+
+async def legacy_complete(session: AsyncSession, user_id: int, task_id: int):
+    task = (await session.exec(select(Task).where(Task.id == task_id, Task.user_id == user_id))).first()
+    old = snapshot(task)
+    task.status = "completed"
+    task.updated_at = datetime.utcnow()
+    session.add(task)
+    await record_task_changes(session, user_id, removed=[old], added=[snapshot(task)])
+    await session.commit()
+    await session.refresh(task)
+
+async def legacy_delete(session: AsyncSession, user_id: int, task_id: int):
+    task = (await session.exec(select(Task).where(Task.id == task_id, Task.user_id == user_id))).first()
+    old = snapshot(task)
+    await session.delete(task)
+    await record_task_changes(session, user_id, removed=[old])
+    await record_task_deletions(session, user_id, [task_id])
+    await session.commit()
+
+async def returning_update(session: AsyncSession, user_id: int, task_id: int):
+    await update_task(task_id, TaskUpdate(title=f"updated {task_id}"), user_id, session)
+
+async def returning_complete(session: AsyncSession, user_id: int, task_id: int):
+    await complete_task(task_id, user_id, session)
+
+async def returning_delete(session: AsyncSession, user_id: int, task_id: int):
+    await delete_task(task_id, user_id, session)
+
+async def seed_tasks(engine, user_id: int, count: int) -> list[int]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        tasks = [Task(user_id=user_id, title=f"bench {i}") for i in range(count)]
+        session.add_all(tasks)
+        await session.commit()
+        return [task.id for task in tasks]
+
+async def measure(engine, counter: StatementCounter, operation, user_id: int, task_ids: list[int]) -> dict:
+    latencies = []
+    statements_before = counter.count
+    for task_id in task_ids:
+        # A fresh session per call, like one request
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            await operation(session, user_id, task_id)
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "statements": (counter.count - statements_before) / len(task_ids),
+    }
+
+async def main(args: argparse.Namespace) -> None:
+    engine = get_async_engine()
+    counter = StatementCounter(engine)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        user = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", password_hash="x")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    variants = [
+        ("update", legacy_update, returning_update),
+        ("complete", legacy_complete, returning_complete),
+        ("delete", legacy_delete, returning_delete),
+    ]
+    rows = []
+    try:
+        for name, before, after in variants:
+            for label, operation in (("before", before), ("after", after)):
+                task_ids = await seed_tasks(engine, user_id, args.iterations)
+                result = await measure(engine, counter, operation, user_id, task_ids)
+                rows.append((f"{name} ({label})", result))
+    finally:
+        async with AsyncSession(engine) as session:
+            for model in (Task, TaskTombstone, TaskDueStats, TaskStats):
+                await session.exec(delete(model).where(model.user_id == user_id))
+            await session.exec(delete(User).where(User.id == user_id))
+            await session.commit()
+        await engine.dispose()
+
+    print(f"{args.iterations} sequential calls per variant")
+    print(f"{'variant':<20}{'p50 ms':>10}{'p95 ms':>10}{'statements':>12}")
+    for label, result in rows:
+        print(f"{label:<20}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['statements']:>12.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300, help="mutations per variant")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
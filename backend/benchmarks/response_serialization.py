@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Time to serialize a large task list into an HTTP response.
+
+The same in-memory list of Task rows (no database involved) is returned from
+three small apps that differ only in how the route is declared:
+
+  no response_model     the old routes: jsonable_encoder walks every object
+  response_model        List[TaskRead], FastAPI's default response class
+  response_model+orjson List[TaskRead] with app.responses.ORJSONResponse
+
+Each request goes through the full ASGI stack with httpx.ASGITransport, so the
+numbers include validation, encoding and response rendering.
+
+Usage (from the backend directory):
+    python -m benchmarks.response_serialization --tasks 10000 --requests 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+import httpx
+from fastapi import FastAPI
+from app.models import Task
+from app.responses import ORJSONResponse, orjson
+from app.routes.tasks import TaskRead
+
+def build_tasks(count: int) -> list[Task]:
+    now = datetime(2025, 1, 1)
+    return [
+        Task(
+            id=i, user_id=1, title=f"Task number {i}", description="Some description text " * 3,
+            priority=("low", "medium", "high")[i % 3], status="pending" if i % 2 else "completed",
+            due_date=now + timedelta(days=i % 30) if i % 4 else None,
+            created_at=now, updated_at=now + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+def build_app(tasks: list[Task], variant: str) -> FastAPI:
+    if variant == "response_model+orjson":
+        app = FastAPI(default_response_class=ORJSONResponse)
+    else:
+        app = FastAPI()
+
+    if variant == "no response_model":
+        @app.get("/tasks")
+        async def list_tasks():
+            return tasks
+    else:
+        @app.get("/tasks", response_model=List[TaskRead])
+        async def list_tasks():
+            return tasks
+
+    return app
+
+async def measure(app: FastAPI, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm-up request builds the route's validators and serializers
+        body_size = len((await client.get("/tasks")).content)
+        latencies = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get("/tasks")
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return {"p50_ms": statistics.median(latencies), "max_ms": max(latencies), "bytes": body_size}
+
+async def main(args: argparse.Namespace) -> None:
+    tasks = build_tasks(args.tasks)
+    variants = ["no response_model", "response_model"]
+    if orjson is not None:
+        variants.append("response_model+orjson")
+    else:
+        print("orjson not installed: skipping the orjson variant", file=sys.stderr, flush=True)
+
+    rows = [(variant, await measure(build_app(tasks, variant), args.requests)) for variant in variants]
+
+    baseline = rows[0][1]["p50_ms"]
+    print(f"{args.tasks} tasks per response, {args.requests} requests per variant")
+    print(f"{'variant':<24}{'p50 ms':>10}{'max ms':>10}{'speedup':>10}{'bytes':>12}")
+    for variant, result in rows:
+        speedup = baseline / result["p50_ms"]
+        print(f"{variant:<24}{result['p50_ms']:>10.1f}{result['max_ms']:>10.1f}{speedup:>9.1f}x{result['bytes']:>12}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000, help="tasks in each response")
+    parser.add_argument("--requests", type=int, default=20, help="timed requests per variant")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
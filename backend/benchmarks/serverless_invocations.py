@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Cold and warm invocations of the serverless handler (app.serverless.handler).
+
+Each cold start is a fresh interpreter that imports the handler module
+(init), then serves --warm invocations in a row, the way one function
+instance does. Every invocation is an API Gateway HTTP API (v2) event for
+GET --path with a bearer token of a seeded account. The handler is called
+directly, so the numbers are the function's own time without the API
+Gateway and Lambda overheads. The report shows, per DB_POOL_PROFILE:
+- init: the import of the handler module
+- cold: the first invocation (app startup, first connection)
+- warm p50/p95: the invocations after it
+- the new database connections opened per warm invocation (0 when the
+  connection is reused, 1 per invocation with external_pooler)
+
+The database must be disposable: it is migrated and seeded with one account.
+There is no PgBouncer here, so external_pooler connects straight to
+Postgres; behind a pooler in the same network its connects are cheaper.
+
+Usage (from the backend directory):
+    python -m benchmarks.serverless_invocations --database-url postgresql://... --cold 5 --warm 20
+    python -m benchmarks.serverless_invocations --profiles external_pooler --path "/api/tasks?limit=50"
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from benchmarks.load_test import SEED_EMAIL, migrate_and_seed, percentile
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+CHILD_SCRIPT = """
+import json, sys, time
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+connects = []
+# Class-level listener: every new DBAPI connection of any engine
+event.listen(Pool, "connect", lambda *args: connects.append(1))
+
+start = time.perf_counter()
+from app.serverless import handler
+init_ms = (time.perf_counter() - start) * 1000
+
+from app.routes.auth import create_jwt
+user_id, email, path, count = int(sys.argv[1]), sys.argv[2], sys.argv[3], int(sys.argv[4])
+token = create_jwt(user_id, email)
+raw_path, _, query = path.partition("?")
+
+class Context:
+    function_name = "todo-api-bench"
+    aws_request_id = "bench"
+
+invocations = []
+for index in range(count):
+    event = {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": raw_path,
+        "rawQueryString": query,
+        "headers": {"authorization": f"Bearer {token}", "host": "bench.local", "user-agent": "bench"},
+        "requestContext": {
+            "http": {"method": "GET", "path": raw_path, "protocol": "HTTP/1.1", "sourceIp": "203.0.113.10", "userAgent": "bench"},
+            "requestId": f"bench-{index}",
+            "stage": "$default",
+        },
+        "isBase64Encoded": False,
+    }
+    before = len(connects)
+    started = time.perf_counter()
+    response = handler(event, Context())
+    elapsed = (time.perf_counter() - started) * 1000
+    if response["statusCode"] != 200:
+        raise SystemExit(f"invocation {index} answered {response['statusCode']}: {response.get('body', '')[:300]}")
+    invocations.append({"ms": elapsed, "connects": len(connects) - before})
+
+print(json.dumps({"init_ms": init_ms, "invocations": invocations}), file=sys.__stdout__, flush=True)
+"""
+
+def seeded_account(database_url: str) -> tuple[int, str]:
+    email = SEED_EMAIL.format(index=0)
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        user_id = connection.execute(text("SELECT id FROM users WHERE email = :email"), {"email": email}).scalar_one()
+    engine.dispose()
+    return user_id, email
+
+def run_instance(database_url: str, profile: str, account: tuple[int, str], path: str, warm: int) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "DB_POOL_PROFILE": profile,
+        # Logs and metrics as in a function; rate limits are not under test
+        "LOG_LEVEL": "WARNING",
+        "RATE_LIMIT_BACKEND": "none",
+    }
+    env.setdefault("BETTER_AUTH_SECRET", "serverless-benchmark-secret")
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, str(account[0]), account[1], path, str(warm + 1)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        raise ValueError(f"{profile} instance failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(args: argparse.Namespace) -> None:
+    migrate_and_seed(args.database_url, users=1, tasks_per_user=args.tasks)
+    account = seeded_account(args.database_url)
+
+    print(f"GET {args.path}: {args.cold} cold starts x {args.warm} warm invocations per profile (ms)")
+    print(f"{'profile':<18}{'init':>8}{'cold':>8}{'warm p50':>10}{'warm p95':>10}{'connects/warm':>15}")
+    for profile in args.profiles.split(","):
+        # One untimed instance warms the OS file cache and .pyc files
+        run_instance(args.database_url, profile, account, args.path, 1)
+        instances = [run_instance(args.database_url, profile, account, args.path, args.warm) for _ in range(args.cold)]
+        init = statistics.median(instance["init_ms"] for instance in instances)
+        cold = statistics.median(instance["invocations"][0]["ms"] for instance in instances)
+        warm = sorted(call["ms"] for instance in instances for call in instance["invocations"][1:])
+        connects = [call["connects"] for instance in instances for call in instance["invocations"][1:]]
+        print(
+            f"{profile:<18}{init:>8.1f}{cold:>8.1f}{percentile(warm, 0.5):>10.1f}{percentile(warm, 0.95):>10.1f}"
+            f"{sum(connects) / len(connects):>15.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="disposable database (default: DATABASE_URL)")
+    parser.add_argument("--profiles", default="serverless,external_pooler", help="comma-separated DB_POOL_PROFILE values")
+    parser.add_argument("--cold", type=int, default=5, help="fresh instances per profile")
+    parser.add_argument("--warm", type=int, default=20, help="warm invocations per instance")
+    parser.add_argument("--path", default="/api/tasks?limit=20", help="path (and query) each invocation requests")
+    parser.add_argument("--tasks", type=int, default=100, help="tasks of the seeded account")
+    args = parser.parse_args()
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    try:
+        main(args)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr, flush=True)
+        sys.exit(1)
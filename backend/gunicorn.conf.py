@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for the production launcher (python -m app.server).
+
+Values come from the SERVER_* settings in app/config.py; see app/server.py
+for what each one is for. gunicorn also picks this file up by itself when
+started from the backend directory (`gunicorn api.index:app`).
+"""
+import logging
+import os
+import tempfile
+from pathlib import Path
+from app.config import settings
+from app.server import cgroup_cpu_limit, worker_count
+
+bind = f"{settings.server_host}:{settings.server_port}"
+workers = worker_count()
+worker_class = "app.gunicorn_worker.UvicornWorker"
+preload_app = True
+max_requests = settings.server_max_requests
+max_requests_jitter = settings.server_max_requests_jitter
+graceful_timeout = settings.server_graceful_timeout
+keepalive = settings.server_keepalive
+loglevel = settings.log_level.lower()
+# Worker heartbeat files: keep them off the container's overlay filesystem
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# Aggregate /metrics over the workers. prometheus_client reads the variable
+# when it is imported, so it has to be set before the app is preloaded.
+if settings.metrics_enabled:
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Values left by a previous run would be added to this one's
+        for stale in Path(os.environ["PROMETHEUS_MULTIPROC_DIR"]).glob("*.db"):
+            stale.unlink()
+    else:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="todo-api-metrics-")
+
+def when_ready(server):
+    logging.getLogger("gunicorn.error").info(
+        "Serving with %s workers (CPU quota: %s, recycled after ~%s requests)",
+        server.cfg.workers, cgroup_cpu_limit() or "none", server.cfg.max_requests or "never"
+    )
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges (in-flight requests) from /metrics
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
-Database migration script to add missing columns or recreate tables.
-Run this script to update your database schema to match the models.
+Database migration script: apply pending schema migrations or recreate tables.
+Equivalent to `python -m app.migrations upgrade`; see app/migrations/versions.py.
 """
 import os
 import sys
@@ -19,119 +19,20 @@ else:
 
 # Import after loading .env
 from app.dependencies.database import get_engine
-from app.models import User, Task
-from sqlmodel import SQLModel, Session
+from app.migrations.runner import apply_migrations
 
 def migrate_database():
-    """Add missing columns to existing tables or recreate tables."""
+    """Apply every pending versioned migration."""
     try:
         engine = get_engine()
-        
-        with Session(engine) as session:
-            # Check if users table exists and has name column
-            result = session.exec(
-                text("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'users' AND column_name = 'name'
-                """)
-            ).first()
-            
-            if result is None:
-                print("⚠️ 'name' column missing in users table. Adding it...", file=sys.stderr, flush=True)
-                # Add name column
-                session.exec(
-                    text("ALTER TABLE users ADD COLUMN IF NOT EXISTS name VARCHAR(255)")
-                )
-                session.commit()
-                print("✅ Added 'name' column to users table", file=sys.stderr, flush=True)
-            else:
-                print("✅ 'name' column already exists in users table", file=sys.stderr, flush=True)
-            
-            # Check if tasks table has all required columns
-            task_columns_result = session.exec(
-                text("""
-                    SELECT column_name 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'tasks'
-                """)
-            ).all()
-            
-            # Extract column names from tuples
-            task_column_names = [col[0] if isinstance(col, tuple) else col for col in task_columns_result]
-            print(f"Current tasks columns: {task_column_names}", file=sys.stderr, flush=True)
-            
-            # Required columns from Task model (excluding id which is primary key)
-            required_columns = {
-                'priority': "VARCHAR(20) DEFAULT 'medium' NOT NULL",
-                'status': "VARCHAR(20) DEFAULT 'pending' NOT NULL",
-                'due_date': 'TIMESTAMP',
-                'updated_at': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
-            }
-            
-            missing_columns = []
-            for col_name in required_columns.keys():
-                if col_name not in task_column_names:
-                    missing_columns.append(col_name)
-            
-            if missing_columns:
-                print(f"⚠️ Missing columns in tasks table: {missing_columns}. Adding them...", file=sys.stderr, flush=True)
-                for col_name in missing_columns:
-                    col_def = required_columns[col_name]
-                    try:
-                        # Try with IF NOT EXISTS first
-                        sql = f"ALTER TABLE tasks ADD COLUMN IF NOT EXISTS {col_name} {col_def}"
-                        session.exec(text(sql))
-                        print(f"  ✅ Added column: {col_name}", file=sys.stderr, flush=True)
-                    except Exception as e:
-                        # If IF NOT EXISTS doesn't work, try without it
-                        try:
-                            sql = f"ALTER TABLE tasks ADD COLUMN {col_name} {col_def}"
-                            session.exec(text(sql))
-                            print(f"  ✅ Added column: {col_name} (retry)", file=sys.stderr, flush=True)
-                        except Exception as e2:
-                            print(f"  ⚠️ Could not add {col_name}: {e2}", file=sys.stderr, flush=True)
-                
-                session.commit()
-                print(f"✅ Added missing columns to tasks table: {missing_columns}", file=sys.stderr, flush=True)
-            else:
-                print("✅ All required columns exist in tasks table", file=sys.stderr, flush=True)
-            
-            # Ensure priority and status have default values if they exist but don't have defaults
-            try:
-                # Check if priority has a default
-                priority_check = session.exec(
-                    text("""
-                        SELECT column_default 
-                        FROM information_schema.columns 
-                        WHERE table_name = 'tasks' AND column_name = 'priority'
-                    """)
-                ).first()
-                
-                if not priority_check or priority_check is None:
-                    print("⚠️ priority column exists but has no default. Setting default...", file=sys.stderr, flush=True)
-                    session.exec(text("ALTER TABLE tasks ALTER COLUMN priority SET DEFAULT 'medium'"))
-                    session.commit()
-                    print("✅ Set default for priority column", file=sys.stderr, flush=True)
-                
-                # Check if status has a default
-                status_check = session.exec(
-                    text("""
-                        SELECT column_default 
-                        FROM information_schema.columns 
-                        WHERE table_name = 'tasks' AND column_name = 'status'
-                    """)
-                ).first()
-                
-                if not status_check or status_check is None:
-                    print("⚠️ status column exists but has no default. Setting default...", file=sys.stderr, flush=True)
-                    session.exec(text("ALTER TABLE tasks ALTER COLUMN status SET DEFAULT 'pending'"))
-                    session.commit()
-                    print("✅ Set default for status column", file=sys.stderr, flush=True)
-            except Exception as e:
-                print(f"⚠️ Could not set defaults: {e}", file=sys.stderr, flush=True)
-                session.rollback()
-        
+
+        with engine.begin() as connection:
+            applied = apply_migrations(connection)
+
+        if applied:
+            print(f"✅ Applied migrations: {applied}", file=sys.stderr, flush=True)
+        else:
+            print("✅ Schema already up to date", file=sys.stderr, flush=True)
         print("✅ Database migration completed successfully!", file=sys.stderr, flush=True)
         
     except Exception as e:
@@ -152,12 +53,19 @@ def recreate_tables():
             print("❌ Migration cancelled", file=sys.stderr, flush=True)
             return
         
-        # Drop all tables
-        SQLModel.metadata.drop_all(engine)
+        # Drop every table in the schema, including schema_version and tables
+        # created by migrations that have no SQLModel model
+        with engine.begin() as connection:
+            tables = connection.execute(
+                text("SELECT tablename FROM pg_tables WHERE schemaname = current_schema()")
+            ).scalars().all()
+            for table in tables:
+                connection.execute(text(f'DROP TABLE IF EXISTS "{table}" CASCADE'))
         print("✅ Dropped all tables", file=sys.stderr, flush=True)
         
         # Create all tables
-        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            apply_migrations(connection)
         print("✅ Created all tables with correct schema", file=sys.stderr, flush=True)
         
         print("✅ Database recreated successfully!", file=sys.stderr, flush=True)
@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.services.task_changes import MAX_BIGINT, ChangeCursor, decode_change_cursor, encode_change_cursor, held_since
+
+ISSUED = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+def make_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    ChangeCursor((123, 45), ISSUED),
+    ChangeCursor((123, 0), ISSUED, held=ISSUED - timedelta(minutes=5)),
+    ChangeCursor((123, 45), ISSUED, resume=100),
+])
+def test_round_trip(cursor):
+    assert decode_change_cursor(encode_change_cursor(cursor)) == cursor
+
+def test_naive_issued_is_rejected():
+    cursor = make_cursor({"xid": 1, "id": 1, "issued": "2026-01-02T03:04:05"})
+    with pytest.raises(ValueError, match="time zone"):
+        decode_change_cursor(cursor)
+
+@pytest.mark.parametrize("xid", ["1", 1.5, True, None, -1, MAX_BIGINT + 1])
+def test_xid_outside_bigint_is_rejected(xid):
+    with pytest.raises(ValueError):
+        decode_change_cursor(make_cursor({"xid": xid, "id": 1, "issued": "2026-01-02T03:04:05+00:00"}))
+
+@pytest.mark.parametrize("cursor", ["not base64!", "abc", make_cursor([1, 2]), make_cursor({"xid": 1}), "e30", "8J-YgA"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_change_cursor(cursor)
+
+def test_naive_held_is_rejected():
+    cursor = make_cursor({"xid": 1, "id": 0, "issued": "2026-01-02T03:04:05+00:00", "held": "2026-01-02T03:04:05"})
+    with pytest.raises(ValueError, match="time zone"):
+        decode_change_cursor(cursor)
+
+def test_held_horizon_keeps_counting():
+    # An open transaction keeps the horizon at 100 call after call
+    now = ISSUED
+    cursor = ChangeCursor((100, 0), now)
+    for _ in range(3):
+        now += timedelta(minutes=2)
+        cursor = ChangeCursor((100, 0), now, held_since(cursor, 100, now))
+    assert cursor.held == ISSUED
+    assert now - cursor.held == timedelta(minutes=6)
+
+def test_moving_horizon_starts_counting_again():
+    now = ISSUED + timedelta(minutes=10)
+    assert held_since(ChangeCursor((100, 0), ISSUED, held=ISSUED), 101, now) == now
+
+def test_paging_does_not_count_as_held():
+    now = ISSUED + timedelta(minutes=10)
+    # A page boundary, and the pages of a sync without `since`
+    assert held_since(ChangeCursor((100, 7), ISSUED), 100, now) == now
+    assert held_since(ChangeCursor((100, 0), ISSUED, resume=100), 100, now) == now
@@ -23,6 +23,13 @@ export interface Task {
   updated_at: string;
 }
 
+interface TaskChanges {
+  tasks: Task[];
+  deleted: number[];
+  cursor: string;
+  has_more: boolean;
+}
+
 export interface TaskCreate {
   title: string;
   description?: string;
@@ -42,6 +49,8 @@ class ApiService {
   private chatClient: AxiosInstance;
   private backendClient: AxiosInstance;
   private authToken: string | null = null;
+  // Local copy of the task list by id, kept current from GET /api/tasks/changes
+  private taskSync: { cursor: string; tasks: Map<string, Task> } | null = null;
 
   constructor() {
     this.chatClient = axios.create({
@@ -68,12 +77,14 @@ class ApiService {
 
   setAuthToken(token: string) {
     this.authToken = token;
+    this.taskSync = null;
     localStorage.setItem('auth_token', token);
     this.backendClient.defaults.headers.common['Authorization'] = `Bearer ${token}`;
   }
 
   clearAuthToken() {
     this.authToken = null;
+    this.taskSync = null;
     localStorage.removeItem('auth_token');
     delete this.backendClient.defaults.headers.common['Authorization'];
   }
@@ -107,8 +118,38 @@ class ApiService {
 
   // Task methods
   async getTasks(): Promise<Task[]> {
-    const response = await this.backendClient.get('/api/tasks');
-    return response.data;
+    // Only changes since the last call are downloaded; an expired cursor (410) starts over
+    let sync = this.taskSync ?? { cursor: '', tasks: new Map<string, Task>() };
+    let hasMore = true;
+    while (hasMore) {
+      const response = await this.backendClient.get<TaskChanges>('/api/tasks/changes', {
+        params: sync.cursor ? { since: sync.cursor } : undefined,
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 410,
+      });
+      if (response.status === 410) {
+        sync = { cursor: '', tasks: new Map<string, Task>() };
+        continue;
+      }
+      for (const task of response.data.tasks) {
+        sync.tasks.set(String(task.id), task);
+      }
+      for (const id of response.data.deleted) {
+        sync.tasks.delete(String(id));
+      }
+      sync.cursor = response.data.cursor;
+      hasMore = response.data.has_more;
+    }
+    this.taskSync = sync;
+    // Same order as GET /api/tasks: oldest first
+    return [...sync.tasks.values()].sort(
+      (a, b) => a.created_at.localeCompare(b.created_at) || Number(a.id) - Number(b.id)
+    );
+  }
+
+  // Own writes go into the local copy at once; the change feed may only
+  // deliver them on a later call, after older transactions have finished
+  private rememberTask(task: Task) {
+    this.taskSync?.tasks.set(String(task.id), task);
   }
 
   async getTask(taskId: string): Promise<Task> {
@@ -118,20 +159,24 @@ class ApiService {
 
   async createTask(task: TaskCreate): Promise<Task> {
     const response = await this.backendClient.post('/api/tasks', task);
+    this.rememberTask(response.data);
     return response.data;
   }
 
   async updateTask(taskId: string | number, updates: TaskUpdate): Promise<Task> {
     const response = await this.backendClient.put(`/api/tasks/${taskId}`, updates);
+    this.rememberTask(response.data);
     return response.data;
   }
 
   async deleteTask(taskId: string | number): Promise<void> {
     await this.backendClient.delete(`/api/tasks/${taskId}`);
+    this.taskSync?.tasks.delete(String(taskId));
   }
 
   async completeTask(taskId: string | number): Promise<Task> {
     const response = await this.backendClient.patch(`/api/tasks/${taskId}/complete`);
+    this.rememberTask(response.data);
     return response.data;
   }
 
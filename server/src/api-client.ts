@@ -12,6 +12,25 @@ export interface Task {
   updated_at: string;
 }
 
+export interface TaskSearchResult extends Task {
+  rank: number;
+}
+
+export interface TaskStats {
+  total: number;
+  by_status: { pending: number; completed: number };
+  by_priority: { low: number; medium: number; high: number };
+  overdue: number;
+  due_today: number;
+}
+
+export interface TaskChanges {
+  tasks: Task[];
+  deleted: number[];
+  cursor: string;
+  has_more: boolean;
+}
+
 export interface TaskCreate {
   title: string;
   description?: string;
@@ -30,6 +49,8 @@ export interface TaskUpdate {
 export class TodoApiClient {
   private client: AxiosInstance;
   private authToken: string | null = null;
+  // Local copy of the task list by id, kept current from GET /api/tasks/changes
+  private taskSync: { cursor: string; tasks: Map<string, Task> } | null = null;
 
   constructor() {
     this.client = axios.create({
@@ -50,10 +71,12 @@ export class TodoApiClient {
 
   setAuthToken(token: string) {
     this.authToken = token;
+    this.taskSync = null;
   }
 
   clearAuthToken() {
     this.authToken = null;
+    this.taskSync = null;
   }
 
   async login(email: string, password: string): Promise<{ token: string; user: any }> {
@@ -70,10 +93,56 @@ export class TodoApiClient {
   }
 
   async getTasks(): Promise<Task[]> {
-    const response = await this.client.get('/api/tasks');
+    // Only changes since the last call are downloaded; an expired cursor (410) starts over
+    let sync = this.taskSync ?? { cursor: '', tasks: new Map<string, Task>() };
+    let hasMore = true;
+    while (hasMore) {
+      const response = await this.client.get<TaskChanges>('/api/tasks/changes', {
+        params: sync.cursor ? { since: sync.cursor } : undefined,
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 410,
+      });
+      if (response.status === 410) {
+        sync = { cursor: '', tasks: new Map<string, Task>() };
+        continue;
+      }
+      for (const task of response.data.tasks) {
+        sync.tasks.set(String(task.id), task);
+      }
+      for (const id of response.data.deleted) {
+        sync.tasks.delete(String(id));
+      }
+      sync.cursor = response.data.cursor;
+      hasMore = response.data.has_more;
+    }
+    this.taskSync = sync;
+    // Same order as GET /api/tasks: oldest first
+    return [...sync.tasks.values()].sort(
+      (a, b) => a.created_at.localeCompare(b.created_at) || Number(a.id) - Number(b.id)
+    );
+  }
+
+  async searchTasks(query: string, options: { status?: 'pending' | 'completed'; limit?: number } = {}): Promise<TaskSearchResult[]> {
+    // Ranked server-side search; typos and partial words match when the database has pg_trgm
+    const response = await this.client.get('/api/tasks/search', {
+      params: { q: query, ...options },
+    });
     return response.data;
   }
 
+  async getTaskStats(): Promise<TaskStats> {
+    // Sends the local date so overdue/due today match the user's day
+    const now = new Date();
+    const today = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}-${String(now.getDate()).padStart(2, '0')}`;
+    const response = await this.client.get('/api/tasks/stats', { params: { today } });
+    return response.data;
+  }
+
+  // Own writes go into the local copy at once; the change feed may only
+  // deliver them on a later call, after older transactions have finished
+  private rememberTask(task: Task) {
+    this.taskSync?.tasks.set(String(task.id), task);
+  }
+
   async getTask(taskId: string | number): Promise<Task> {
     const response = await this.client.get(`/api/tasks/${taskId}`);
     return response.data;
@@ -81,20 +150,24 @@ export class TodoApiClient {
 
   async createTask(task: TaskCreate): Promise<Task> {
     const response = await this.client.post('/api/tasks', task);
+    this.rememberTask(response.data);
     return response.data;
   }
 
   async updateTask(taskId: string | number, updates: TaskUpdate): Promise<Task> {
     const response = await this.client.put(`/api/tasks/${taskId}`, updates);
+    this.rememberTask(response.data);
     return response.data;
   }
 
   async deleteTask(taskId: string | number): Promise<void> {
     await this.client.delete(`/api/tasks/${taskId}`);
+    this.taskSync?.tasks.delete(String(taskId));
   }
 
   async completeTask(taskId: string | number): Promise<Task> {
     const response = await this.client.patch(`/api/tasks/${taskId}/complete`);
+    this.rememberTask(response.data);
     return response.data;
   }
 }
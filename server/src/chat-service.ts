@@ -9,6 +9,8 @@ export interface ConversationState {
   conversationId: string;
   messages: ChatMessage[];
   userId?: string;
+  // Task a fuzzy complete or delete matched, waiting for the user to say yes
+  pendingAction?: { action: 'complete' | 'delete'; id: string | number; title: string };
   createdAt: string;
   updatedAt: string;
 }
@@ -16,6 +18,16 @@ export interface ConversationState {
 // In-memory storage for conversation state
 const conversationStore = new Map<string, ConversationState>();
 
+// How many search hits a complete or delete looks at to decide whether its match is unambiguous
+const TITLE_SEARCH_LIMIT = 5;
+
+// The search is fuzzy, so only hits whose title equals (or else contains) the request count as matches
+function titleMatches<T extends { title: string }>(hits: T[], query: string): T[] {
+  const wanted = query.toLowerCase();
+  const exact = hits.filter(t => t.title.toLowerCase() === wanted);
+  return exact.length > 0 ? exact : hits.filter(t => t.title.toLowerCase().includes(wanted));
+}
+
 export class ChatService {
   private getOrCreateConversation(conversationId: string): ConversationState {
     if (!conversationStore.has(conversationId)) {
@@ -77,6 +89,10 @@ export class ChatService {
     }
 
     // Parse actions
+    if (lowerMessage.match(/^(yes|yep|y|confirm|sure|ok|okay)\b/)) {
+      return { action: 'confirm' };
+    }
+
     if (lowerMessage.match(/^(show|list|display|get|what are|what's).*(?:todo|task|todos|tasks)/) ||
         lowerMessage.match(/(?:show|list|display|get).*(?:my|all).*(?:todo|task|todos|tasks)/)) {
       return { action: 'list' };
@@ -161,6 +177,10 @@ export class ChatService {
       const command = this.parseCommand(userMessage);
       let response = '';
 
+      // A suggested task only stands until the next message
+      const pendingAction = conversation.pendingAction;
+      conversation.pendingAction = undefined;
+
       switch (command.action) {
         case 'list': {
           const tasks = await apiClient.getTasks();
@@ -199,22 +219,25 @@ export class ChatService {
 
         case 'complete': {
           try {
-            const tasks = await apiClient.getTasks();
-            const pendingTasks = tasks.filter(t => t.status === 'pending');
-            
-            if (pendingTasks.length === 0) {
+            // Server-side search; the full list is only fetched when nothing matches
+            const hits = command.taskTitle
+              ? await apiClient.searchTasks(command.taskTitle, { status: 'pending', limit: TITLE_SEARCH_LIMIT })
+              : [];
+            const matches = command.taskTitle ? titleMatches(hits, command.taskTitle) : [];
+            const pendingTasks = hits.length > 0 ? [] : (await apiClient.getTasks()).filter(t => t.status === 'pending');
+
+            if (matches.length === 1) {
+              await apiClient.completeTask(matches[0].id);
+              response = `✅ Completed task: "${matches[0].title}"`;
+            } else if (matches.length > 1) {
+              response = `Several pending tasks match "${command.taskTitle}":\n${matches.map(t => `- ${t.title}`).join('\n')}\nWhich one should I complete? Please use its full title.`;
+            } else if (hits.length > 0) {
+              conversation.pendingAction = { action: 'complete', id: hits[0].id, title: hits[0].title };
+              response = `I couldn't find a pending task called "${command.taskTitle}". Did you mean "${hits[0].title}"? Reply "yes" to complete it.`;
+            } else if (pendingTasks.length === 0) {
               response = "You don't have any pending tasks to complete.";
             } else if (command.taskTitle) {
-              // Try to find task by title
-              const task = pendingTasks.find(t => 
-                t.title.toLowerCase().includes(command.taskTitle!.toLowerCase())
-              );
-              if (task) {
-                await apiClient.completeTask(task.id);
-                response = `✅ Completed task: "${task.title}"`;
-              } else {
-                response = `I couldn't find a pending task matching "${command.taskTitle}". Here are your pending tasks:\n${pendingTasks.map(t => `- ${t.title}`).join('\n')}`;
-              }
+              response = `I couldn't find a pending task matching "${command.taskTitle}". Here are your pending tasks:\n${pendingTasks.map(t => `- ${t.title}`).join('\n')}`;
             } else {
               // Complete the first pending task
               const task = pendingTasks[0];
@@ -229,23 +252,26 @@ export class ChatService {
 
         case 'delete': {
           try {
-            const tasks = await apiClient.getTasks();
-            
-            if (tasks.length === 0) {
-              response = "You don't have any tasks to delete.";
-            } else if (command.taskTitle) {
-              // Try to find task by title
-              const task = tasks.find(t => 
-                t.title.toLowerCase().includes(command.taskTitle!.toLowerCase())
-              );
-              if (task) {
-                await apiClient.deleteTask(task.id);
-                response = `✅ Deleted task: "${task.title}"`;
+            if (!command.taskTitle) {
+              response = "Please specify which task you'd like to delete. For example: 'Delete the todo Buy groceries'";
+            } else {
+              const hits = await apiClient.searchTasks(command.taskTitle, { limit: TITLE_SEARCH_LIMIT });
+              const matches = titleMatches(hits, command.taskTitle);
+
+              if (matches.length === 1) {
+                await apiClient.deleteTask(matches[0].id);
+                response = `✅ Deleted task: "${matches[0].title}"`;
+              } else if (matches.length > 1) {
+                response = `Several tasks match "${command.taskTitle}":\n${matches.map(t => `- ${t.title}`).join('\n')}\nWhich one should I delete? Please use its full title.`;
+              } else if (hits.length > 0) {
+                conversation.pendingAction = { action: 'delete', id: hits[0].id, title: hits[0].title };
+                response = `I couldn't find a task called "${command.taskTitle}". Did you mean "${hits[0].title}"? Reply "yes" to delete it.`;
               } else {
-                response = `I couldn't find a task matching "${command.taskTitle}". Here are your tasks:\n${tasks.map(t => `- ${t.title}`).join('\n')}`;
+                const tasks = await apiClient.getTasks();
+                response = tasks.length === 0
+                  ? "You don't have any tasks to delete."
+                  : `I couldn't find a task matching "${command.taskTitle}". Here are your tasks:\n${tasks.map(t => `- ${t.title}`).join('\n')}`;
               }
-            } else {
-              response = "Please specify which task you'd like to delete. For example: 'Delete the todo Buy groceries'";
             }
           } catch (error: any) {
             response = `Sorry, I couldn't delete the task: ${error.message || 'Unknown error'}`;
@@ -253,6 +279,25 @@ export class ChatService {
           break;
         }
 
+        case 'confirm': {
+          if (!pendingAction) {
+            response = "There's nothing waiting for confirmation. Try \"Help\" to see what I can do.";
+            break;
+          }
+          try {
+            if (pendingAction.action === 'complete') {
+              await apiClient.completeTask(pendingAction.id);
+              response = `✅ Completed task: "${pendingAction.title}"`;
+            } else {
+              await apiClient.deleteTask(pendingAction.id);
+              response = `✅ Deleted task: "${pendingAction.title}"`;
+            }
+          } catch (error: any) {
+            response = `Sorry, I couldn't ${pendingAction.action} the task: ${error.message || 'Unknown error'}`;
+          }
+          break;
+        }
+
         case 'update': {
           response = "Update functionality is coming soon! For now, you can use the edit button in the UI.";
           break;
@@ -260,10 +305,12 @@ export class ChatService {
 
         case 'count': {
           try {
-            const tasks = await apiClient.getTasks();
-            const pending = tasks.filter(t => t.status === 'pending').length;
-            const completed = tasks.filter(t => t.status === 'completed').length;
-            response = `You have ${tasks.length} task${tasks.length !== 1 ? 's' : ''} total (${pending} pending, ${completed} completed).`;
+            const stats = await apiClient.getTaskStats();
+            const { pending, completed } = stats.by_status;
+            response = `You have ${stats.total} task${stats.total !== 1 ? 's' : ''} total (${pending} pending, ${completed} completed).`;
+            if (stats.overdue > 0) {
+              response += ` ${stats.overdue} ${stats.overdue !== 1 ? 'are' : 'is'} overdue.`;
+            }
           } catch (error: any) {
             response = `Sorry, I couldn't count your tasks: ${error.message || 'Unknown error'}`;
           }